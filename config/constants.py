@@ -18,6 +18,12 @@ MATCHING_WEIGHTS = {
     'experience_match': 0.15,
 }
 
+# Weight of the CV/opportunity text similarity in the 'semantic' scorer
+SEMANTIC_MATCH_WEIGHT = 0.15
+
+# Education levels in ascending order, used for eligibility checks
+EDUCATION_LEVEL_ORDER = ['high_school', 'bachelors', 'masters', 'phd']
+
 # Default scores
 DEFAULT_KEYWORD_SCORE = 0.5
 DEFAULT_LOCATION_SCORE = 0.3
@@ -430,3 +430,56 @@ if not DEBUG:
         'keepalives_interval': 10,
         'keepalives_count': 5,
     })
+
+# Cache shared by every worker. Cached rankings and responses are invalidated through generation
+# counters stored in this cache (see utils.caching): with the per-process fallback a bump in one
+# worker does not reach the others, which keep serving stale results until their TTLs expire
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    if not DEBUG:
+        logger.warning(
+            'REDIS_URL not set: using a per-process cache. Cache invalidation will not reach other workers; '
+            'set REDIS_URL when running more than one worker process.'
+        )
+
+# Recommendation engine
+# 'batch' scores opportunities with vectorized NumPy operations, 'sql' scores them inside Postgres
+# and fetches only the top rows, 'python' uses the per-row scorer
+RECOMMENDATION_SCORING_MODE = os.getenv('RECOMMENDATION_SCORING_MODE', 'batch')
+# Maximum number of candidates retrieved from the skill postings before scoring (0 scans the full catalog).
+# Lossy when more rows match than the limit: measure recall with `measure_candidate_recall` before enabling
+RECOMMENDATION_CANDIDATE_LIMIT = int(os.getenv('RECOMMENDATION_CANDIDATE_LIMIT', '0'))
+# Number of top-ranked recommendations kept (and cached) per user
+RECOMMENDATION_CACHE_SIZE = int(os.getenv('RECOMMENDATION_CACHE_SIZE', '100'))
+# Precomputed recommendation snapshots older than this many hours are ignored (live scoring is used instead)
+RECOMMENDATION_SNAPSHOT_MAX_AGE_HOURS = int(os.getenv('RECOMMENDATION_SNAPSHOT_MAX_AGE_HOURS', '24'))
+# How opportunity keywords are matched against the user's summary: 'automaton' (one Aho-Corasick pass,
+# substring semantics), 'token' (whole tokens only) or 'substring' (legacy per-keyword scan)
+RECOMMENDATION_KEYWORD_MATCH_MODE = os.getenv('RECOMMENDATION_KEYWORD_MATCH_MODE', 'automaton')
+# Registered scorer (opportunities.scorers) used for recommendations: 'match' (full matcher formula)
+# or 'semantic' ('match' plus CV text similarity, needs `build_text_vectors`)
+RECOMMENDATION_SCORER = os.getenv('RECOMMENDATION_SCORER', 'match')
+# Hashed TF-IDF text vectors used by the 'semantic' scorer: number of hash buckets, and the directory
+# holding the memory-mapped matrix published by `build_text_vectors`
+RECOMMENDATION_TEXT_VECTOR_DIM = int(os.getenv('RECOMMENDATION_TEXT_VECTOR_DIM', '512'))
+RECOMMENDATION_TEXT_VECTOR_PATH = os.getenv('RECOMMENDATION_TEXT_VECTOR_PATH', os.path.join(BASE_DIR, 'var', 'text_vectors'))
+# Cached rankings are fresh for the soft TTL, then served stale (while one background refresh runs)
+# until the hard TTL, in seconds
+RECOMMENDATION_CACHE_SOFT_TTL = int(os.getenv('RECOMMENDATION_CACHE_SOFT_TTL', str(60 * 30)))
+RECOMMENDATION_CACHE_HARD_TTL = int(os.getenv('RECOMMENDATION_CACHE_HARD_TTL', str(60 * 60 * 2)))
+# Minimum number of seconds between two rebuilds of a worker's autocomplete index (opportunities.autocomplete)
+AUTOCOMPLETE_MIN_REBUILD_INTERVAL = int(os.getenv('AUTOCOMPLETE_MIN_REBUILD_INTERVAL', '60'))
+# Number of top-ranked scholarships kept (and cached) per scholarship profile
+SCHOLARSHIP_RECOMMENDATION_CACHE_SIZE = int(os.getenv('SCHOLARSHIP_RECOMMENDATION_CACHE_SIZE', '500'))
@@ -23,6 +23,7 @@ from rest_framework.decorators import api_view
 from rest_framework import status
 from django.db import connection
 from django.core.cache import cache
+from utils.caching import cache_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -53,6 +54,7 @@ def health_check(request):
         'status': overall_status,
         'database': db_status,
         'cache': cache_status,
+        'cache_stats': cache_stats(),
         'timestamp': settings.TIME_ZONE
     }, status=status.HTTP_200_OK if overall_status == "healthy" else status.HTTP_503_SERVICE_UNAVAILABLE)
 
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -63,6 +65,12 @@ class Job(models.Model):
             models.Index(fields=['is_remote']),
             models.Index(fields=['is_active']),
             models.Index(fields=['source']),
+            # Substring search (SearchFilter and admin icontains compare UPPER(column))
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='job_title_trgm'),
+            GinIndex(OpClass(Upper('company'), name='gin_trgm_ops'), name='job_company_trgm'),
+            GinIndex(OpClass(Upper('location'), name='gin_trgm_ops'), name='job_location_trgm'),
+            GinIndex(OpClass(Upper('skills'), name='gin_trgm_ops'), name='job_skills_trgm'),
+            GinIndex(OpClass(Upper('experience_level'), name='gin_trgm_ops'), name='job_experience_trgm'),
         ]
 
 class UserJob(models.Model):
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.models import Job
+from utils.caching import bump_generation
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_on_job_change(sender, instance, **kwargs):
+    """Job titles are autocomplete suggestions (see opportunities.autocomplete)."""
+    bump_generation('jobs')
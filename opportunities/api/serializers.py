@@ -6,6 +6,9 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from django.utils.text import slugify
 from opportunities.models import OpportunityApplication
+from opportunities.features import deferred_feature_refresh
+from opportunities.reference_data import get_category_id_by_name, get_tag_id_by_slug
+from utils.caching import deferred_generation_bump
 
 class SimpleJobSerializer(serializers.Serializer):
     company = serializers.CharField(required=True, allow_blank=False)
@@ -193,25 +196,28 @@ class BulkJobCreateSerializer(serializers.Serializer):
         return any(keyword in location_lower or keyword in description_lower
                   for keyword in remote_keywords)
 
-    def get_or_create_category(self, category_name):
-        """Get or create category by name"""
-        try:
-            return Category.objects.get(name__iexact=category_name)
-        except Category.DoesNotExist:
+    def get_or_create_category_id(self, category_name):
+        """Get or create category by name, returning its id"""
+        category_id = get_category_id_by_name(category_name)
+        if category_id is None:
             slug = slugify(category_name)
-            return Category.objects.create(name=category_name, slug=slug)
+            category_id = Category.objects.create(name=category_name, slug=slug).id
+        return category_id
 
-    def get_or_create_tags(self, skills):
-        """Get or create tags for skills"""
-        tags = []
+    def get_or_create_tag_ids(self, skills):
+        """Get or create tags for skills, returning their ids"""
+        tag_ids = []
         for skill in skills:
             slug = slugify(skill)
-            tag, created = Tag.objects.get_or_create(
-                slug=slug,
-                defaults={'name': skill}
-            )
-            tags.append(tag)
-        return tags
+            tag_id = get_tag_id_by_slug(slug)
+            if tag_id is None:
+                tag, created = Tag.objects.get_or_create(
+                    slug=slug,
+                    defaults={'name': skill}
+                )
+                tag_id = tag.id
+            tag_ids.append(tag_id)
+        return tag_ids
 
     def check_duplicate(self, title, organization, external_id=None):
         """Check if opportunity already exists"""
@@ -238,7 +244,7 @@ class BulkJobCreateSerializer(serializers.Serializer):
         )
 
         # Get or create category
-        category = self.get_or_create_category(
+        category_id = self.get_or_create_category_id(
             job_data.get('category_name', 'Technology')
         )
 
@@ -252,7 +258,7 @@ class BulkJobCreateSerializer(serializers.Serializer):
             'title': job_data['title'],
             'type': job_data.get('type', 'job'),
             'organization': job_data['organization'],
-            'category': category,
+            'category_id': category_id,
             'location': job_data['location'],
             'is_remote': is_remote,
             'description': job_data['description'],
@@ -286,7 +292,8 @@ class BulkJobCreateSerializer(serializers.Serializer):
         skipped_count = 0
         errors = []
 
-        with transaction.atomic():
+        # Feature rows are refreshed and cache generations bumped once for the whole batch
+        with transaction.atomic(), deferred_feature_refresh(), deferred_generation_bump():
             for i, job_data in enumerate(jobs_data):
                 try:
                     # Check for duplicates
@@ -311,8 +318,7 @@ class BulkJobCreateSerializer(serializers.Serializer):
 
                     # Add tags (skills)
                     if skills:
-                        tags = self.get_or_create_tags(skills)
-                        opportunity.tags.set(tags)
+                        opportunity.tags.set(self.get_or_create_tag_ids(skills))
 
                     created_opportunities.append(opportunity)
 
@@ -7,6 +7,7 @@ from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db.models import F, Count, Q, Avg, Sum
 from django.core.cache import cache
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -23,12 +24,27 @@ from .serializers import (
     JobScrapingRequestSerializer
 )
 from opportunities.matching import OpportunityMatcher
+from opportunities.snapshots import get_snapshot_recommendations
+from opportunities.incremental import schedule_batch_refresh
+from opportunities.explain import NULL_TRACE, RecommendationTrace
+from opportunities.user_profiles import get_matching_profile
+from opportunities.search import opportunity_search_filter
+from opportunities.autocomplete import KINDS as AUTOCOMPLETE_KINDS, suggestion_index
+from opportunities.facets import facet_counts, normalize_filters
+from opportunities.filtering import match_mode, skills_filter, tags_filter
+from utils.caching import TwoTierCache, get_generations, get_local_generations, key_for_generations
 from opportunities.models import Opportunity
 from rest_framework.generics import ListAPIView
 from opportunities.models import OpportunityApplication
 from opportunities.api.serializers import OpportunityApplicationSerializer
 
 
+# Serialized recommendation pages (per user) and catalog list/search pages, per worker in front of the shared cache
+recommendation_response_cache = TwoTierCache('recommendation_responses', maxsize=1000, local_ttl=30, shared_ttl=300)
+opportunity_list_cache = TwoTierCache('opportunity_lists', maxsize=500, local_ttl=30, shared_ttl=120)
+opportunity_facet_cache = TwoTierCache('opportunity_facets', maxsize=500, local_ttl=15, shared_ttl=60)
+
+
 class OpportunityPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
@@ -87,29 +103,36 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
     serializer_class = OpportunitySerializer
     pagination_class = OpportunityPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled in get_queryset (see opportunities.search), not by SearchFilter's description ILIKE
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = [
         'type', 'location', 'is_remote', 'category__slug', 'tags__slug',
         'deadline', 'experience_level'
     ]
-    search_fields = ['title', 'description', 'organization']
     ordering_fields = ['deadline', 'created_at', 'title', 'view_count']
     ordering = ['-created_at']
 
     def get_queryset(self):
-        queryset = Opportunity.objects.all()
+        # Deactivated opportunities are only reachable through the admin
+        queryset = Opportunity.objects.filter(is_active=True)
 
         search_query = self.request.query_params.get('search')
         if search_query:
             query = SearchQuery(search_query)
             queryset = queryset.annotate(rank=SearchRank(F('search_vector'), query)) \
-                            .filter(search_vector=query) \
+                            .filter(opportunity_search_filter(search_query)) \
                             .order_by('-rank')
 
+        # ?skills= and ?tags= may repeat; ?skills_mode= / ?tags_mode= choose all (default) or any of them
         skills = self.request.query_params.getlist('skills')
         if skills:
-            for skill in skills:
-                queryset = queryset.filter(skills_required__contains=[skill])
+            queryset = queryset.filter(
+                skills_filter(skills, match_mode(self.request.query_params.get('skills_mode')))
+            )
+
+        tags = self.request.query_params.getlist('tags')
+        if tags:
+            queryset = queryset.filter(tags_filter(tags, match_mode(self.request.query_params.get('tags_mode'))))
 
         education_level = self.request.query_params.get('education_level')
         if education_level:
@@ -130,6 +153,21 @@ class OpportunityViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """
+        Catalog and search pages are the same for every user, so they are cached
+        by query string until an opportunity or taxonomy change.
+        """
+        cache_key = 'opportunity_list_' + hashlib.md5(
+            json.dumps(sorted(request.query_params.lists()), sort_keys=True).encode()
+        ).hexdigest()
+        data = opportunity_list_cache.get_or_set(
+            cache_key,
+            lambda: super(OpportunityViewSet, self).list(request, *args, **kwargs).data,
+            namespaces=('opportunities', 'tags'),
+        )
+        return Response(data)
+
     def retrieve(self, request, *args, **kwargs):
         """
         When user views detail page of an opportunity, track it as applied
@@ -144,6 +182,58 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def facets(self, request):
+        """
+        Counts per type, category, experience level, remote flag and source of
+        the opportunities matching the listing filters, counted in one query and
+        cached briefly by the normalized filters.
+        """
+        cache_key = 'opportunity_facets_' + hashlib.md5(
+            json.dumps(normalize_filters(request.query_params)).encode()
+        ).hexdigest()
+        try:
+            data = opportunity_facet_cache.get_or_set(
+                cache_key,
+                lambda: facet_counts(self.filter_queryset(self.get_queryset())),
+                namespaces=('opportunities', 'tags'),
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to count facets: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return Response(data)
+
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def autocomplete(self, request):
+        """
+        Typeahead suggestions (titles, organizations, skills, tags) for ?q=,
+        answered from the in-process prefix index. ?types= restricts the kinds
+        (comma separated), ?limit= the count (at most 20).
+        """
+        prefix = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 20)
+        except ValueError:
+            limit = 10
+        kinds = [kind for kind in request.query_params.get('types', '').split(',') if kind in AUTOCOMPLETE_KINDS]
+
+        suggestions = []
+        if len(prefix) >= 2:
+            try:
+                suggestions = suggestion_index.current().suggest(prefix, limit, kinds)
+            except Exception as e:
+                return Response(
+                    {"error": f"Failed to get suggestions: {str(e)}"},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        response = Response({'query': prefix, 'suggestions': suggestions})
+        # Same answer for every user: browsers and CDNs may reuse it briefly
+        patch_cache_control(response, public=True, max_age=60)
+        return response
+
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def recommended(self, request):
         """
@@ -157,7 +247,7 @@ class OpportunityViewSet(viewsets.ModelViewSet):
                 {"error": "User profile required for recommendations"},
                 status=status.HTTP_401_UNAUTHORIZED
             )
-        user_profile = request.user.profile
+        user_profile = get_matching_profile(request.user)
         filters_dict = {}
         for param in ['type', 'location', 'category', 'experience_level']:
             val = request.query_params.get(param)
@@ -167,10 +257,12 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         tags = request.query_params.getlist('tags')
         if tags:
             filters_dict['tags'] = tags
+            filters_dict['tags_mode'] = match_mode(request.query_params.get('tags_mode'))
 
         skills = request.query_params.getlist('skills')
         if skills:
             filters_dict['skills'] = skills
+            filters_dict['skills_mode'] = match_mode(request.query_params.get('skills_mode'))
 
         deadline_after = request.query_params.get('deadline_after')
         if deadline_after:
@@ -186,19 +278,40 @@ class OpportunityViewSet(viewsets.ModelViewSet):
 
         ordering = request.query_params.get('ordering', '-score')
 
+        # Staff can pass ?explain=1 to get per-stage timings, row counts and cache states;
+        # explained requests bypass the response cache so every stage actually runs
+        explain = request.query_params.get('explain') == '1' and request.user.is_staff
+        trace = RecommendationTrace() if explain else NULL_TRACE
+
         # Build cache key
         cache_key_raw = {
             'user_id': request.user.id,
             'filters': filters_dict,
-            'ordering': ordering
+            'ordering': ordering,
+            'page': request.query_params.get('page'),
+            'page_size': request.query_params.get('page_size'),
         }
-        cache_key = 'recommendations_' + hashlib.md5(json.dumps(cache_key_raw, sort_keys=True).encode()).hexdigest()
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return self.get_paginated_response(cached_data)
-
-        matcher = OpportunityMatcher(user_profile)
-        recommendations = matcher.get_recommended_opportunities(filters=filters_dict)
+        # Versioned once, so a response computed below is stored under the generations it was computed for
+        cache_key = key_for_generations(
+            'recommendations_' + hashlib.md5(json.dumps(cache_key_raw, sort_keys=True).encode()).hexdigest(),
+            get_local_generations('opportunities', 'tags', f'profile:{request.user.id}')
+        )
+        with trace.stage('response_cache_lookup'):
+            cached_data = recommendation_response_cache.get(cache_key)
+        trace.cache_event('response', bool(cached_data))
+        if cached_data and not explain:
+            # The whole response body is cached (paginated envelope included)
+            return Response(cached_data)
+
+        # Unfiltered requests are served from the precomputed snapshot when one is fresh
+        recommendations = None
+        if not filters_dict:
+            with trace.stage('snapshot_lookup'):
+                recommendations = get_snapshot_recommendations(request.user)
+            trace.cache_event('snapshot', recommendations is not None)
+        if recommendations is None:
+            matcher = OpportunityMatcher(user_profile, trace=trace)
+            recommendations = matcher.get_recommended_opportunities(filters=filters_dict)
 
         allowed_order_fields = {'score', 'deadline', 'title'}
         reverse = ordering.startswith('-')
@@ -207,22 +320,32 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         if order_field not in allowed_order_fields:
             order_field = 'score'
 
-        recommendations = sorted(
-            recommendations,
-            key=lambda rec: rec.get(order_field) if isinstance(rec, dict) else getattr(rec, order_field, None),
-            reverse=reverse
-        )
+        with trace.stage('ordering'):
+            recommendations = sorted(
+                recommendations,
+                key=lambda rec: rec.get(order_field) if isinstance(rec, dict) else getattr(rec, order_field, None),
+                reverse=reverse
+            )
 
         page = self.paginate_queryset(recommendations)
         if page is not None:
-            serializer = OpportunityRecommendationSerializer(page, many=True)
+            with trace.stage('serialization'):
+                serializer = OpportunityRecommendationSerializer(page, many=True)
+                data = serializer.data
+            if explain:
+                response = self.get_paginated_response(data)
+                response.data['explain'] = trace.as_dict()
+                return response
+            response = self.get_paginated_response(data)
+            recommendation_response_cache.set(cache_key, response.data)
+            return response
+
+        with trace.stage('serialization'):
+            serializer = OpportunityRecommendationSerializer(recommendations, many=True)
             data = serializer.data
-            cache.set(cache_key, data, timeout=300)
-            return self.get_paginated_response(data)
-
-        serializer = OpportunityRecommendationSerializer(recommendations, many=True)
-        data = serializer.data
-        cache.set(cache_key, data, timeout=300)
+        if explain:
+            return Response({'results': data, 'explain': trace.as_dict()})
+        recommendation_response_cache.set(cache_key, data)
         return Response(data)
 
     @action(detail=True, methods=['post'])
@@ -262,11 +385,12 @@ class OpportunityViewSet(viewsets.ModelViewSet):
 
         if serializer.is_valid():
             try:
+                # Generation the cached rankings are keyed by before the import bumps it
+                since_generation, = get_generations('opportunities')
                 result = serializer.save()
 
-                # Clear recommendation cache for all users
-                cache_pattern = 'user_recommendations_*'
-                cache.delete_pattern(cache_pattern)
+                # Merged into the users' cached recommendations once committed, in the background
+                schedule_batch_refresh(result['batch_id'], since_generation)
 
                 response_data = {
                     'success': True,
@@ -586,12 +710,13 @@ class OpportunityViewSet(viewsets.ModelViewSet):
             )
 
             if serializer.is_valid():
+                # Generation the cached rankings are keyed by before the import bumps it
+                since_generation, = get_generations('opportunities')
                 with transaction.atomic():
                     result = serializer.save()
 
-                # Clear recommendation cache for all users
-                cache_pattern = 'user_recommendations_*'
-                cache.delete_pattern(cache_pattern)
+                # Merged into the users' cached recommendations once committed, in the background
+                schedule_batch_refresh(result['batch_id'], since_generation)
 
                 response_data = {
                     'success': True,
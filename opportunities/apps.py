@@ -5,3 +5,6 @@ class OpportunitiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'opportunities'
     verbose_name = 'Opportunity Matching Engine'
+
+    def ready(self):
+        from opportunities import signals  # noqa: F401
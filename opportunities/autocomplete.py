@@ -0,0 +1,156 @@
+"""
+Typeahead suggestions for the search box.
+
+Suggestions are opportunity titles, organizations and skills, tag names and
+job titles, each with the number of active postings using it. They are kept
+in one in-process sorted array of normalized (casefolded) texts: a prefix is
+a contiguous range found with two binary searches, and the best suggestions
+of that range are picked by count, so lookups never touch the database.
+
+The index records the 'opportunities', 'tags' and 'jobs' generations it was
+built from. The first request to see newer generations rebuilds it (at most
+once per AUTOCOMPLETE_MIN_REBUILD_INTERVAL seconds) while concurrent requests
+keep answering from the previous index.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from opportunities.models import Opportunity, Tag
+from utils.caching import get_generations
+
+logger = logging.getLogger(__name__)
+
+GENERATIONS = ('opportunities', 'tags', 'jobs')
+
+KINDS = ('title', 'organization', 'skill', 'tag')
+
+SKILL_COUNTS_SQL = """
+    SELECT skill, COUNT(*) FROM opportunities_opportunity, unnest(skills_required) AS skill
+    WHERE deadline >= %s AND is_active GROUP BY skill
+"""
+
+
+def normalize(text):
+    return ' '.join((text or '').casefold().split())
+
+
+class SuggestionIndex:
+    """Sorted normalized suggestion texts with their display text, kind and count."""
+
+    def __init__(self, entries, generations):
+        # entries: {(normalized, kind): [display, count]}
+        ordered = sorted(entries.items())
+        self.keys = [key for (key, _), _ in ordered]
+        self.kinds = np.array([KINDS.index(kind) for (_, kind), _ in ordered], dtype=np.uint8)
+        self.displays = [display for _, (display, _) in ordered]
+        self.counts = np.array([count for _, (_, count) in ordered], dtype=np.int64)
+        self.generations = generations
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def suggest(self, prefix, limit=10, kinds=None):
+        """Up to limit {'text', 'type', 'count'} suggestions starting with prefix, most used first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        start = bisect_left(self.keys, prefix)
+        stop = bisect_left(self.keys, prefix + '\uffff', lo=start)
+        rows = np.arange(start, stop)
+        if kinds:
+            rows = rows[np.isin(self.kinds[start:stop], [KINDS.index(kind) for kind in kinds])]
+
+        # Most used first, alphabetical on ties
+        counts = self.counts[rows]
+        if len(rows) > limit:
+            best = np.argpartition(-counts, limit - 1)[:limit]
+            rows, counts = rows[best], counts[best]
+        rows = rows[np.lexsort((rows, -counts))]
+        return [
+            {'text': self.displays[row], 'type': KINDS[self.kinds[row]], 'count': int(self.counts[row])}
+            for row in rows.tolist()
+        ]
+
+
+def build_suggestion_index(generations=None):
+    """Read every suggestion source (one grouped query each) into a SuggestionIndex."""
+    from jobs.models import Job
+
+    generations = generations or get_generations(*GENERATIONS)
+    today = timezone.now().date()
+    active = Opportunity.objects.filter(deadline__gte=today, is_active=True).order_by()
+    entries = {}
+
+    def add(kind, text, count):
+        key = normalize(text)
+        if not key:
+            return
+        entry = entries.setdefault((key, kind), [text.strip(), 0])
+        entry[1] += count
+
+    for title, count in active.values_list('title').annotate(count=Count('id')):
+        add('title', title, count)
+    jobs = Job.objects.filter(is_active=True).order_by()
+    for title, count in jobs.values_list('title').annotate(count=Count('id')):
+        add('title', title, count)
+    for organization, count in active.values_list('organization').annotate(count=Count('id')):
+        add('organization', organization, count)
+    with connection.cursor() as cursor:
+        cursor.execute(SKILL_COUNTS_SQL, [today])
+        for skill, count in cursor.fetchall():
+            add('skill', skill, count)
+    tags = Tag.objects.annotate(
+        count=Count('opportunities', filter=Q(opportunities__deadline__gte=today, opportunities__is_active=True))
+    )
+    for name, count in tags.values_list('name', 'count'):
+        add('tag', name, count)
+
+    return SuggestionIndex(entries, generations)
+
+
+class SuggestionIndexHolder:
+    """Per-process current SuggestionIndex, rebuilt when the source generations move."""
+
+    def __init__(self):
+        self.index = None
+        self.lock = threading.Lock()
+
+    def current(self):
+        generations = get_generations(*GENERATIONS)
+        index = self.index
+        if index is not None and index.generations == generations:
+            return index
+
+        min_interval = getattr(settings, 'AUTOCOMPLETE_MIN_REBUILD_INTERVAL', 60)
+        if index is not None and time.monotonic() - index.built_at < min_interval:
+            return index
+
+        # One rebuild per process at a time; other requests keep the previous index meanwhile
+        if not self.lock.acquire(blocking=index is None):
+            return index
+        try:
+            if self.index is index:
+                try:
+                    self.index = build_suggestion_index(generations)
+                except Exception as e:
+                    if index is None:
+                        raise
+                    logger.error(f"Error rebuilding autocomplete index: {str(e)}")
+                    # Retry after the rebuild interval rather than on every request
+                    index.built_at = time.monotonic()
+            return self.index
+        finally:
+            self.lock.release()
+
+
+suggestion_index = SuggestionIndexHolder()
@@ -0,0 +1,329 @@
+"""
+Vectorized scoring for OpportunityMatcher.
+
+Opportunity features are packed into NumPy arrays once per call and all
+component scores, boosts and the final 0-100 score are computed as array
+operations. The arithmetic mirrors OpportunityMatcher._score_opportunities
+step for step so both paths produce identical scores and reasons.
+"""
+from array import array
+
+import numpy as np
+from django.utils import timezone
+
+from opportunities.features import NO_REQUIREMENT, UNKNOWN_LEVEL, education_rank
+from opportunities.keyword_matching import KeywordMatcher
+from opportunities.explain import NULL_TRACE
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class Vocabulary:
+    """Maps hashable values to dense integer ids."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def add(self, value):
+        index = self.ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self.ids[value] = index
+            self.values.append(value)
+        return index
+
+    def get(self, value, default=-1):
+        return self.ids.get(value, default)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def pack_bitsets(rows, width):
+    """Pack a list of id lists into a (len(rows), ceil(width / 8)) uint8 bitset matrix."""
+    lengths = np.fromiter((len(ids) for ids in rows), dtype=np.int64, count=len(rows))
+    columns = np.fromiter((i for ids in rows for i in ids), dtype=np.int64, count=int(lengths.sum()))
+    return pack_flat_bitsets(lengths, columns, width)
+
+
+def pack_flat_bitsets(lengths, columns, width):
+    """pack_bitsets for id lists given flattened: row i owns the next lengths[i] entries of columns."""
+    bits = np.zeros((len(lengths), max(1, (width + 7) // 8)), dtype=np.uint8)
+    if len(columns):
+        row_index = np.repeat(np.arange(len(lengths)), lengths)
+        masks = (0x80 >> (columns & 7)).astype(np.uint8)
+        np.bitwise_or.at(bits, (row_index, columns >> 3), masks)
+    return bits
+
+
+def pack_user_bitset(ids, width):
+    """Pack a single id list into a bitset row compatible with pack_bitsets."""
+    return pack_bitsets([[i for i in ids if i >= 0]], width)[0]
+
+
+def popcount(bits):
+    """Number of set bits per row of a packed bitset matrix."""
+    return _POPCOUNT[bits].sum(axis=1, dtype=np.int64)
+
+
+def _as_float(value):
+    return np.nan if value is None else float(value)
+
+
+def _as_array(buffer, dtype):
+    """Copy a typed array.array buffer into a NumPy array of dtype."""
+    return np.frombuffer(buffer, dtype=buffer.typecode).astype(dtype)
+
+
+class OpportunityFeatureMatrix:
+    """
+    Column-oriented, array-backed feature set for a batch of opportunities.
+
+    `features` is consumed in a single pass, so it can be the row stream of
+    load_opportunity_features: each row is appended to compact typed buffers
+    and dropped, and peak memory is the columns themselves rather than one
+    dict per opportunity.
+    """
+
+    def __init__(self, features):
+        self.skill_vocab = Vocabulary()
+        self.keyword_vocab = Vocabulary()
+        self.location_vocab = Vocabulary()
+        self.type_vocab = Vocabulary()
+        self.category_vocab = Vocabulary()
+        self.nationality_vocab = Vocabulary()
+
+        ids, created_ordinals = array('q'), array('q')
+        skill_ids, skill_lengths = array('q'), array('q')
+        keyword_ids, keyword_lengths = array('q'), array('q')
+        nationality_ids, nationality_lengths = array('q'), array('q')
+        location_codes, type_codes, category_codes, education_ranks = array('q'), array('q'), array('q'), array('q')
+        min_ages, max_ages = array('d'), array('d')
+        is_remote, is_featured, has_experience_level = array('b'), array('b'), array('b')
+
+        for f in features:
+            ids.append(f['id'])
+            skill_ids.extend(self.skill_vocab.add(s) for s in f['skills'])
+            skill_lengths.append(len(f['skills']))
+            keyword_ids.extend(self.keyword_vocab.add(k) for k in f['keywords'])
+            keyword_lengths.append(len(f['keywords']))
+            location_codes.append(self.location_vocab.add(f['location']))
+            is_remote.append(bool(f['is_remote']))
+            type_codes.append(self.type_vocab.add(f['type']))
+            category_codes.append(self.category_vocab.add(f['category_slug']))
+            education_ranks.append(f['education_rank'])
+            min_ages.append(_as_float(f['min_age']))
+            max_ages.append(_as_float(f['max_age']))
+            nationality_ids.extend(self.nationality_vocab.add(v) for v in f['nationalities'])
+            nationality_lengths.append(len(f['nationalities']))
+            is_featured.append(bool(f['is_featured']))
+            has_experience_level.append(bool(f['experience_level']))
+            created_ordinals.append(f['created_date'].toordinal())
+
+        n = len(ids)
+        self.size = n
+        self.ids = _as_array(ids, np.int64)
+
+        self.skill_bits = pack_flat_bitsets(
+            _as_array(skill_lengths, np.int64), _as_array(skill_ids, np.int64), len(self.skill_vocab)
+        )
+        self.skill_counts = popcount(self.skill_bits)
+
+        self.keyword_counts = _as_array(keyword_lengths, np.int64)
+        self.keyword_rows = np.repeat(np.arange(n), self.keyword_counts)
+        self.keyword_ids = _as_array(keyword_ids, np.int64)
+
+        self.location_codes = _as_array(location_codes, np.int64)
+        self.is_remote = _as_array(is_remote, bool)
+
+        self.type_codes = _as_array(type_codes, np.int64)
+        self.category_codes = _as_array(category_codes, np.int64)
+
+        self.education_ranks = _as_array(education_ranks, np.int64)
+        self.min_ages = _as_array(min_ages, np.float64)
+        self.max_ages = _as_array(max_ages, np.float64)
+
+        nationality_lengths = _as_array(nationality_lengths, np.int64)
+        self.nationality_bits = pack_flat_bitsets(
+            nationality_lengths, _as_array(nationality_ids, np.int64), len(self.nationality_vocab)
+        )
+        self.nationality_restricted = nationality_lengths > 0
+
+        self.is_featured = _as_array(is_featured, bool)
+        self.has_experience_level = _as_array(has_experience_level, bool)
+        self.created_ordinals = _as_array(created_ordinals, np.int64)
+
+
+class BatchScorer:
+    """Scores a whole OpportunityFeatureMatrix against one user profile."""
+
+    def __init__(self, weights, default_keyword_score, keyword_match_mode='automaton'):
+        self.weights = weights
+        self.default_keyword_score = default_keyword_score
+        self.keyword_match_mode = keyword_match_mode
+
+    def skills_scores(self, matrix, user_skills):
+        user_bits = pack_user_bitset(
+            [matrix.skill_vocab.get(s) for s in user_skills], len(matrix.skill_vocab)
+        )
+        overlap = popcount(matrix.skill_bits & user_bits)
+        counts = matrix.skill_counts
+        return np.where(counts == 0, 1.0, overlap / np.maximum(counts, 1))
+
+    def location_scores(self, matrix, user_location):
+        hits = np.fromiter(
+            (bool(loc) and loc in user_location for loc in matrix.location_vocab.values),
+            dtype=bool, count=len(matrix.location_vocab)
+        )
+        matched = matrix.is_remote | hits[matrix.location_codes]
+        return np.where(matched, 1.0, 0.2)
+
+    def eligibility(self, matrix, user_education):
+        eligible = np.ones(matrix.size, dtype=bool)
+        ranks = matrix.education_ranks
+
+        user_level = user_education.get('highest_level')
+        if user_level:
+            user_rank = education_rank(user_level)
+            if user_rank == UNKNOWN_LEVEL:
+                eligible &= ranks == NO_REQUIREMENT
+            else:
+                eligible &= (ranks != UNKNOWN_LEVEL) & ~((ranks >= 0) & (user_rank < ranks))
+
+        user_age = user_education.get('age')
+        if user_age is not None:
+            with np.errstate(invalid='ignore'):
+                eligible &= ~(user_age < matrix.min_ages)
+                eligible &= ~(user_age > matrix.max_ages)
+
+        nationality_id = matrix.nationality_vocab.get(user_education.get('nationality'))
+        if nationality_id >= 0:
+            has_nationality = (matrix.nationality_bits[:, nationality_id >> 3] & (0x80 >> (nationality_id & 7))) != 0
+        else:
+            has_nationality = np.zeros(matrix.size, dtype=bool)
+        eligible &= ~matrix.nationality_restricted | has_nationality
+
+        return eligible
+
+    def preference_scores(self, matrix, preferences):
+        type_match = matrix.type_codes == matrix.type_vocab.get(preferences.get('preferred_type'))
+        category_match = matrix.category_codes == matrix.category_vocab.get(preferences.get('preferred_category'))
+        return np.where(type_match, 0.5, 0.0) + np.where(category_match, 0.5, 0.0)
+
+    def experience_scores(self, matrix, summary_text, rows=None):
+        """
+        Keyword overlap scores. When `rows` (a boolean mask) is given, only the
+        keywords of those rows are tested and the other rows score 0.
+        """
+        if not summary_text:
+            return np.zeros(matrix.size)
+
+        keyword_rows, keyword_ids = matrix.keyword_rows, matrix.keyword_ids
+        if rows is not None:
+            selected = rows[keyword_rows]
+            keyword_rows, keyword_ids = keyword_rows[selected], keyword_ids[selected]
+
+        hits = np.zeros(len(matrix.keyword_vocab), dtype=bool)
+        needed = np.unique(keyword_ids)
+        keyword_matcher = KeywordMatcher(summary_text, self.keyword_match_mode)
+        hits[needed] = keyword_matcher.match_all(matrix.keyword_vocab.values[i] for i in needed.tolist())
+        matches = np.bincount(keyword_rows, weights=hits[keyword_ids], minlength=matrix.size)
+        counts = matrix.keyword_counts
+        return np.where(counts == 0, self.default_keyword_score, matches / np.maximum(counts, 1))
+
+    def experience_bounds(self, matrix, summary_text):
+        """Lowest and highest experience score each row can reach."""
+        if not summary_text:
+            zeros = np.zeros(matrix.size)
+            return zeros, zeros
+        no_keywords = matrix.keyword_counts == 0
+        return (
+            np.where(no_keywords, self.default_keyword_score, 0.0),
+            np.where(no_keywords, self.default_keyword_score, 1.0),
+        )
+
+    def final_scores(self, matrix, total):
+        """Apply the featured and recency boosts and clamp to a 0-100 integer score."""
+        # Apply boosts
+        total = np.where(matrix.is_featured, total * 1.1, total)
+
+        days_old = timezone.now().date().toordinal() - matrix.created_ordinals
+        recency_boost = np.maximum(0, 1 - (days_old / 30))
+        total = total * (1 + recency_boost * 0.1)
+
+        return np.minimum(100, np.floor(total * 100)).astype(np.int64)
+
+    def score(self, matrix, user_profile, top_k=None, trace=NULL_TRACE, extra_components=None):
+        """
+        Returns a dict of arrays: the final scores plus each component score, and
+        `selected`, the row indexes in ranking order (score desc, row order on ties).
+
+        extra_components maps additional component names to precomputed 0-1
+        score arrays; each is added to the total with its weight.
+
+        With top_k, experience scoring only runs for rows whose upper bound can
+        reach the k-th best lower bound; `selected` then holds the top_k rows.
+        """
+        with trace.stage('scoring.skills'):
+            skills = self.skills_scores(matrix, set(user_profile.skills))
+        with trace.stage('scoring.location'):
+            location = self.location_scores(matrix, user_profile.location.lower())
+        with trace.stage('scoring.education'):
+            education = self.eligibility(matrix, user_profile.education).astype(np.float64)
+        with trace.stage('scoring.preferences'):
+            preferences = self.preference_scores(matrix, user_profile.preferences)
+
+        partial = (
+            self.weights['skills_match'] * skills +
+            self.weights['location_match'] * location +
+            self.weights['education_match'] * education +
+            self.weights['preferences_match'] * preferences
+        )
+        for name, values in (extra_components or {}).items():
+            partial = partial + self.weights[name] * values
+        experience_weight = self.weights['experience_match']
+
+        survivors = None
+        if top_k is not None and top_k < matrix.size:
+            with trace.stage('scoring.pruning'):
+                lowest, highest = self.experience_bounds(matrix, user_profile.summary)
+                lower = self.final_scores(matrix, partial + experience_weight * lowest)
+                upper = self.final_scores(matrix, partial + experience_weight * highest)
+                threshold = np.partition(lower, matrix.size - top_k)[matrix.size - top_k]
+                survivors = upper >= threshold
+            trace.count('rows_after_pruning', int(survivors.sum()))
+
+        with trace.stage('scoring.experience'):
+            experience = self.experience_scores(matrix, user_profile.summary, rows=survivors)
+        with trace.stage('scoring.boosts'):
+            scores = self.final_scores(matrix, partial + experience_weight * experience)
+            if survivors is not None:
+                scores = np.where(survivors, scores, -1)
+
+        with trace.stage('top_k_selection'):
+            selected = np.lexsort((np.arange(matrix.size), -scores))
+            if top_k is not None:
+                selected = selected[:top_k]
+
+        return {
+            'score': scores,
+            'selected': selected,
+            'skills_match': skills,
+            'location_match': location,
+            'education_match': education,
+            'preference_match': preferences,
+            'experience_match': experience,
+            **(extra_components or {}),
+        }
+
+    @staticmethod
+    def reasons(components, index):
+        """Build the `reasons` dict for a single row, matching the per-row scorer."""
+        return {
+            'skills_match': round(float(components['skills_match'][index]) * 100),
+            'location_match': round(float(components['location_match'][index]) * 100),
+            'eligibility': "Eligible" if components['education_match'][index] else "Not eligible",
+            'preference_match': round(float(components['preference_match'][index]) * 100),
+            'experience_match': round(float(components['experience_match'][index]) * 100),
+        }
@@ -0,0 +1,78 @@
+"""
+Candidate retrieval for the recommendation engine.
+
+Most opportunities share no skills with a given user and can never reach the
+top of the ranking, so instead of scoring the whole catalog the matcher first
+pulls a bounded candidate set from the GIN-indexed skill/keyword postings on
+OpportunityFeature, plus featured, remote and skill-less items which can score
+well without any overlap.
+
+Retrieval is lossy when more rows match than the limit, so it is off by
+default (RECOMMENDATION_CANDIDATE_LIMIT=0); check the recall on real
+profiles with `measure_candidate_recall` before enabling it.
+"""
+from functools import reduce
+from operator import add
+
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+def candidate_filter(user_skills):
+    """Q object matching opportunities that can score well for these skills."""
+    skills = sorted(set(user_skills))
+    keywords = sorted({word.lower() for skill in skills for word in skill.split()})
+    return (
+        Q(features__skills__overlap=skills) |
+        Q(features__keywords__overlap=keywords) |
+        Q(features__skills=[]) |
+        Q(features__is_featured=True) |
+        Q(features__is_remote=True)
+    )
+
+
+def _overlap_count(field, values):
+    """Number of the values contained in the array field (one CASE per value)."""
+    if not values:
+        return Value(0)
+    return reduce(add, (
+        Case(When(**{f'{field}__contains': [value]}, then=Value(1)), default=Value(0), output_field=IntegerField())
+        for value in values
+    ))
+
+
+def candidate_ids(queryset, user_skills, limit):
+    """
+    Return at most `limit` opportunity ids from the queryset: posting-list
+    matches first, by number of shared skills then keywords (featured and
+    newest first on ties), topped up with the newest non-matching rows when
+    there are fewer matches than the limit.
+    """
+    skills = sorted(set(user_skills))
+    keywords = sorted({word.lower() for skill in skills for word in skill.split()})
+    matches = queryset.filter(candidate_filter(user_skills))
+    ids = list(
+        matches.annotate(
+            skill_overlap=_overlap_count('features__skills', skills),
+            keyword_overlap=_overlap_count('features__keywords', keywords),
+        )
+        .order_by('-skill_overlap', '-keyword_overlap', '-features__is_featured', '-created_at')
+        .values_list('id', flat=True)[:limit]
+    )
+
+    if len(ids) < limit:
+        ids += list(
+            queryset.exclude(pk__in=matches.values('pk'))
+            .order_by('-created_at')
+            .values_list('id', flat=True)[:limit - len(ids)]
+        )
+
+    return ids
+
+
+def ranking_recall(full_results, candidate_results, k=20):
+    """Fraction of the full-scan top-k that the candidate-based ranking also returns in its top-k."""
+    expected = {row['opportunity'].id for row in full_results[:k]}
+    if not expected:
+        return 1.0
+    actual = {row['opportunity'].id for row in candidate_results[:k]}
+    return len(expected & actual) / len(expected)
@@ -0,0 +1,63 @@
+"""
+Per-stage timing and counters for recommendation calls.
+
+OpportunityMatcher, the scorers and OpportunityViewSet.recommended record
+into a RecommendationTrace when a staff user requests `?explain=1`; in normal
+requests they record into NULL_TRACE, which does nothing.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class RecommendationTrace:
+    """Collects stage timings (ms), row counts and cache hit/miss states."""
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = {}
+        self.counts = {}
+        self.cache = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def count(self, name, value):
+        self.counts[name] = value
+
+    def cache_event(self, name, hit):
+        """Record a hit/miss flag, or a state name such as 'stale' or 'lock_wait'."""
+        self.cache[name] = hit if isinstance(hit, str) else ('hit' if hit else 'miss')
+
+    def as_dict(self):
+        return {
+            'timings_ms': {name: round(value, 3) for name, value in self.timings.items()},
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'row_counts': self.counts,
+            'cache': self.cache,
+        }
+
+
+class NullTrace:
+    """Trace that records nothing."""
+
+    enabled = False
+
+    def stage(self, name):
+        return nullcontext()
+
+    def count(self, name, value):
+        pass
+
+    def cache_event(self, name, hit):
+        pass
+
+
+NULL_TRACE = NullTrace()
@@ -0,0 +1,71 @@
+"""
+Facet counts for the opportunity listing.
+
+All facets are counted in one statement: the filtered listing queryset
+(projected to the facet columns) is grouped by GROUPING SETS, one set per
+facet plus the empty set for the total. GROUPING() tells which set a result
+row belongs to, so a NULL facet value is not mistaken for a set's filler.
+"""
+from django.db import connection
+from django.db.models import F
+
+# Facet name -> listing column (category facets by slug, the value the ?category__slug= filter takes)
+FACET_FIELDS = {
+    'type': 'type',
+    'category': 'category__slug',
+    'experience_level': 'experience_level',
+    'is_remote': 'is_remote',
+    'source': 'source',
+}
+
+# Query parameters that only page or order the listing and do not change the counts
+NON_FILTER_PARAMS = ('page', 'page_size', 'ordering')
+
+
+def normalize_filters(query_params):
+    """Sorted (name, sorted non-empty values) pairs of the parameters that filter the listing."""
+    filters = []
+    for name, values in query_params.lists():
+        values = sorted({value.strip() for value in values if value.strip()})
+        if name not in NON_FILTER_PARAMS and values:
+            filters.append((name, values))
+    return sorted(filters)
+
+
+def facet_counts(queryset):
+    """
+    Return {'total': n, 'facets': {facet: [{'value', 'count'}, ...]}} for the
+    queryset, values by count descending, in one query.
+    """
+    columns = [f'facet_{name}' for name in FACET_FIELDS]
+    # distinct() on the primary key: tag and skill joins must not count an opportunity twice
+    rows = queryset.order_by().values(
+        'pk', **{column: F(path) for column, path in zip(columns, FACET_FIELDS.values())}
+    ).distinct()
+    inner_sql, params = rows.query.sql_with_params()
+
+    quoted = [connection.ops.quote_name(column) for column in columns]
+    sql = (
+        f"SELECT GROUPING({', '.join(quoted)}), {', '.join(quoted)}, COUNT(*) "
+        f"FROM ({inner_sql}) AS filtered "
+        f"GROUP BY GROUPING SETS ({', '.join(f'({column})' for column in quoted)}, ())"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        result = cursor.fetchall()
+
+    # GROUPING() sets one bit per column left out of the set, the first column being the highest bit
+    all_bits = (1 << len(columns)) - 1
+    set_facet = {all_bits ^ (1 << (len(columns) - 1 - i)): (i, name) for i, name in enumerate(FACET_FIELDS)}
+
+    total = 0
+    facets = {name: [] for name in FACET_FIELDS}
+    for grouping, *values, count in result:
+        if grouping == all_bits:
+            total = count
+            continue
+        i, name = set_facet[grouping]
+        facets[name].append({'value': values[i], 'count': count})
+    for buckets in facets.values():
+        buckets.sort(key=lambda bucket: (-bucket['count'], str(bucket['value'])))
+    return {'total': total, 'facets': facets}
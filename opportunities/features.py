@@ -0,0 +1,174 @@
+"""
+Per-opportunity matching features.
+
+The derived data the matcher needs for every opportunity (deduplicated skills,
+title and tag keyword tokens, education rank, age bounds, nationality sets...)
+is persisted in OpportunityFeature and refreshed whenever an opportunity is
+written, so recommendation requests read one compact row per opportunity
+instead of full rows plus tag joins.
+"""
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from config.constants import EDUCATION_LEVEL_ORDER
+from opportunities.text_vectors import current_vectorizer, opportunity_text
+
+NO_REQUIREMENT = -1
+UNKNOWN_LEVEL = -2
+
+FEATURE_FIELDS = [
+    'skills', 'keywords', 'location', 'is_remote', 'type', 'category_slug',
+    'education_rank', 'min_age', 'max_age', 'nationalities', 'is_featured',
+    'created_date', 'deadline', 'experience_level',
+]
+FEATURE_KEYS = ['id'] + FEATURE_FIELDS
+
+# Opportunity fields the features are derived from
+FEATURE_SOURCE_FIELDS = {
+    'title', 'skills_required', 'location', 'is_remote', 'type', 'category',
+    'category_id', 'eligibility_criteria', 'is_featured', 'created_at', 'deadline',
+    'experience_level', 'description',
+}
+
+_local = threading.local()
+
+
+def education_rank(level):
+    """Rank of an education level, NO_REQUIREMENT when empty, UNKNOWN_LEVEL when unrecognised."""
+    if not level:
+        return NO_REQUIREMENT
+    try:
+        return EDUCATION_LEVEL_ORDER.index(level)
+    except ValueError:
+        return UNKNOWN_LEVEL
+
+
+def extract_features(opportunity):
+    """
+    Derive the scoring features of a single Opportunity instance.
+    Tags should be prefetched and category selected to avoid per-row queries.
+    """
+    criteria = opportunity.eligibility_criteria or {}
+    keywords = set(opportunity.title.lower().split())
+    for tag in opportunity.tags.all():
+        keywords.update(word.lower() for word in tag.name.split())
+
+    nationalities = criteria.get('nationalities') or []
+    if isinstance(nationalities, str):
+        nationalities = [nationalities]
+
+    return {
+        'id': opportunity.id,
+        'skills': sorted(set(opportunity.skills_required or [])),
+        'keywords': sorted(keywords),
+        'location': (opportunity.location or '').lower(),
+        'is_remote': opportunity.is_remote,
+        'type': opportunity.type,
+        'category_slug': opportunity.category.slug,
+        'education_rank': education_rank(criteria.get('education_level')),
+        'min_age': criteria.get('min_age'),
+        'max_age': criteria.get('max_age'),
+        'nationalities': sorted(set(nationalities)),
+        'is_featured': opportunity.is_featured,
+        'created_date': opportunity.created_at.date(),
+        'deadline': opportunity.deadline,
+        'experience_level': opportunity.experience_level or '',
+    }
+
+
+def refresh_opportunity_features(opportunity_ids):
+    """Rebuild and upsert the feature rows for the given opportunity ids."""
+    from opportunities.models import Opportunity, OpportunityFeature
+
+    opportunities = Opportunity.objects.filter(pk__in=list(opportunity_ids)) \
+        .select_related('category').prefetch_related('tags')
+
+    vectorizer = current_vectorizer()
+    rows = []
+    for opportunity in opportunities:
+        features = extract_features(opportunity)
+        vector = vectorizer.transform(opportunity_text(opportunity))
+        rows.append(OpportunityFeature(opportunity_id=features.pop('id'), text_vector=vector.tobytes(), **features))
+
+    OpportunityFeature.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['opportunity'],
+        update_fields=FEATURE_FIELDS + ['text_vector', 'updated_at'],
+    )
+    # The published vector matrix is immutable: semantic_scores reads these rows from text_vector
+    # until the next build_text_vectors
+    return len(rows)
+
+
+@contextmanager
+def deferred_feature_refresh():
+    """
+    Collect feature refreshes scheduled inside the block and run them as one
+    bulk refresh on exit. Nested blocks join the outermost one.
+    """
+    if getattr(_local, 'pending', None) is not None:
+        yield
+        return
+
+    _local.pending = set()
+    try:
+        yield
+        pending = _local.pending
+    finally:
+        _local.pending = None
+
+    if pending:
+        refresh_opportunity_features(pending)
+
+
+def schedule_feature_refresh(opportunity_ids):
+    """Refresh features now, or at the end of the enclosing deferred_feature_refresh block."""
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        pending.update(opportunity_ids)
+    else:
+        refresh_opportunity_features(opportunity_ids)
+
+
+def ensure_opportunity_features(queryset):
+    """Build the feature rows missing for opportunities of the queryset."""
+    missing = list(queryset.filter(features__isnull=True).values_list('id', flat=True))
+    if missing:
+        refresh_opportunity_features(missing)
+    return len(missing)
+
+
+def _extract_missing_features(opportunity_ids):
+    from opportunities.models import Opportunity
+
+    opportunities = Opportunity.objects.filter(pk__in=opportunity_ids) \
+        .select_related('category').prefetch_related('tags')
+    return {opportunity.id: extract_features(opportunity) for opportunity in opportunities}
+
+
+def load_opportunity_features(queryset, chunk_size=2000):
+    """
+    Yield the feature dict of every opportunity in the queryset, ordered by id.
+    Only feature columns are selected and streamed through a server-side cursor,
+    so callers such as OpportunityFeatureMatrix never hold one dict per row.
+    Rows without features are derived in memory, one query per chunk; this is
+    a read path, so backfilling is left to the write hooks and
+    rebuild_opportunity_features.
+    """
+    columns = ['features__' + field for field in FEATURE_FIELDS]
+    created_date = 1 + FEATURE_FIELDS.index('created_date')
+    rows = queryset.prefetch_related(None).order_by('id').values_list('id', *columns).iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        missing = [row[0] for row in chunk if row[created_date] is None]
+        extracted = _extract_missing_features(missing) if missing else {}
+        for row in chunk:
+            if row[created_date] is not None:
+                yield dict(zip(FEATURE_KEYS, row))
+            elif row[0] in extracted:
+                yield extracted[row[0]]
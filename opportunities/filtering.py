@@ -0,0 +1,50 @@
+"""
+Skill and tag filters shared by the listing and the recommendation matcher.
+
+However many skills or tags are requested, each filter is a single
+predicate:
+- skills: one array comparison on skills_required, `@>` (contains all) or
+  `&&` (overlaps, any), both served by the opportunity_skills_gin index;
+- tags: one EXISTS over the tag through table. "any" needs a matching row,
+  "all" a group of matching rows covering every requested slug. Chaining
+  tags__slug filters instead adds one pair of joins per tag and multiplies
+  the rows the planner carries through them.
+"""
+from django.db.models import Count, Exists, OuterRef, Q
+
+from opportunities.models import Opportunity
+
+MATCH_MODES = ('all', 'any')
+
+
+def match_mode(value, default='all'):
+    """The requested any/all mode, or the default for a missing or unknown value."""
+    value = (value or '').strip().lower()
+    return value if value in MATCH_MODES else default
+
+
+def _distinct(values):
+    return sorted({value.strip() for value in values if value and value.strip()})
+
+
+def skills_filter(skills, mode='all'):
+    """Q matching opportunities requiring all (or, in 'any' mode, at least one) of the skills."""
+    skills = _distinct(skills)
+    if not skills:
+        return Q()
+    if mode == 'any':
+        return Q(skills_required__overlap=skills)
+    return Q(skills_required__contains=skills)
+
+
+def tags_filter(slugs, mode='all'):
+    """Q matching opportunities tagged with all (or, in 'any' mode, at least one) of the tag slugs."""
+    slugs = _distinct(slugs)
+    if not slugs:
+        return Q()
+    tagged = Opportunity.tags.through.objects.filter(opportunity=OuterRef('pk'), tag__slug__in=slugs)
+    if mode == 'all' and len(slugs) > 1:
+        tagged = tagged.values('opportunity').annotate(
+            matched=Count('tag', distinct=True)
+        ).filter(matched=len(slugs))
+    return Q(Exists(tagged))
@@ -0,0 +1,181 @@
+"""
+Incremental recommendation refresh after bulk imports.
+
+Instead of throwing every user's cached ranking away when a batch of
+opportunities is imported, only the new opportunities (one import_batch_id)
+are scored against each user and merged into the cached top-K and the stored
+RecommendationSnapshot, dropping entries that expired or were deleted. An
+import of n opportunities costs O(users x n) instead of O(users x catalog).
+
+Cached rankings are versioned by the 'opportunities' generation, which the
+import itself bumps. When the import was the only bump since the ranking was
+cached (the generation moved by exactly one), the merged ranking is stored
+under the new generation; otherwise other edits happened meanwhile and the
+rankings are left to be recomputed.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from opportunities.batch_scoring import OpportunityFeatureMatrix
+from opportunities.features import load_opportunity_features
+from opportunities.matching import recommendation_cache, recommendation_cache_key
+from opportunities.models import Opportunity, RecommendationSnapshot
+from opportunities.packing import pack_entries, unpack_entries
+from opportunities.scorers import get_recommendation_plan
+from opportunities.user_profiles import get_matching_profile
+from utils.caching import get_generations
+from users.models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+def merge_ranking(entries, new_entries, active_ids, cache_size, entry_id):
+    """
+    Merge newly scored entries into a cached ranking (best first).
+
+    Entries whose opportunity is no longer active are dropped. A ranking with
+    at least `cache_size` entries is a truncated top-K: rows below its last
+    score were never stored, so after drops only the part scoring at least that
+    much is known to be exact. Returns None when that part is too short to be
+    told apart from a complete ranking; the caller then discards the entry.
+    """
+    new_ids = {entry_id(entry) for entry in new_entries}
+    kept = [entry for entry in entries if entry_id(entry) in active_ids and entry_id(entry) not in new_ids]
+    merged = sorted(kept + new_entries, key=lambda entry: entry['score'], reverse=True)
+
+    if len(entries) < cache_size:
+        return merged[:cache_size]
+
+    cutoff = entries[-1]['score']
+    exact = [entry for entry in merged if entry['score'] >= cutoff]
+    if len(exact) < cache_size:
+        return None
+    return exact[:len(entries)]
+
+
+def refresh_recommendations_for_batch(import_batch_id, chunk_size=500, since_generation=None):
+    """
+    Score the opportunities of one import batch for every user holding a cached
+    ranking or snapshot and merge them in. since_generation is the
+    'opportunities' generation read before the import (see the module
+    docstring). Returns counts of updated and discarded rankings.
+    """
+    cache_size = getattr(settings, 'RECOMMENDATION_CACHE_SIZE', 100)
+    plan = get_recommendation_plan()
+    today = timezone.now().date()
+
+    # The batch is scored with the vectorized scorer: its features are loaded once for all users
+    matrix = OpportunityFeatureMatrix(load_opportunity_features(
+        Opportunity.objects.filter(import_batch_id=import_batch_id, deadline__gte=today, is_active=True)
+    ))
+    stats = {'updated': 0, 'discarded': 0}
+    if not matrix.size:
+        return stats
+
+    current_generation, = get_generations('opportunities')
+    source_generation = None
+    if since_generation is not None and current_generation == since_generation + 1:
+        source_generation = since_generation
+
+    profiles = UserProfile.objects.select_related('user').order_by('user_id')
+    for start in range(0, profiles.count(), chunk_size):
+        chunk = list(profiles[start:start + chunk_size])
+        keys = {profile.user_id: recommendation_cache_key(profile.user_id, plan.scorer.name) for profile in chunk}
+        source_keys = {
+            profile.user_id: recommendation_cache_key(profile.user_id, plan.scorer.name, source_generation)
+            for profile in chunk
+        }
+        cached = {
+            key: unpack_entries(packed)
+            for key, packed in recommendation_cache.get_many(list(source_keys.values())).items()
+        }
+        snapshots = RecommendationSnapshot.objects.in_bulk([profile.user_id for profile in chunk])
+
+        referenced = {entry['opportunity_id'] for entries in cached.values() for entry in entries}
+        referenced.update(entry['opportunity_id'] for snapshot in snapshots.values() for entry in snapshot.entries)
+        active_ids = set(
+            Opportunity.objects.filter(pk__in=referenced, deadline__gte=today, is_active=True)
+            .values_list('id', flat=True)
+        )
+
+        updated_cache = {}
+        discarded_keys = []
+        updated_snapshots = []
+        for profile in chunk:
+            key, source_key = keys[profile.user_id], source_keys[profile.user_id]
+            snapshot = snapshots.get(profile.user_id)
+            if source_key not in cached and snapshot is None:
+                continue
+
+            try:
+                components = plan.score_matrix(matrix, get_matching_profile(profile.user), top_k=min(cache_size, matrix.size))
+            except Exception as e:
+                logger.error(f"Error scoring import batch {import_batch_id} for user {profile.user_id}: {str(e)}")
+                continue
+
+            new_entries = [
+                {
+                    'opportunity_id': int(matrix.ids[row]),
+                    'score': components['score'][row].item(),
+                    'reasons': plan.reasons(components, row),
+                }
+                for row in components['selected'].tolist()
+            ]
+
+            if source_key in cached:
+                merged = merge_ranking(
+                    cached[source_key], new_entries, active_ids, cache_size,
+                    lambda entry: entry['opportunity_id']
+                )
+                if merged is None:
+                    stats['discarded'] += 1
+                else:
+                    updated_cache[key] = pack_entries(merged)
+                    stats['updated'] += 1
+                if merged is None or source_key != key:
+                    discarded_keys.append(source_key)
+
+            if snapshot is not None:
+                merged = merge_ranking(
+                    snapshot.entries, new_entries, active_ids, cache_size,
+                    lambda entry: entry['opportunity_id']
+                )
+                if merged is None:
+                    snapshot.delete()
+                    stats['discarded'] += 1
+                else:
+                    snapshot.entries = merged
+                    updated_snapshots.append(snapshot)
+                    stats['updated'] += 1
+
+        recommendation_cache.set_many(updated_cache)
+        recommendation_cache.delete_many(discarded_keys)
+        RecommendationSnapshot.objects.bulk_update(updated_snapshots, ['entries'])
+
+    return stats
+
+
+def _refresh_in_background(import_batch_id, since_generation):
+    try:
+        stats = refresh_recommendations_for_batch(import_batch_id, since_generation=since_generation)
+        logger.info(f"Refreshed recommendations for import batch {import_batch_id}: {stats}")
+    except Exception as e:
+        # The imported rows are committed; the batch can be merged again with refresh_batch_recommendations
+        logger.error(f"Error refreshing recommendations for import batch {import_batch_id}: {str(e)}")
+    finally:
+        close_old_connections()
+
+
+def schedule_batch_refresh(import_batch_id, since_generation=None):
+    """
+    Merge an import batch into the cached rankings once the import has
+    committed, in a background thread: the refresh walks every UserProfile and
+    must neither hold up nor fail the import request.
+    """
+    transaction.on_commit(lambda: threading.Thread(
+        target=_refresh_in_background, args=(import_batch_id, since_generation), daemon=True
+    ).start())
@@ -0,0 +1,142 @@
+"""
+Keyword matching against a user's summary for experience scoring.
+
+The summary is preprocessed once per request into a KeywordMatcher, which
+answers "does this opportunity keyword occur in the summary" for every
+keyword of every opportunity without rescanning the summary each time:
+
+- 'automaton' (default): all keywords are compiled into an Aho-Corasick
+  automaton and found in a single pass over the distinct words of the
+  summary. Same results as substring matching.
+- 'token': a keyword matches only when it is a whole token of the summary.
+- 'substring': the original `keyword in summary` check per keyword, kept
+  for compatibility and benchmarking.
+"""
+from collections import deque
+
+MATCH_MODES = ('automaton', 'token', 'substring')
+
+_TOKEN_PUNCTUATION = '.,;:!?()[]{}"\''
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (dict-based trie with failure links)."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        # Closest proper suffix state that ends a pattern (output link)
+        self.output_link = [-1]
+        self.output = [-1]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output_link.append(-1)
+                    self.output.append(-1)
+                state = next_state
+            self.output[state] = index
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                link = self.fail[next_state]
+                self.output_link[next_state] = link if self.output[link] >= 0 else self.output_link[link]
+
+    def find(self, text):
+        """Return the set of pattern indexes occurring anywhere in text."""
+        return self.find_in_segments([text])
+
+    def find_in_segments(self, segments):
+        """Return the set of pattern indexes occurring inside any of the segments."""
+        goto, fail = self.goto, self.fail
+        visited = set()
+        for segment in segments:
+            state = 0
+            for char in segment:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                visited.add(state)
+
+        found = set()
+        seen = set()
+        for state in visited:
+            while state > 0 and state not in seen:
+                seen.add(state)
+                if self.output[state] >= 0:
+                    found.add(self.output[state])
+                state = self.output_link[state]
+        # The empty pattern (if any) always matches
+        if self.output[0] >= 0:
+            found.add(self.output[0])
+        return found
+
+
+def summary_tokens(text):
+    """Whitespace tokens of text, plus each token stripped of surrounding punctuation."""
+    tokens = set(text.split())
+    tokens.update(token.strip(_TOKEN_PUNCTUATION) for token in list(tokens))
+    return tokens
+
+
+class KeywordMatcher:
+    """Answers keyword membership queries against one summary, memoizing every answer."""
+
+    def __init__(self, summary_text, mode='automaton'):
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown keyword match mode: {mode}")
+        self.text = (summary_text or '').lower()
+        self.mode = mode
+        self.tokens = summary_tokens(self.text) if mode == 'token' else None
+        self.words = None
+        self.hits = {}
+
+    def prepare(self, keywords):
+        """Resolve a batch of keywords up front (one automaton pass in 'automaton' mode)."""
+        if self.mode != 'automaton':
+            return
+        # Keywords without whitespace can only occur inside a single summary word,
+        # so the automaton scans each distinct word once instead of the full text
+        pending = [
+            keyword for keyword in set(keywords)
+            if keyword not in self.hits and not any(char.isspace() for char in keyword)
+        ]
+        if not pending:
+            return
+        if self.words is None:
+            self.words = set(self.text.split())
+        found = AhoCorasick(pending).find_in_segments(self.words)
+        for index, keyword in enumerate(pending):
+            self.hits[keyword] = index in found
+
+    def contains(self, keyword):
+        hit = self.hits.get(keyword)
+        if hit is None:
+            # Answers are memoized, so even 'substring' scans the summary once per distinct keyword
+            if self.mode == 'token':
+                hit = keyword in self.tokens
+            else:
+                hit = keyword in self.text
+            self.hits[keyword] = hit
+        return hit
+
+    def match_all(self, keywords):
+        """List of booleans, one per keyword."""
+        keywords = list(keywords)
+        self.prepare(keywords)
+        return [self.contains(keyword) for keyword in keywords]
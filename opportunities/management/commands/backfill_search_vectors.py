@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from opportunities.models import Opportunity
+from utils.caching import bump_generation
+
+
+class Command(BaseCommand):
+    help = 'Fills the weighted search_vector of existing opportunities in primary key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of primary keys updated per statement'
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only fill opportunities without a search vector'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        queryset = Opportunity.objects.all()
+        if options['missing_only']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        bounds = queryset.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write(self.style.SUCCESS('No opportunities to backfill'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilling search vectors for ids {bounds['low']} to {bounds['high']}..."
+        ))
+
+        # One short UPDATE per id range, each in its own transaction, so rows are never locked for long
+        updated = 0
+        for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+            updated += queryset.filter(id__gte=start, id__lt=start + batch_size) \
+                .update(search_vector=Opportunity.weighted_search_vector())
+            self.stdout.write(f'Updated {updated} opportunities...')
+
+        # Cached search results were computed from the old vectors
+        bump_generation('opportunities')
+        self.stdout.write(self.style.SUCCESS(f'Successfully backfilled {updated} search vectors!'))
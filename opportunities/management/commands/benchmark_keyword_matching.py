@@ -0,0 +1,73 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+from opportunities.features import load_opportunity_features
+from opportunities.keyword_matching import MATCH_MODES, KeywordMatcher
+from opportunities.models import Opportunity
+from users.models import ParsedProfile
+
+SAMPLE_WORDS = [
+    'python', 'django', 'javascript', 'react', 'developer', 'engineer', 'data', 'science', 'machine',
+    'learning', 'research', 'analyst', 'manager', 'marketing', 'finance', 'design', 'product', 'cloud',
+    'backend', 'frontend', 'leadership', 'communication', 'public', 'health', 'teaching', 'sales',
+]
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark of experience keyword matching modes on long ParsedProfile summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            type=int,
+            default=20,
+            help='Number of longest ParsedProfile summaries to benchmark'
+        )
+        parser.add_argument(
+            '--opportunities',
+            type=int,
+            default=10000,
+            help='Number of opportunity keyword sets to match against each summary'
+        )
+
+    def handle(self, *args, **options):
+        summaries = list(
+            ParsedProfile.objects.exclude(summary='')
+            .annotate(summary_length=Length('summary'))
+            .order_by('-summary_length')
+            .values_list('summary', flat=True)[:options['profiles']]
+        )
+        if not summaries:
+            self.stdout.write(self.style.WARNING('No ParsedProfile summaries found, using a synthetic 5,000 word summary'))
+            rng = random.Random(0)
+            summaries = [' '.join(rng.choice(SAMPLE_WORDS) for _ in range(5000))]
+
+        features = load_opportunity_features(Opportunity.objects.all()[:options['opportunities']])
+        keyword_sets = [f['keywords'] for f in features]
+        if not keyword_sets:
+            self.stdout.write(self.style.WARNING('No opportunities found, using synthetic keyword sets'))
+            rng = random.Random(1)
+            keyword_sets = [rng.sample(SAMPLE_WORDS, 4) for _ in range(options['opportunities'])]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Matching {len(keyword_sets)} keyword sets against {len(summaries)} summaries '
+            f'(longest {max(len(s) for s in summaries)} characters)...'
+        ))
+
+        # Baseline: the original per-keyword substring scan without any preprocessing
+        start = time.perf_counter()
+        for summary in summaries:
+            text = summary.lower()
+            for keywords in keyword_sets:
+                sum(1 for kw in keywords if kw in text)
+        self.stdout.write(f'{"legacy":>10}: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        for mode in MATCH_MODES:
+            start = time.perf_counter()
+            for summary in summaries:
+                matcher = KeywordMatcher(summary, mode)
+                matcher.prepare(kw for keywords in keyword_sets for kw in keywords)
+                for keywords in keyword_sets:
+                    sum(1 for kw in keywords if matcher.contains(kw))
+            self.stdout.write(f'{mode:>10}: {(time.perf_counter() - start) * 1000:.1f} ms')
@@ -0,0 +1,69 @@
+import pickle
+import time
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from opportunities.matching import OpportunityMatcher
+from opportunities.models import Opportunity
+from opportunities.packing import compact_entries, hydrate_entries, pack_entries, unpack_entries
+
+
+class Command(BaseCommand):
+    help = 'Compares the size of a cached recommendation entry: full results vs the packed top-N ranking'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=100,
+            help='Number of ranked opportunities kept in the packed entry'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=20,
+            help='Number of results hydrated per page'
+        )
+        parser.add_argument(
+            '--skills',
+            default='Python,Django,JavaScript',
+            help='Comma separated skills of the benchmark profile'
+        )
+
+    def handle(self, *args, **options):
+        top_n = options['top_n']
+        profile = SimpleNamespace(
+            user=SimpleNamespace(id=0),
+            skills=[skill.strip() for skill in options['skills'].split(',') if skill.strip()],
+            education={'highest_level': 'bachelors', 'age': 25, 'nationality': 'Nigerian'},
+            preferences={'preferred_type': 'job', 'preferred_category': 'technology'},
+            location='Lagos, Nigeria',
+            summary='Python developer building Django and JavaScript applications with data science experience',
+        )
+
+        catalog_size = Opportunity.objects.filter(deadline__gte=timezone.now().date()).count()
+        matcher = OpportunityMatcher(profile, candidate_limit=0)
+        self.stdout.write(self.style.SUCCESS(f'Ranking {catalog_size} active opportunities...'))
+
+        # Old entry: every scored result with its full Opportunity instance (tags prefetched)
+        full_results = matcher.compute_recommendations(max(catalog_size, 1))
+        for result in full_results:
+            list(result['opportunity'].tags.all())
+        old_size = len(pickle.dumps(full_results, protocol=pickle.HIGHEST_PROTOCOL))
+
+        top_results = full_results[:top_n]
+        top_size = len(pickle.dumps(top_results, protocol=pickle.HIGHEST_PROTOCOL))
+        packed = pack_entries(compact_entries(top_results))
+        packed_size = len(pickle.dumps(packed, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.stdout.write(f'{"full catalog, model instances":>34}: {old_size / 1024:10.1f} KiB')
+        self.stdout.write(f'{f"top {top_n}, model instances":>34}: {top_size / 1024:10.1f} KiB')
+        self.stdout.write(f'{f"top {top_n}, packed":>34}: {packed_size / 1024:10.1f} KiB')
+        if packed_size:
+            self.stdout.write(self.style.SUCCESS(f'Packed entry is {old_size / packed_size:.0f}x smaller than the old entry'))
+
+        start = time.perf_counter()
+        page = hydrate_entries(unpack_entries(packed, 0, options['page_size']))
+        self.stdout.write(
+            f'Hydrated a page of {len(page)} results in {(time.perf_counter() - start) * 1000:.1f} ms (one query)'
+        )
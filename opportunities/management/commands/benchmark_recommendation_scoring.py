@@ -0,0 +1,75 @@
+import time
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from opportunities.matching import OpportunityMatcher
+from opportunities.models import Opportunity
+
+SCORING_MODES = ['python', 'batch', 'sql']
+
+
+class Command(BaseCommand):
+    help = 'Compares recommendation scoring modes on the current catalog (populate 100k rows with generate_sample_data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            default=','.join(SCORING_MODES),
+            help='Comma separated scoring modes to compare'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=100,
+            help='Number of top recommendations to compute'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of timed runs per mode'
+        )
+        parser.add_argument(
+            '--skills',
+            default='Python,Django,JavaScript',
+            help='Comma separated skills of the benchmark profile'
+        )
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        top_k = options['top_k']
+        profile = SimpleNamespace(
+            user=SimpleNamespace(id=0),
+            skills=[skill.strip() for skill in options['skills'].split(',') if skill.strip()],
+            education={'highest_level': 'bachelors', 'age': 25, 'nationality': 'Nigerian'},
+            preferences={'preferred_type': 'job', 'preferred_category': 'technology'},
+            location='Lagos, Nigeria',
+            summary='Python developer building Django and JavaScript applications with data science experience',
+        )
+
+        catalog_size = Opportunity.objects.filter(deadline__gte=timezone.now().date()).count()
+        self.stdout.write(self.style.SUCCESS(f'Scoring {catalog_size} active opportunities, top {top_k}...'))
+
+        rankings = {}
+        for mode in modes:
+            matcher = OpportunityMatcher(profile, scoring_mode=mode, candidate_limit=0)
+            queryset = matcher._base_queryset()
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                results = matcher._rank(queryset, top_k=top_k)
+                timings.append(time.perf_counter() - start)
+
+            rankings[mode] = [(r['opportunity'].id, r['score']) for r in results]
+            self.stdout.write(
+                f'{mode:>6}: best {min(timings) * 1000:.1f} ms, '
+                f'mean {sum(timings) / len(timings) * 1000:.1f} ms'
+            )
+
+        # Ties may be broken differently between modes, so compare the score sequences
+        reference = [score for _, score in rankings[modes[0]]]
+        for mode in modes[1:]:
+            if [score for _, score in rankings[mode]] == reference:
+                self.stdout.write(self.style.SUCCESS(f'{mode} scores match {modes[0]}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'{mode} scores differ from {modes[0]}'))
@@ -0,0 +1,76 @@
+import time
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from opportunities.batch_scoring import OpportunityFeatureMatrix
+from opportunities.features import load_opportunity_features
+from opportunities.models import Opportunity
+from opportunities.scorers import available_scorers, get_plan
+
+
+class Command(BaseCommand):
+    help = 'Measures throughput (opportunities scored per second) of every registered scorer on the current catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scorers',
+            default=','.join(available_scorers()),
+            help='Comma separated registered scorer names'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=100,
+            help='Number of top rows selected per run'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed runs per scorer'
+        )
+        parser.add_argument(
+            '--skills',
+            default='Python,Django,JavaScript',
+            help='Comma separated skills of the benchmark profile'
+        )
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['scorers'].split(',') if name.strip()]
+        profile = SimpleNamespace(
+            user=SimpleNamespace(id=0),
+            skills=[skill.strip() for skill in options['skills'].split(',') if skill.strip()],
+            education={'highest_level': 'bachelors', 'age': 25, 'nationality': 'Nigerian'},
+            education_level='bachelors',
+            preferences={'preferred_type': 'job', 'preferred_category': 'technology'},
+            location='Lagos, Nigeria',
+            summary='Python developer building Django and JavaScript applications with data science experience',
+        )
+
+        # Features are loaded once; only scoring and top-k selection are timed
+        start = time.perf_counter()
+        features = load_opportunity_features(Opportunity.objects.filter(deadline__gte=timezone.now().date()))
+        matrix = OpportunityFeatureMatrix(features)
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {matrix.size} feature rows in {(time.perf_counter() - start) * 1000:.1f} ms'
+        ))
+        if not matrix.size:
+            self.stdout.write(self.style.WARNING('No active opportunities to score (populate with generate_sample_data)'))
+            return
+
+        for name in names:
+            start = time.perf_counter()
+            plan = get_plan(name)
+            compile_ms = (time.perf_counter() - start) * 1000
+
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                plan.score_matrix(matrix, profile, top_k=options['top_k'])
+                timings.append(time.perf_counter() - start)
+
+            best = min(timings)
+            self.stdout.write(
+                f'{name:>8}: best {best * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms, '
+                f'{matrix.size / best:,.0f} opportunities/s (plan lookup {compile_ms:.3f} ms)'
+            )
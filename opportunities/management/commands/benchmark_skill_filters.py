@@ -0,0 +1,85 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from opportunities.filtering import skills_filter, tags_filter
+from opportunities.models import Opportunity, Tag
+
+SKILL_COUNTS_SQL = """
+    SELECT skill FROM opportunities_opportunity, unnest(skills_required) AS skill
+    WHERE deadline >= %s GROUP BY skill ORDER BY COUNT(*) DESC, skill LIMIT %s
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Times skill and tag filtering of the active catalog for 1 to N requested values: one filter per '
+        'value (chained) vs a single @> / && array predicate and a single EXISTS over the tags'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-filters',
+            type=int,
+            default=10,
+            help='Largest number of skills (and tags) filtered on'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed runs per query'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        active = Opportunity.objects.filter(deadline__gte=today).order_by()
+        max_filters = options['max_filters']
+
+        # The most used skills and tags, so that small filter sets still match rows
+        with connection.cursor() as cursor:
+            cursor.execute(SKILL_COUNTS_SQL, [today, max_filters])
+            skills = [row[0] for row in cursor.fetchall()]
+        tags = list(
+            Tag.objects.annotate(count=Count('opportunities')).order_by('-count', 'slug')
+            .values_list('slug', flat=True)[:max_filters]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{active.count()} active opportunities, {len(skills)} skills and {len(tags)} tags to filter on'
+        ))
+
+        def chained_skills(values):
+            queryset = active
+            for skill in values:
+                queryset = queryset.filter(skills_required__contains=[skill])
+            return queryset
+
+        def chained_tags(values):
+            queryset = active
+            for tag in values:
+                queryset = queryset.filter(tags__slug=tag)
+            return queryset
+
+        runs = {
+            'skills chained': (skills, chained_skills),
+            'skills all (@>)': (skills, lambda values: active.filter(skills_filter(values, 'all'))),
+            'skills any (&&)': (skills, lambda values: active.filter(skills_filter(values, 'any'))),
+            'tags chained': (tags, chained_tags),
+            'tags all (EXISTS)': (tags, lambda values: active.filter(tags_filter(values, 'all'))),
+            'tags any (EXISTS)': (tags, lambda values: active.filter(tags_filter(values, 'any'))),
+        }
+
+        for name, (values, build) in runs.items():
+            self.stdout.write(f'{name}:')
+            for n in range(1, len(values) + 1):
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    matched = build(values[:n]).count()
+                    timings.append(time.perf_counter() - start)
+
+                self.stdout.write(
+                    f'  {n:>2} filters: best {min(timings) * 1000:8.2f} ms, '
+                    f'mean {sum(timings) / len(timings) * 1000:8.2f} ms, {matched} matches'
+                )
@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from opportunities.snapshots import build_snapshots
+from opportunities.user_profiles import get_matching_profile
+from users.models import UserProfile
+
+
+def _build_chunk(user_ids, size, scoring_mode):
+    """Worker entry point: build the snapshots of one chunk of users."""
+    profiles = UserProfile.objects.select_related('user').filter(user_id__in=user_ids)
+    return build_snapshots((get_matching_profile(profile.user) for profile in profiles), size, scoring_mode)
+
+
+class Command(BaseCommand):
+    help = "Precomputes every active user's top-N recommendations into RecommendationSnapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=getattr(settings, 'RECOMMENDATION_CACHE_SIZE', 100),
+            help='Number of recommendations stored per user'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (defaults to the CPU count)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Number of users handed to a worker at a time'
+        )
+        parser.add_argument(
+            '--scoring-mode',
+            default=None,
+            help='Scoring mode override (python, batch or sql)'
+        )
+
+    def handle(self, *args, **options):
+        size = options['size']
+        chunk_size = options['chunk_size']
+        workers = max(1, options['workers'])
+        scoring_mode = options['scoring_mode']
+
+        user_ids = list(
+            UserProfile.objects.filter(user__is_active=True)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)
+        )
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Building recommendation snapshots for {len(user_ids)} users with {workers} workers...'
+        ))
+
+        built = failed = 0
+        if workers == 1:
+            for chunk in chunks:
+                chunk_built, chunk_failed = _build_chunk(chunk, size, scoring_mode)
+                built += chunk_built
+                failed += chunk_failed
+                self.stdout.write(f'Built {built} snapshots...')
+        else:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(_build_chunk, chunk, size, scoring_mode) for chunk in chunks]
+                for future in as_completed(futures):
+                    chunk_built, chunk_failed = future.result()
+                    built += chunk_built
+                    failed += chunk_failed
+                    self.stdout.write(f'Built {built} snapshots...')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully built {built} snapshots ({failed} failed)'))
@@ -0,0 +1,90 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from opportunities.features import ensure_opportunity_features
+from opportunities.models import Opportunity, OpportunityFeature
+from opportunities.text_vectors import (
+    TextVectorIndex, TextVectorIndexWriter, TextVectorizer, compute_idf, hashed_term_frequencies,
+    stream_opportunity_texts, vector_dim,
+)
+
+
+class Command(BaseCommand):
+    help = 'Builds the hashed TF-IDF text vectors of all opportunities and publishes the memory-mapped matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of opportunity vectors written to OpportunityFeature per batch'
+        )
+        parser.add_argument(
+            '--include-expired',
+            action='store_true',
+            help='Also vectorize opportunities past their deadline'
+        )
+        parser.add_argument(
+            '--query',
+            default='Python developer building Django and JavaScript applications with data science experience',
+            help='Sample CV text used to time the similarity product after the build'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dim = vector_dim()
+
+        queryset = Opportunity.objects.all()
+        if not options['include_expired']:
+            queryset = queryset.filter(deadline__gte=timezone.now().date())
+        ensure_opportunity_features(queryset)
+
+        # Pass 1: bucket document frequencies
+        start = time.perf_counter()
+        ids = []
+        document_frequencies = np.zeros(dim, dtype=np.int64)
+        for opportunity_id, text in stream_opportunity_texts(queryset):
+            buckets, _ = hashed_term_frequencies(text, dim)
+            document_frequencies[np.unique(buckets)] += 1
+            ids.append(opportunity_id)
+        idf = compute_idf(document_frequencies, len(ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'Counted terms of {len(ids)} opportunities in {time.perf_counter() - start:.1f} s'
+        ))
+
+        # Pass 2: vectors with the new IDF, written to the matrix file and to OpportunityFeature
+        start = time.perf_counter()
+        vectorizer = TextVectorizer(idf)
+        writer = TextVectorIndexWriter(len(ids), dim)
+        for batch_start in range(0, len(ids), batch_size):
+            batch_ids = ids[batch_start:batch_start + batch_size]
+            texts = dict(stream_opportunity_texts(Opportunity.objects.filter(pk__in=batch_ids)))
+            rows = []
+            for offset, opportunity_id in enumerate(batch_ids):
+                # Opportunities deleted since pass 1 keep a zero row until the next build
+                vector = vectorizer.transform(texts.get(opportunity_id, ''))
+                writer.vectors[batch_start + offset] = vector
+                rows.append(OpportunityFeature(opportunity_id=opportunity_id, text_vector=vector.tobytes()))
+            OpportunityFeature.objects.bulk_update(rows, ['text_vector'])
+            self.stdout.write(f'Vectorized {batch_start + len(batch_ids)} opportunities...')
+
+        writer.publish(ids, idf)
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {len(ids)} x {dim} vectors in {time.perf_counter() - start:.1f} s'
+        ))
+
+        index = TextVectorIndex.current()
+        if index is None or not len(ids):
+            return
+        query = vectorizer.transform(options['query'])
+        all_ids = np.asarray(ids, dtype=np.int64)
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            index.similarities(all_ids, query)
+            timings.append(time.perf_counter() - start)
+        self.stdout.write(
+            f'Similarity for one user over {len(ids)} opportunities: best {min(timings) * 1000:.1f} ms, '
+            f'mean {sum(timings) / len(timings) * 1000:.1f} ms'
+        )
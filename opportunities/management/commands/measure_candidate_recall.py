@@ -0,0 +1,68 @@
+import random
+from django.core.management.base import BaseCommand
+from opportunities.matching import OpportunityMatcher
+from opportunities.user_profiles import get_matching_profile
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures how much of the full-scan top-k the candidate retrieval keeps for a sample of real users, '
+        'to choose RECOMMENDATION_CANDIDATE_LIMIT'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=5000,
+            help='Candidate limit to evaluate'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=20,
+            help='Size of the top-k compared'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=100,
+            help='Number of randomly sampled active users'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed of the user sample'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = list(
+            UserProfile.objects.filter(user__is_active=True)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)
+        )
+        sample = random.Random(options['seed']).sample(user_ids, min(options['users'], len(user_ids)))
+        profiles = UserProfile.objects.select_related('user').filter(user_id__in=sample).order_by('user_id')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Measuring top-{options['k']} recall of a {options['limit']} candidate limit for {len(sample)} users..."
+        ))
+
+        recalls = []
+        for profile in profiles:
+            matcher = OpportunityMatcher(get_matching_profile(profile.user), candidate_limit=options['limit'])
+            report = matcher.measure_candidate_recall(k=options['k'])
+            recalls.append(report['recall'])
+            self.stdout.write(
+                f"user {profile.user_id}: recall {report['recall']:.3f} "
+                f"({report['candidate_count']} of {report['catalog_size']} opportunities scored)"
+            )
+
+        if recalls:
+            below = sum(1 for recall in recalls if recall < 1.0)
+            self.stdout.write(self.style.SUCCESS(
+                f'Mean recall {sum(recalls) / len(recalls):.3f}, min {min(recalls):.3f}, '
+                f'{below} of {len(recalls)} users lose results'
+            ))
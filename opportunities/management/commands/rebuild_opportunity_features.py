@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from opportunities.features import refresh_opportunity_features
+from opportunities.models import Opportunity
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the precomputed matching features for all opportunities'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of opportunities to rebuild per batch'
+        )
+        parser.add_argument(
+            '--include-expired',
+            action='store_true',
+            help='Also rebuild features for opportunities past their deadline'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        queryset = Opportunity.objects.order_by('id')
+        if not options['include_expired']:
+            queryset = queryset.filter(deadline__gte=timezone.now().date())
+
+        ids = list(queryset.values_list('id', flat=True))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilding features for {len(ids)} opportunities...'))
+
+        rebuilt = 0
+        for start in range(0, len(ids), batch_size):
+            rebuilt += refresh_opportunity_features(ids[start:start + batch_size])
+            self.stdout.write(f'Rebuilt {rebuilt} opportunities...')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt features for {rebuilt} opportunities!'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from opportunities.incremental import refresh_recommendations_for_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Merges the opportunities of one import batch into the users' cached recommendations and snapshots "
+        "(bulk_create and scrape_jobs schedule this after each import; rerun it if that refresh failed)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('batch_id', help='import_batch_id of the imported opportunities')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of user profiles processed at a time'
+        )
+
+    def handle(self, *args, **options):
+        stats = refresh_recommendations_for_batch(options['batch_id'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch {options['batch_id']}: {stats['updated']} rankings updated, {stats['discarded']} discarded"
+        ))
@@ -1,9 +1,66 @@
+import heapq
 import math
 from datetime import timedelta
-from django.db.models import Q
+from types import SimpleNamespace
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import CharField, F, Func, OuterRef, Q
 from django.utils import timezone
-from django.core.cache import cache 
-from opportunities.models import Opportunity  
+from utils.caching import SingleFlightCache, get_generations, key_for_generations
+from config.constants import EDUCATION_LEVEL_ORDER
+from opportunities.models import Opportunity, OpportunityFeature, Tag
+from opportunities.batch_scoring import OpportunityFeatureMatrix
+from opportunities.features import load_opportunity_features
+from opportunities.sql_scoring import SQLScorer
+from opportunities.candidates import candidate_ids, ranking_recall
+from opportunities.filtering import skills_filter, tags_filter
+from opportunities.keyword_matching import KeywordMatcher
+from opportunities.explain import NULL_TRACE
+from opportunities.packing import compact_entries, hydrate_entries, pack_entries, packed_length, unpack_entries
+from opportunities.scorers import get_recommendation_plan
+
+# Columns the per-row scorer reads; description and the other wide columns are never fetched
+SCORING_COLUMNS = [
+    'id', 'title', 'skills_required', 'location', 'is_remote', 'eligibility_criteria',
+    'type', 'category__slug', 'is_featured', 'created_at',
+]
+
+
+recommendation_cache = SingleFlightCache(
+    soft_ttl=getattr(settings, 'RECOMMENDATION_CACHE_SOFT_TTL', 60 * 30),
+    hard_ttl=getattr(settings, 'RECOMMENDATION_CACHE_HARD_TTL', 60 * 60 * 2),
+)
+
+
+def recommendation_cache_key(user_id, scorer_name, opportunities_generation=None):
+    """
+    Cache key of a user's cached top-k ranking for one registered scorer,
+    versioned by the opportunity, taxonomy and user's profile generations, so
+    any opportunity edit invalidates it. Imports carry rankings over to the
+    new generation with the batch merged in (see opportunities.incremental),
+    which passes the generation the ranking was cached under.
+    """
+    generations = get_generations('opportunities', 'tags', f'profile:{user_id}')
+    if opportunities_generation is not None:
+        generations[0] = opportunities_generation
+    return key_for_generations(f'user_recommendations_{scorer_name}_{user_id}', generations)
+
+
+class ScoringRow:
+    """Column-projected opportunity row exposing the attributes the per-row scorer reads."""
+
+    __slots__ = (
+        'id', 'title', 'skills_required', 'location', 'is_remote', 'eligibility_criteria',
+        'type', 'category', 'is_featured', 'created_at', 'tag_names',
+    )
+
+    def __init__(self, row):
+        for column in SCORING_COLUMNS:
+            if column != 'category__slug':
+                setattr(self, column, row[column])
+        self.category = SimpleNamespace(slug=row['category__slug'])
+        self.tag_names = row['tag_names']
+
 
 class OpportunityMatcher:
     """
@@ -13,141 +70,281 @@ class OpportunityMatcher:
 
     DEFAULT_KEYWORD_SCORE = 0.5 
     
-    def __init__(self, user_profile):
+    def __init__(self, user_profile, scoring_mode=None, candidate_limit=None, trace=None, scorer=None):
         self.user_profile = user_profile
-        self.weights = {
-            'skills_match': 0.4,
-            'location_match': 0.2,
-            'education_match': 0.25,
-            'preferences_match': 0.15,
-            'experience_match': 0.15,
-        }
+        # Records stage timings, row counts and cache states for ?explain=1 (see opportunities.explain)
+        self.trace = trace or NULL_TRACE
+        # Compiled scoring plan from the shared scorer registry (see opportunities.scorers)
+        self.plan = get_recommendation_plan(scorer)
+        self.scoring_mode = scoring_mode or getattr(settings, 'RECOMMENDATION_SCORING_MODE', 'batch')
+        if self.scoring_mode not in self.plan.scorer.execution_modes:
+            self.scoring_mode = 'batch'
+        if candidate_limit is None:
+            candidate_limit = getattr(settings, 'RECOMMENDATION_CANDIDATE_LIMIT', 0)
+        self.candidate_limit = candidate_limit
+        self.cache_size = getattr(settings, 'RECOMMENDATION_CACHE_SIZE', 100)
+        self.keyword_match_mode = getattr(settings, 'RECOMMENDATION_KEYWORD_MATCH_MODE', 'automaton')
+        self.weights = self.plan.weights
 
     def get_recommended_opportunities(self, limit=20, offset=0, filters=None):
         """
         Returns personalized opportunity recommendations for the user.
         """
-        cache_key = f'user_recommendations_{self.user_profile.user.id}'
-        cached_result = cache.get(cache_key)
+        # Only the top_k best results are kept; a cached list shorter than the
+        # cache size is the complete ranking and can serve any page
+        top_k = max(offset + limit, self.cache_size)
+        if filters:
+            self.trace.cache_event('matcher', False)
+            return self.compute_recommendations(top_k, filters)[offset:offset + limit]
+
+        cache_key = recommendation_cache_key(self.user_profile.user.id, self.plan.scorer.name)
+        with self.trace.stage('cache_lookup'):
+            lookup = recommendation_cache.get(cache_key)
+
+        # The cache holds the packed ranking (ids, scores, reasons) only; a miss
+        # keeps the freshly hydrated results so they are not fetched again
+        computed = []
+
+        def compute():
+            computed[:] = self.compute_recommendations(top_k)
+            return pack_entries(compact_entries(computed))
+
+        # Concurrent misses for one user compute once; stale rankings are served while refreshed
+        packed, state = recommendation_cache.get_or_compute(
+            cache_key,
+            compute,
+            accept=lambda cached: packed_length(cached) >= offset + limit or packed_length(cached) < self.cache_size,
+            lookup=lookup,
+        )
+        self.trace.cache_event('matcher', state)
+
+        if state == 'miss' and computed:
+            return computed[offset:offset + limit]
+        with self.trace.stage('hydration'):
+            return hydrate_entries(unpack_entries(packed, offset, offset + limit))
+
+    def compute_recommendations(self, top_k, filters=None):
+        """
+        Score the active catalog (or the candidate set when enabled) and return
+        the best top_k results sorted by score, bypassing the cache.
+        """
+        queryset = self._base_queryset(filters)
+        if self.candidate_limit:
+            with self.trace.stage('candidate_fetch'):
+                queryset = self._candidate_queryset(queryset)
 
-        if cached_result and not filters:
-            return cached_result[offset:offset + limit]
+        return self._rank(queryset, top_k=top_k)
+
+    def measure_candidate_recall(self, k=20, filters=None):
+        """
+        Compare the candidate-based ranking with a full catalog scan and report
+        how much of the full-scan top-k the candidate stage keeps.
+        """
+        queryset = self._base_queryset(filters)
+        candidates = self._candidate_queryset(queryset)
+        full_results = self._rank(queryset, top_k=k)
+        candidate_results = self._rank(candidates, top_k=k)
+
+        return {
+            'k': k,
+            'recall': ranking_recall(full_results, candidate_results, k),
+            'catalog_size': queryset.count(),
+            'candidate_count': candidates.count(),
+        }
 
-        queryset = Opportunity.objects.prefetch_related('tags').filter(
-            deadline__gte=timezone.now().date()
+    def _base_queryset(self, filters=None):
+        queryset = Opportunity.objects.filter(
+            deadline__gte=timezone.now().date(),
+            is_active=True
         )
 
         if filters:
             queryset = self._apply_filters(queryset, filters)
 
-        scored_opportunities = self._score_opportunities(queryset)
+        return queryset
 
-        sorted_results = sorted(
-            scored_opportunities,
-            key=lambda x: x['score'],
-            reverse=True
-        )
-
-        if not filters:
-            cache.set(cache_key, sorted_results, 60 * 30)  
+    def _candidate_queryset(self, queryset):
+        """
+        Restrict the queryset to a bounded candidate set retrieved from the skill postings.
+        """
+        ids = candidate_ids(queryset, self.user_profile.skills, self.candidate_limit)
+        self.trace.count('candidates', len(ids))
+        return queryset.filter(pk__in=ids)
 
-        return sorted_results[offset:offset + limit]
+    def _rank(self, queryset, top_k=None):
+        """
+        Score the queryset and return results sorted by score; with top_k only the best top_k.
+        """
+        if self.scoring_mode == 'batch':
+            scored_opportunities = self._score_opportunities_batch(queryset, top_k=top_k)
+        elif self.scoring_mode == 'sql':
+            scored_opportunities = self._score_opportunities_sql(queryset, top_k=top_k)
+        else:
+            scored_opportunities = self._score_opportunities(queryset, top_k=top_k)
+
+        with self.trace.stage('sort'):
+            return sorted(
+                scored_opportunities,
+                key=lambda x: x['score'],
+                reverse=True
+            )
     
-def _apply_filters(self, queryset, filters):
-    """
-    Apply user-specified filters to the queryset.
-    """
-    if 'type' in filters:
-        queryset = queryset.filter(type=filters['type'])
+    def _apply_filters(self, queryset, filters):
+        """
+        Apply user-specified filters to the queryset.
+        """
+        if 'type' in filters:
+            queryset = queryset.filter(type=filters['type'])
 
-    if 'location' in filters:
-        queryset = queryset.filter(
-            Q(location__icontains=filters['location']) |
-            Q(is_remote=True)
-        )
+        if 'location' in filters:
+            queryset = queryset.filter(
+                Q(location__icontains=filters['location']) |
+                Q(is_remote=True)
+            )
 
-    if 'category' in filters:
-        queryset = queryset.filter(category__slug=filters['category'])
-
-    if 'tags' in filters:
-        for tag in filters['tags']:
-            queryset = queryset.filter(tags__slug=tag)
-
-    if 'skills' in filters:
-        for skill in filters['skills']:
-            queryset = queryset.filter(skills_required__contains=[skill])
-
-    if 'deadline_after' in filters:
-        queryset = queryset.filter(deadline__gte=filters['deadline_after'])
-
-    if 'deadline_before' in filters:
-        queryset = queryset.filter(deadline__lte=filters['deadline_before'])
-
-    if 'education_level' in filters:
-        queryset = queryset.filter(eligibility_criteria__education_level=filters['education_level'])
-
-    if 'posted_within' in filters:
-        now = timezone.now()
-        posted_within = filters['posted_within']
-        if posted_within == 'today':
-            since = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            queryset = queryset.filter(created_at__gte=since)
-        elif posted_within == 'this_week':
-            start_of_week = now - timezone.timedelta(days=now.weekday())
-            queryset = queryset.filter(created_at__gte=start_of_week)
-        elif posted_within == 'this_month':
-            since = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            queryset = queryset.filter(created_at__gte=since)
-        elif posted_within.endswith('h'):
-            try:
-                hours = int(posted_within.replace('h', ''))
-                since = now - timezone.timedelta(hours=hours)
-                queryset = queryset.filter(created_at__gte=since)
-            except ValueError:
-                pass
+        if 'category' in filters:
+            queryset = queryset.filter(category__slug=filters['category'])
+
+        if 'tags' in filters:
+            queryset = queryset.filter(tags_filter(filters['tags'], filters.get('tags_mode', 'all')))
 
-    return queryset
+        if 'skills' in filters:
+            queryset = queryset.filter(skills_filter(filters['skills'], filters.get('skills_mode', 'all')))
 
+        if 'deadline_after' in filters:
+            queryset = queryset.filter(deadline__gte=filters['deadline_after'])
 
-    def _score_opportunities(self, queryset):
+        if 'deadline_before' in filters:
+            queryset = queryset.filter(deadline__lte=filters['deadline_before'])
+
+        if 'education_level' in filters:
+            queryset = queryset.filter(eligibility_criteria__education_level=filters['education_level'])
+
+        if 'posted_within' in filters:
+            now = timezone.now()
+            posted_within = filters['posted_within']
+            if posted_within == 'today':
+                since = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                queryset = queryset.filter(created_at__gte=since)
+            elif posted_within == 'this_week':
+                start_of_week = now - timezone.timedelta(days=now.weekday())
+                queryset = queryset.filter(created_at__gte=start_of_week)
+            elif posted_within == 'this_month':
+                since = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                queryset = queryset.filter(created_at__gte=since)
+            elif posted_within.endswith('h'):
+                try:
+                    hours = int(posted_within.replace('h', ''))
+                    since = now - timezone.timedelta(hours=hours)
+                    queryset = queryset.filter(created_at__gte=since)
+                except ValueError:
+                    pass
+
+        return queryset
+
+    def _stream_scoring_rows(self, queryset, chunk_size=2000):
+        """
+        Stream the queryset as ScoringRows through a server-side cursor, fetching
+        only SCORING_COLUMNS plus the tag names. Tags come from a correlated
+        subquery so tag filters on the queryset cannot narrow them. Rows come in
+        id order, like the batch and sql modes, so equal scores rank the same in
+        every mode.
+        """
+        tag_names = ArraySubquery(Tag.objects.filter(opportunities=OuterRef('pk')).values('name'))
+        rows = queryset.select_related(None).prefetch_related(None) \
+            .order_by('id') \
+            .values(*SCORING_COLUMNS) \
+            .annotate(tag_names=tag_names)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield ScoringRow(row)
+
+    def _score_opportunities(self, queryset, top_k=None):
         """
         Score each opportunity based on profile and preferences.
+        Rows are streamed with only the scored columns; with top_k, only the best
+        top_k results are kept (sorted by score) and the experience/tag scoring is
+        skipped for rows whose upper bound cannot beat the current k-th score.
+        The surviving rows are hydrated with a single in_bulk at the end.
+        """
+        experience_summary = self.user_profile.summary
+        keyword_matcher = KeywordMatcher(experience_summary, self.keyword_match_mode)
+        if experience_summary:
+            # One automaton pass over the summary for every keyword the rows can ask about
+            with self.trace.stage('keyword_prepare'):
+                keyword_matcher.prepare(self._catalog_keywords(queryset))
+        max_experience_score = max(1.0, self.DEFAULT_KEYWORD_SCORE) if experience_summary else 0
+
+        # Rows are fetched and scored in one streaming pass, so this stage covers both
+        with self.trace.stage('stream_and_score'):
+            results, heap, scored = self._score_rows(queryset, top_k, keyword_matcher, max_experience_score)
+        self.trace.count('rows_scored', scored)
+
+        if top_k:
+            results = [entry[2] for entry in sorted(heap, reverse=True)]
+
+        with self.trace.stage('hydration'):
+            opportunities = Opportunity.objects.select_related('category').in_bulk(
+                [result['opportunity'] for result in results]
+            )
+        for result in results:
+            result['opportunity'] = opportunities[result['opportunity']]
+        self.trace.count('rows_returned', len(results))
+        return results
+
+    @staticmethod
+    def _catalog_keywords(queryset):
+        """
+        Distinct title and tag keywords of the queryset, read from the stored
+        features. Keywords of rows without features fall back to the matcher's
+        per-keyword lookup.
+        """
+        return OpportunityFeature.objects.filter(opportunity__in=queryset.order_by().values('pk')) \
+            .annotate(keyword=Func(F('keywords'), function='unnest', output_field=CharField())) \
+            .order_by() \
+            .values_list('keyword', flat=True) \
+            .distinct()
+
+    def _score_rows(self, queryset, top_k, keyword_matcher, max_experience_score):
+        """
+        Streaming loop of _score_opportunities. Returns (results, heap, rows scored):
+        all results without top_k, otherwise the top_k heap of (score, -index, result).
         """
         results = []
+        heap = []
+        index = -1
         user_skills = set(self.user_profile.skills)
         user_education = self.user_profile.education
         user_preferences = self.user_profile.preferences
         user_location = self.user_profile.location.lower()
         experience_summary = self.user_profile.summary
-        
-        
-        for opportunity in queryset:
+
+        for index, opportunity in enumerate(self._stream_scoring_rows(queryset)):
             skills_score = self._calculate_skills_score(user_skills, opportunity.skills_required)
             location_score = self._calculate_location_score(opportunity, user_location)
             education_score = 1 if self._check_eligibility(opportunity.eligibility_criteria, user_education) else 0
             preferences_score = self._calculate_preference_score(user_preferences, opportunity)
-            experience_score = self._calculate_experience_score(experience_summary, opportunity)
-        
-            total_score = (
+
+            partial_score = (
                 self.weights['skills_match'] * skills_score +
                 self.weights['location_match'] * location_score +
                 self.weights['education_match'] * education_score +
-                self.weights['preferences_match'] * preferences_score +
-                self.weights['experience_match'] * experience_score
+                self.weights['preferences_match'] * preferences_score
             )
 
-            # Apply boosts
-            if opportunity.is_featured:
-                total_score *= 1.1
-
-            days_old = (timezone.now().date() - opportunity.created_at.date()).days
-            recency_boost = max(0, 1 - (days_old / 30))
-            total_score *= (1 + recency_boost * 0.1)
+            if top_k and len(heap) >= top_k:
+                upper_bound = self._final_score(
+                    partial_score + self.weights['experience_match'] * max_experience_score, opportunity
+                )
+                # Later rows lose ties, so an equal bound cannot displace the k-th result
+                if upper_bound <= heap[0][0]:
+                    continue
 
-            final_score = min(100, math.floor(total_score * 100))
+            experience_score = self._calculate_experience_score(experience_summary, opportunity, keyword_matcher)
+            total_score = partial_score + self.weights['experience_match'] * experience_score
+            final_score = self._final_score(total_score, opportunity)
 
-            results.append({
-                'opportunity': opportunity,
+            result = {
+                'opportunity': opportunity.id,
                 'score': final_score,
                 'reasons': {
                     'skills_match': round(skills_score * 100),
@@ -156,9 +353,104 @@ def _apply_filters(self, queryset, filters):
                     'preference_match': round(preferences_score * 100),
                     'experience_match': round(experience_score * 100),
                 }
-            })
+            }
 
-        return results
+            if not top_k:
+                results.append(result)
+            elif len(heap) < top_k:
+                heapq.heappush(heap, (final_score, -index, result))
+            else:
+                heapq.heappushpop(heap, (final_score, -index, result))
+
+        return results, heap, index + 1
+
+    def _final_score(self, total_score, opportunity):
+        # Apply boosts
+        if opportunity.is_featured:
+            total_score *= 1.1
+
+        days_old = (timezone.now().date() - opportunity.created_at.date()).days
+        recency_boost = max(0, 1 - (days_old / 30))
+        total_score *= (1 + recency_boost * 0.1)
+
+        return min(100, math.floor(total_score * 100))
+
+    def _score_opportunities_batch(self, queryset, top_k=None):
+        """
+        Vectorized equivalent of _score_opportunities: precomputed features are
+        loaded into NumPy arrays once and all component scores are computed as
+        array operations. With top_k only the best top_k rows are returned,
+        sorted by score, and only those rows are hydrated.
+        """
+        # Feature rows are streamed straight into the matrix columns; feature_build
+        # includes the feature_fetch time spent reading them
+        features = load_opportunity_features(queryset)
+        if self.trace.enabled:
+            features = self._timed_rows(features, 'feature_fetch')
+        with self.trace.stage('feature_build'):
+            matrix = OpportunityFeatureMatrix(features)
+        self.trace.count('rows_scored', matrix.size)
+        if not matrix.size:
+            return []
+
+        components = self.plan.score_matrix(matrix, self.user_profile, top_k=top_k, trace=self.trace)
+        scores = components['score']
+
+        rows = components['selected'].tolist() if top_k is not None else range(matrix.size)
+        ids = matrix.ids.tolist()
+        with self.trace.stage('hydration'):
+            opportunities = Opportunity.objects.select_related('category').in_bulk([ids[row] for row in rows])
+        self.trace.count('rows_returned', len(rows))
+
+        return [
+            {
+                'opportunity': opportunities[ids[row]],
+                'score': scores[row].item(),
+                'reasons': self.plan.reasons(components, row),
+            }
+            for row in rows
+        ]
+
+    def _timed_rows(self, rows, stage):
+        """Yield from rows, recording the time spent producing them under stage."""
+        rows = iter(rows)
+        while True:
+            with self.trace.stage(stage):
+                row = next(rows, None)
+            if row is None:
+                return
+            yield row
+
+    def _score_opportunities_sql(self, queryset, top_k=None):
+        """
+        Database-side equivalent of _score_opportunities: Postgres computes the
+        scores over the feature rows and returns only the top_k, which are then
+        hydrated in one query. Postgres can only score stored feature rows, so
+        while some are missing (they are not backfilled on this read path) the
+        vectorized scorer, which derives them in memory, is used instead.
+        """
+        with self.trace.stage('feature_fetch'):
+            missing = queryset.filter(features__isnull=True).exists()
+        if missing:
+            return self._score_opportunities_batch(queryset, top_k=top_k)
+        scorer = SQLScorer(self.weights, self.DEFAULT_KEYWORD_SCORE, self.keyword_match_mode)
+        with self.trace.stage('sql_scoring'):
+            rows = scorer.score(queryset, self.user_profile, top_k=top_k)
+
+        with self.trace.stage('hydration'):
+            opportunities = Opportunity.objects.select_related('category').in_bulk(
+                [row['opportunity_id'] for row in rows]
+            )
+        self.trace.count('rows_returned', len(rows))
+
+        return [
+            {
+                'opportunity': opportunities[row['opportunity_id']],
+                'score': int(row['score']),
+                'reasons': scorer.reasons(row),
+            }
+            for row in rows
+        ]
 
     def _calculate_skills_score(self, user_skills, opp_skills_list):
         opp_skills = set(opp_skills_list)
@@ -185,7 +477,7 @@ def _apply_filters(self, queryset, filters):
         if not criteria:
             return True
 
-        education_levels = ['high_school', 'bachelors', 'masters', 'phd']
+        education_levels = EDUCATION_LEVEL_ORDER
         user_level = user_education.get('highest_level')
         required_level = criteria.get('education_level')
 
@@ -212,26 +504,28 @@ def _apply_filters(self, queryset, filters):
 
         return True
 
-    def _calculate_experience_score(self, summary_text, opportunity):
+    def _calculate_experience_score(self, summary_text, opportunity, keyword_matcher=None):
         """
         Scores experience based on keyword overlap between user's summary and opportunity title/tags.
-        Performs basic substring matching. Returns fallback score if no keywords found.
+        Keywords are looked up in a KeywordMatcher built once per request from the summary
+        (substring semantics unless RECOMMENDATION_KEYWORD_MATCH_MODE is 'token').
+        Returns fallback score if no keywords found.
         """
 
         if not summary_text:
             return 0
 
-        summary_text = summary_text.lower()
+        if keyword_matcher is None:
+            keyword_matcher = KeywordMatcher(summary_text, self.keyword_match_mode)
         opportunity_keywords = set(opportunity.title.lower().split())
 
-        if hasattr(opportunity, 'tags'):    
-            for tag in opportunity.tags.all():
-                opportunity_keywords.update(
-                word.lower() for word in tag.name.split()
-            )
-
+        tag_names = getattr(opportunity, 'tag_names', None)
+        if tag_names is None and hasattr(opportunity, 'tags'):
+            tag_names = [tag.name for tag in opportunity.tags.all()]
+        for tag_name in tag_names or []:
+            opportunity_keywords.update(word.lower() for word in tag_name.split())
 
-        match_count = sum(1 for kw in opportunity_keywords if kw in summary_text)
+        match_count = sum(1 for kw in opportunity_keywords if keyword_matcher.contains(kw))
 
         if not opportunity_keywords:
             return self.DEFAULT_KEYWORD_SCORE
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:22
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0007_remove_opportunity_opportunity_type_deadline_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpportunityFeature',
+            fields=[
+                ('opportunity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='opportunities.opportunity')),
+                ('skills', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, default=list, size=None)),
+                ('keywords', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('is_remote', models.BooleanField(default=False)),
+                ('type', models.CharField(max_length=20)),
+                ('category_slug', models.SlugField(max_length=100)),
+                ('education_rank', models.SmallIntegerField(default=-1)),
+                ('min_age', models.FloatField(blank=True, null=True)),
+                ('max_age', models.FloatField(blank=True, null=True)),
+                ('nationalities', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, size=None)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('created_date', models.DateField()),
+                ('deadline', models.DateField(db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
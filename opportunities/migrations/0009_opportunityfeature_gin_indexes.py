@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:23
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0008_opportunityfeature'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opportunityfeature',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skills'], name='opp_feature_skills_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunityfeature',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['keywords'], name='opp_feature_keywords_gin'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0009_opportunityfeature_gin_indexes'),
+        ('users', '0009_document_content_type_document_file_size_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationSnapshot',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation_snapshot', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('entries', models.JSONField(default=list)),
+                ('scoring_mode', models.CharField(max_length=20)),
+                ('computed_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
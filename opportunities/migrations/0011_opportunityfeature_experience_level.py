@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0010_recommendationsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opportunityfeature',
+            name='experience_level',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE opportunities_opportunityfeature AS feature
+                SET experience_level = COALESCE(opportunity.experience_level, '')
+                FROM opportunities_opportunity AS opportunity
+                WHERE opportunity.id = feature.opportunity_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
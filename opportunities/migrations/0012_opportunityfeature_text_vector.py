@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0011_opportunityfeature_experience_level'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opportunityfeature',
+            name='text_vector',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Same expression as Opportunity.weighted_search_vector()
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION opportunities_opportunity_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector(COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector(COALESCE(NEW.organization, '')), 'B') ||
+        setweight(to_tsvector(COALESCE(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER opportunities_opportunity_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, organization, description ON opportunities_opportunity
+    FOR EACH ROW EXECUTE FUNCTION opportunities_opportunity_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS opportunities_opportunity_search_vector_trigger ON opportunities_opportunity;
+DROP FUNCTION IF EXISTS opportunities_opportunity_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0012_opportunityfeature_text_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='opportunity',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='opportunity_search_gin'),
+        ),
+        # Existing rows are filled by `backfill_search_vectors`, in batches
+        migrations.RunSQL(sql=CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+    ]
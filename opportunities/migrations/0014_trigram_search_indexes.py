@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-17 08:01
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+import opportunities.search
+from django.db import migrations
+
+
+# array_to_string is only STABLE; this wrapper is IMMUTABLE for varchar[] so it can be indexed
+CREATE_SKILLS_TEXT = """
+CREATE OR REPLACE FUNCTION opportunities_skills_text(skills varchar[]) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT upper(array_to_string(skills, ' ')) $$;
+"""
+
+DROP_SKILLS_TEXT = "DROP FUNCTION IF EXISTS opportunities_skills_text(varchar[]);"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0013_opportunity_search_vector_trigger'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(sql=CREATE_SKILLS_TEXT, reverse_sql=DROP_SKILLS_TEXT),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='opportunity_title_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('organization'), name='gin_trgm_ops'), name='opportunity_org_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'), name='opportunity_location_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(opportunities.search.SkillsText('skills_required'), name='gin_trgm_ops'), name='opportunity_skills_trgm'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 08:06
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0014_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skills_required'], name='opportunity_skills_gin'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0015_opportunity_skills_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationsnapshot',
+            name='profile_generation',
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0016_recommendationsnapshot_profile_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opportunity',
+            name='is_active',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0017_opportunity_is_active'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='opportunityfeature',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.search import SearchVectorField, SearchVector
+from django.contrib.postgres.indexes import GinIndex
 from django.db.models import JSONField
 from django.utils.text import slugify
 from django.core.cache import cache
@@ -19,6 +20,9 @@ class Category(models.Model):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        OpportunityFeature.objects.filter(opportunity__category=self).exclude(
+            category_slug=self.slug
+        ).update(category_slug=self.slug)
 
     def __str__(self):
         return self.name
@@ -32,9 +36,14 @@ class Tag(models.Model):
     slug = models.SlugField(max_length=50, unique=True)
 
     def save(self, *args, **kwargs):
+        from opportunities.features import schedule_feature_refresh
+
+        is_rename = self.pk is not None
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        if is_rename:
+            schedule_feature_refresh(self.opportunities.values_list('id', flat=True))
 
     def __str__(self):
         return self.name
@@ -43,8 +52,11 @@ class Tag(models.Model):
 from django.db import models
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import OpClass
 from django.contrib.postgres.search import SearchVector, SearchVectorField
-from django.core.cache import cache
+from django.db.models.functions import Upper
+from utils.caching import bump_generation
+from opportunities.search import SkillsText
 from opportunities.models import Category, Tag
 
 class Opportunity(models.Model):
@@ -83,7 +95,10 @@ class Opportunity(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_verified = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
-    search_vector = SearchVectorField(null=True)
+    # Deactivated opportunities stay listed in the admin but are never recommended or searched
+    is_active = models.BooleanField(default=True, db_index=True)
+    # Weighted title (A), organization (B) and description (C) vector, maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
     view_count = models.PositiveIntegerField(default=0)
     application_count = models.PositiveIntegerField(default=0)
     application_url = models.URLField(blank=True)
@@ -112,15 +127,32 @@ class Opportunity(models.Model):
     ])
     import_batch_id = models.CharField(max_length=100, blank=True, null=True, db_index=True)
 
+    COUNTER_FIELDS = {'view_count', 'application_count'}
+
     def __str__(self):
         return f"{self.title} ({self.get_type_display()}) - {self.organization}"
 
     def save(self, *args, **kwargs):
+        from opportunities.features import FEATURE_SOURCE_FIELDS, schedule_feature_refresh
+
+        # search_vector is maintained by a database trigger (see migration 0013)
         super().save(*args, **kwargs)
-        Opportunity.objects.filter(pk=self.pk).update(
-            search_vector=SearchVector('title', 'description', 'organization')
+        update_fields = kwargs.get('update_fields')
+        # Counter-only saves (view/application tracking) don't change recommendation content
+        if update_fields is None or not set(update_fields) <= self.COUNTER_FIELDS:
+            bump_generation('opportunities')
+
+        if update_fields is None or FEATURE_SOURCE_FIELDS.intersection(update_fields):
+            schedule_feature_refresh([self.pk])
+
+    @staticmethod
+    def weighted_search_vector():
+        """The expression the search_vector trigger computes, for bulk backfills."""
+        return (
+            SearchVector('title', weight='A')
+            + SearchVector('organization', weight='B')
+            + SearchVector('description', weight='C')
         )
-        cache.delete_pattern('recommendations_*')
 
     class Meta:
         verbose_name_plural = "Opportunities"
@@ -129,8 +161,54 @@ class Opportunity(models.Model):
             models.Index(fields=['deadline']),
             models.Index(fields=['type', 'deadline']),
             models.Index(fields=['location']),
+            GinIndex(fields=['search_vector'], name='opportunity_search_gin'),
+            # Skill filters, @> and && (see opportunities.filtering)
+            GinIndex(fields=['skills_required'], name='opportunity_skills_gin'),
+            # Substring search (see opportunities.search)
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='opportunity_title_trgm'),
+            GinIndex(OpClass(Upper('organization'), name='gin_trgm_ops'), name='opportunity_org_trgm'),
+            GinIndex(OpClass(Upper('location'), name='gin_trgm_ops'), name='opportunity_location_trgm'),
+            GinIndex(OpClass(SkillsText('skills_required'), name='gin_trgm_ops'), name='opportunity_skills_trgm'),
         ]
 
+class OpportunityFeature(models.Model):
+    """
+    Precomputed matching features of an Opportunity, refreshed on every write
+    (see opportunities.features). Rebuild in bulk with `rebuild_opportunity_features`.
+    """
+    opportunity = models.OneToOneField(
+        Opportunity, on_delete=models.CASCADE, primary_key=True, related_name='features'
+    )
+    skills = ArrayField(models.CharField(max_length=50), blank=True, default=list)
+    keywords = ArrayField(models.TextField(), blank=True, default=list)
+    location = models.CharField(max_length=100, blank=True)
+    is_remote = models.BooleanField(default=False)
+    type = models.CharField(max_length=20)
+    category_slug = models.SlugField(max_length=100)
+    education_rank = models.SmallIntegerField(default=-1)
+    min_age = models.FloatField(null=True, blank=True)
+    max_age = models.FloatField(null=True, blank=True)
+    nationalities = ArrayField(models.CharField(max_length=100), blank=True, default=list)
+    is_featured = models.BooleanField(default=False)
+    created_date = models.DateField()
+    deadline = models.DateField(db_index=True)
+    experience_level = models.CharField(max_length=20, blank=True, default='')
+    # Hashed TF-IDF vector of the opportunity text, float32 bytes (see opportunities.text_vectors)
+    text_vector = models.BinaryField(null=True, blank=True)
+    # Indexed: rows refreshed since the last text vector build are looked up by it
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Features for opportunity {self.opportunity_id}"
+
+    class Meta:
+        indexes = [
+            # Posting lists for candidate retrieval (see opportunities.candidates)
+            GinIndex(fields=['skills'], name='opp_feature_skills_gin'),
+            GinIndex(fields=['keywords'], name='opp_feature_keywords_gin'),
+        ]
+
+
 class OpportunityApplication(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     opportunity = models.ForeignKey(Opportunity, on_delete=models.CASCADE)
@@ -143,3 +221,23 @@ class OpportunityApplication(models.Model):
 
     def __str__(self):
         return f"{self.user.email} applied for {self.opportunity.title}"
+
+
+class RecommendationSnapshot(models.Model):
+    """
+    Offline-computed top-N recommendations of a user, stored as compact
+    {'opportunity_id', 'score', 'reasons'} entries in ranking order.
+    Built by `build_recommendation_snapshots` (see opportunities.snapshots).
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+        related_name='recommendation_snapshot'
+    )
+    entries = models.JSONField(default=list)
+    scoring_mode = models.CharField(max_length=20)
+    computed_at = models.DateTimeField(db_index=True)
+    # profile:<user id> generation the entries were computed for; a profile edit makes the snapshot stale
+    profile_generation = models.BigIntegerField(null=True)
+
+    def __str__(self):
+        return f"Recommendation snapshot for {self.user_id} ({len(self.entries)} entries)"
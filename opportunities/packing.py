@@ -0,0 +1,97 @@
+"""
+Compact forms of recommendation rankings.
+
+Matcher results ({'opportunity', 'score', 'reasons'}) hold full Opportunity
+instances. What is stored is only the ranking itself:
+
+- entries: [{'opportunity_id', 'score', 'reasons'}] (JSON, RecommendationSnapshot)
+- packed rankings: the same top N as column arrays (the per-user ranking
+  cache). Ids and scores are NumPy arrays, each reason is a numeric column or
+  a small label table plus uint8 codes.
+
+Either form is turned back into results for one page with a single
+`in_bulk` + `select_related('category')` query.
+"""
+import numpy as np
+from django.utils import timezone
+
+from opportunities.models import Opportunity
+
+
+def compact_entries(results):
+    """Strip matcher results down to {'opportunity_id', 'score', 'reasons'} entries."""
+    return [
+        {
+            'opportunity_id': result['opportunity'].id,
+            'score': result['score'],
+            'reasons': result['reasons'],
+        }
+        for result in results
+    ]
+
+
+def hydrate_entries(entries):
+    """
+    Turn entries back into matcher results ({'opportunity', 'score', 'reasons'})
+    with a single query. Deleted, deactivated and expired opportunities are dropped.
+    """
+    opportunities = Opportunity.objects.select_related('category') \
+        .filter(deadline__gte=timezone.now().date(), is_active=True) \
+        .in_bulk([entry['opportunity_id'] for entry in entries])
+
+    return [
+        {
+            'opportunity': opportunities[entry['opportunity_id']],
+            'score': entry['score'],
+            'reasons': entry['reasons'],
+        }
+        for entry in entries
+        if entry['opportunity_id'] in opportunities
+    ]
+
+
+def _pack_column(values):
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        low, high = min(values, default=0), max(values, default=0)
+        return np.array(values, dtype=np.int16 if -2 ** 15 <= low and high < 2 ** 15 else np.int64)
+    if all(isinstance(value, float) for value in values):
+        return np.array(values, dtype=np.float64)
+    labels = sorted(set(values), key=repr)
+    codes = {label: code for code, label in enumerate(labels)}
+    return tuple(labels), np.array([codes[value] for value in values], dtype=np.uint8 if len(labels) < 256 else np.int32)
+
+
+def _unpack_column(column, start, stop):
+    if isinstance(column, tuple):
+        labels, codes = column
+        return [labels[code] for code in codes[start:stop].tolist()]
+    return column[start:stop].tolist()
+
+
+def pack_entries(entries):
+    """Column form of a ranking (entries best first). All entries must share reason keys."""
+    reason_keys = tuple(entries[0]['reasons']) if entries else ()
+    return {
+        'ids': np.array([entry['opportunity_id'] for entry in entries], dtype=np.int64),
+        'scores': _pack_column([entry['score'] for entry in entries]),
+        'reasons': {key: _pack_column([entry['reasons'][key] for entry in entries]) for key in reason_keys},
+    }
+
+
+def packed_length(packed):
+    return len(packed['ids'])
+
+
+def unpack_entries(packed, start=0, stop=None):
+    """Entries [start:stop] of a packed ranking."""
+    ids = packed['ids'][start:stop].tolist()
+    scores = _unpack_column(packed['scores'], start, stop)
+    reasons = {key: _unpack_column(column, start, stop) for key, column in packed['reasons'].items()}
+    return [
+        {
+            'opportunity_id': opportunity_id,
+            'score': scores[i],
+            'reasons': {key: values[i] for key, values in reasons.items()},
+        }
+        for i, opportunity_id in enumerate(ids)
+    ]
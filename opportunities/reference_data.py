@@ -0,0 +1,32 @@
+"""
+Cached lookups of categories and tags by name/slug.
+
+Imports resolve the same handful of categories and skill tags for every row;
+these lookups go through a two-tier cache (per worker, then the shared cache)
+versioned by the 'tags' generation, which every Category/Tag change bumps.
+Only primary keys are cached: model instances would be shared between the
+requests and threads of a worker, so a mutation on one would leak into the
+others.
+"""
+from opportunities.models import Category, Tag
+from utils.caching import TwoTierCache
+
+reference_cache = TwoTierCache('reference_data', maxsize=2000, local_ttl=300, shared_ttl=60 * 60)
+
+
+def get_category_id_by_name(name):
+    """Id of the category with this name (case-insensitive), or None."""
+    return reference_cache.get_or_set(
+        f'category_name:{name.lower()}',
+        lambda: Category.objects.filter(name__iexact=name).values_list('id', flat=True).first(),
+        namespaces=('tags',),
+    )
+
+
+def get_tag_id_by_slug(slug):
+    """Id of the tag with this slug, or None."""
+    return reference_cache.get_or_set(
+        f'tag_slug:{slug}',
+        lambda: Tag.objects.filter(slug=slug).values_list('id', flat=True).first(),
+        namespaces=('tags',),
+    )
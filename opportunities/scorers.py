@@ -0,0 +1,218 @@
+"""
+Scorer registry shared by OpportunityMatcher and OpportunityService.
+
+A scorer turns an OpportunityFeatureMatrix and a user profile into component
+and final score arrays. Scorers register themselves by name; get_plan()
+compiles a scorer with a set of weights into a ScoringPlan, which is cached
+per process so the weight dict and vector are only built once.
+
+Registered scorers:
+
+- 'match': the OpportunityMatcher formula (skills, location, eligibility,
+  preferences, experience keywords, featured and recency boosts; 0-100).
+  Also available row by row ('python') and inside Postgres ('sql').
+- 'semantic': 'match' plus a lexical similarity component between the
+  user's CV text and the opportunity text (see opportunities.text_vectors).
+- 'service': the simpler formula OpportunityService used to compute on its
+  own (skills, reverse location containment, education placeholder; 0-1).
+  Kept for benchmarks only: its scale and reasons differ from the
+  recommendation responses, so it cannot rank recommendations.
+"""
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from config.constants import DEFAULT_KEYWORD_SCORE, MATCHING_WEIGHTS, SEMANTIC_MATCH_WEIGHT
+from opportunities.batch_scoring import BatchScorer, pack_user_bitset, popcount
+from opportunities.explain import NULL_TRACE
+from opportunities.text_vectors import semantic_scores, user_text
+
+_REGISTRY = {}
+
+
+def register_scorer(cls):
+    """Class decorator adding a scorer to the registry under its `name`."""
+    _REGISTRY[cls.name] = cls()
+    return cls
+
+
+def available_scorers():
+    return sorted(_REGISTRY)
+
+
+class ScoringPlan:
+    """A scorer compiled with fixed weights."""
+
+    def __init__(self, scorer, weights):
+        self.scorer = scorer
+        self.weights = dict(weights)
+        self.weight_vector = np.array([self.weights.get(c, 0.0) for c in scorer.components], dtype=np.float64)
+
+    def score_matrix(self, matrix, user_profile, top_k=None, trace=NULL_TRACE):
+        """
+        Score every row of the matrix. Returns a dict of arrays with 'score',
+        one entry per component, and 'selected': row indexes in ranking order
+        (the best top_k when given).
+        """
+        return self.scorer.score_matrix(self, matrix, user_profile, top_k, trace)
+
+    def reasons(self, components, row):
+        return self.scorer.reasons(components, row)
+
+
+@lru_cache(maxsize=None)
+def _compile_plan(name, weight_items):
+    return ScoringPlan(_REGISTRY[name], dict(weight_items))
+
+
+def get_plan(name=None, weights=None):
+    """
+    Compiled plan for a registered scorer (RECOMMENDATION_SCORER by default)
+    with the given weights (the scorer's defaults when omitted).
+    """
+    name = name or getattr(settings, 'RECOMMENDATION_SCORER', 'match')
+    if name not in _REGISTRY:
+        raise ValueError(f"Unknown scorer: {name}")
+    weights = weights or _REGISTRY[name].default_weights
+    return _compile_plan(name, tuple(sorted(weights.items())))
+
+
+def get_recommendation_plan(name=None, weights=None):
+    """get_plan, restricted to scorers producing the recommendation scale and reasons."""
+    plan = get_plan(name, weights)
+    if not plan.scorer.ranks_recommendations:
+        raise ValueError(f"Scorer {plan.scorer.name} cannot rank recommendations")
+    return plan
+
+
+def _ranking(scores, top_k):
+    """Row indexes by score descending, row order on ties."""
+    selected = np.lexsort((np.arange(len(scores)), -scores))
+    return selected if top_k is None else selected[:top_k]
+
+
+@register_scorer
+class MatchScorer:
+    name = 'match'
+    ranks_recommendations = True
+    components = ('skills_match', 'location_match', 'education_match', 'preferences_match', 'experience_match')
+    default_weights = MATCHING_WEIGHTS
+    execution_modes = ('batch', 'python', 'sql')
+
+    def score_matrix(self, plan, matrix, user_profile, top_k, trace):
+        keyword_match_mode = getattr(settings, 'RECOMMENDATION_KEYWORD_MATCH_MODE', 'automaton')
+        scorer = BatchScorer(plan.weights, DEFAULT_KEYWORD_SCORE, keyword_match_mode)
+        return scorer.score(matrix, user_profile, top_k=top_k, trace=trace)
+
+    def reasons(self, components, row):
+        return BatchScorer.reasons(components, row)
+
+
+@register_scorer
+class SemanticMatchScorer(MatchScorer):
+    name = 'semantic'
+    components = MatchScorer.components + ('semantic_match',)
+    default_weights = {**MATCHING_WEIGHTS, 'semantic_match': SEMANTIC_MATCH_WEIGHT}
+    execution_modes = ('batch',)
+
+    def score_matrix(self, plan, matrix, user_profile, top_k, trace):
+        with trace.stage('scoring.semantic'):
+            semantic = semantic_scores(matrix.ids, user_text(user_profile))
+        keyword_match_mode = getattr(settings, 'RECOMMENDATION_KEYWORD_MATCH_MODE', 'automaton')
+        scorer = BatchScorer(plan.weights, DEFAULT_KEYWORD_SCORE, keyword_match_mode)
+        return scorer.score(
+            matrix, user_profile, top_k=top_k, trace=trace, extra_components={'semantic_match': semantic}
+        )
+
+    def reasons(self, components, row):
+        reasons = BatchScorer.reasons(components, row)
+        reasons['semantic_match'] = round(float(components['semantic_match'][row]) * 100)
+        return reasons
+
+
+@register_scorer
+class ServiceScorer:
+    name = 'service'
+    ranks_recommendations = False
+    components = ('skills_match', 'location_match', 'education_match')
+    default_weights = {key: MATCHING_WEIGHTS[key] for key in components}
+    execution_modes = ('batch',)
+
+    EDUCATION_PLACEHOLDER_SCORE = 0.5
+
+    def score_row(self, plan, opportunity, user_skills, user_location, user_education):
+        """Score a single Opportunity instance."""
+        total_score = 0.0
+
+        # Skills match
+        if user_skills and opportunity.skills_required:
+            skills_match = len(set(user_skills) & set(opportunity.skills_required))
+            skills_score = skills_match / len(opportunity.skills_required)
+            total_score += skills_score * plan.weights['skills_match']
+
+        # Location match
+        if user_location and opportunity.location:
+            location_match = user_location.lower() in opportunity.location.lower()
+            total_score += (1.0 if location_match else 0.0) * plan.weights['location_match']
+
+        # Education match (simplified)
+        if user_education and opportunity.experience_level:
+            total_score += self.EDUCATION_PLACEHOLDER_SCORE * plan.weights['education_match']
+
+        return total_score
+
+    def score_matrix(self, plan, matrix, user_profile, top_k, trace):
+        """
+        Vectorized score_row over feature rows. Duplicate entries in
+        skills_required are ignored (features store them deduplicated).
+        """
+        n = matrix.size
+        user_skills = set(user_profile.skills or [])
+        user_location = (user_profile.location or '').lower()
+        user_education = getattr(user_profile, 'education_level', None)
+
+        with trace.stage('scoring.skills'):
+            skills = np.zeros(n)
+            if user_skills:
+                user_bits = pack_user_bitset(
+                    [matrix.skill_vocab.get(s) for s in user_skills], len(matrix.skill_vocab)
+                )
+                overlap = popcount(matrix.skill_bits & user_bits)
+                counts = matrix.skill_counts
+                skills = np.where(counts > 0, overlap / np.maximum(counts, 1), 0.0)
+
+        with trace.stage('scoring.location'):
+            location = np.zeros(n)
+            if user_location:
+                hits = np.fromiter(
+                    (bool(loc) and user_location in loc for loc in matrix.location_vocab.values),
+                    dtype=bool, count=len(matrix.location_vocab)
+                )
+                location = np.where(hits[matrix.location_codes], 1.0, 0.0)
+
+        with trace.stage('scoring.education'):
+            education = np.zeros(n)
+            if user_education:
+                education = np.where(matrix.has_experience_level, self.EDUCATION_PLACEHOLDER_SCORE, 0.0)
+
+        weight_vector = plan.weight_vector
+        score = 0.0 + skills * weight_vector[0] + location * weight_vector[1] + education * weight_vector[2]
+
+        with trace.stage('top_k_selection'):
+            selected = _ranking(score, top_k)
+
+        return {
+            'score': score,
+            'selected': selected,
+            'skills_match': skills,
+            'location_match': location,
+            'education_match': education,
+        }
+
+    def reasons(self, components, row):
+        return {
+            'skills_match': round(float(components['skills_match'][row]) * 100),
+            'location_match': round(float(components['location_match'][row]) * 100),
+            'education_match': round(float(components['education_match'][row]) * 100),
+        }
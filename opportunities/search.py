@@ -0,0 +1,36 @@
+"""
+Text search over opportunities.
+
+A query matches an opportunity when:
+- its full-text form matches the weighted search_vector (title, organization
+  and description; GIN index). Descriptions are only searched this way;
+- or it is a substring of the title, organization or skills. These are
+  icontains lookups, served by pg_trgm GIN indexes on UPPER(column), the form
+  Django compares on Postgres.
+
+Postgres combines the index scans of the alternatives with a BitmapOr, so no
+branch falls back to a sequential scan of the table.
+"""
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import Func, Q, TextField
+from django.db.models.lookups import Contains
+
+
+class SkillsText(Func):
+    """
+    UPPER of the skills joined by spaces. opportunities_skills_text() is an
+    IMMUTABLE SQL function (migration 0014), so it can back an index, unlike
+    array_to_string.
+    """
+    function = 'opportunities_skills_text'
+    output_field = TextField()
+
+
+def opportunity_search_filter(query):
+    """Q matching opportunities for a free-text query (see module docstring)."""
+    return (
+        Q(search_vector=SearchQuery(query))
+        | Q(title__icontains=query)
+        | Q(organization__icontains=query)
+        | Q(Contains(SkillsText('skills_required'), query.upper()))
+    )
@@ -0,0 +1,63 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from opportunities.features import schedule_feature_refresh
+from opportunities.models import Category, Opportunity, Tag
+from users.models import (
+    EducationProfile, ExperienceProfile, OpportunitiesInterest, ParsedProfile, RecommendationPriority, UserProfile,
+)
+from utils.caching import bump_generation
+
+
+@receiver(m2m_changed, sender=Opportunity.tags.through)
+def refresh_features_on_tag_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Tag keywords are part of the opportunity features, so refresh them when tags change."""
+    if action == 'pre_clear' and reverse:
+        # tag.opportunities.clear() sends no pk_set: remember the opportunities losing the tag
+        instance._cleared_opportunity_ids = list(instance.opportunities.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        schedule_feature_refresh([instance.pk])
+    elif action == 'post_clear':
+        cleared = instance.__dict__.pop('_cleared_opportunity_ids', [])
+        if cleared:
+            schedule_feature_refresh(cleared)
+    elif pk_set:
+        schedule_feature_refresh(pk_set)
+    bump_generation('opportunities')
+
+
+@receiver(post_delete, sender=Opportunity)
+def invalidate_on_opportunity_delete(sender, instance, **kwargs):
+    bump_generation('opportunities')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_on_taxonomy_change(sender, instance, **kwargs):
+    bump_generation('tags')
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=ParsedProfile)
+@receiver(post_delete, sender=ParsedProfile)
+@receiver(post_save, sender=EducationProfile)
+@receiver(post_delete, sender=EducationProfile)
+@receiver(post_save, sender=ExperienceProfile)
+@receiver(post_delete, sender=ExperienceProfile)
+@receiver(post_save, sender=OpportunitiesInterest)
+@receiver(post_delete, sender=OpportunitiesInterest)
+@receiver(post_save, sender=RecommendationPriority)
+@receiver(post_delete, sender=RecommendationPriority)
+def invalidate_on_profile_change(sender, instance, **kwargs):
+    """
+    The matching profile and cached recommendations of a user are versioned by
+    their profile generation (see opportunities.user_profiles).
+    """
+    bump_generation(f'profile:{instance.user_id}')
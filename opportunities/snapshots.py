@@ -0,0 +1,78 @@
+"""
+Offline recommendation snapshots.
+
+`build_recommendation_snapshots` computes every active user's top-N
+recommendations ahead of time and stores them as compact entries in
+RecommendationSnapshot. Request handlers serve unfiltered recommendations from
+the snapshot with one primary-key read plus one hydration query, and fall back
+to live scoring when a user has no fresh snapshot. A snapshot is fresh while
+it is younger than RECOMMENDATION_SNAPSHOT_MAX_AGE_HOURS and was computed for
+the user's current profile generation (bumped on every profile edit, see
+opportunities.signals).
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from opportunities.matching import OpportunityMatcher
+from opportunities.models import RecommendationSnapshot
+from opportunities.packing import compact_entries, hydrate_entries
+from utils.caching import get_generations
+
+logger = logging.getLogger(__name__)
+
+
+def build_snapshots(user_profiles, size, scoring_mode=None):
+    """
+    Compute and store the top `size` recommendations of each user profile.
+    Returns (built, failed) counts; profiles that cannot be scored are skipped.
+    """
+    snapshots = []
+    failed = 0
+    for user_profile in user_profiles:
+        # Read before scoring: a profile edit made while scoring leaves the snapshot stale
+        profile_generation, = get_generations(f'profile:{user_profile.user_id}')
+        matcher = OpportunityMatcher(user_profile, scoring_mode=scoring_mode)
+        try:
+            results = matcher.compute_recommendations(size)
+        except Exception as e:
+            logger.error(f"Error building recommendation snapshot for user {user_profile.user_id}: {str(e)}")
+            failed += 1
+            continue
+        snapshots.append(RecommendationSnapshot(
+            user_id=user_profile.user_id,
+            entries=compact_entries(results),
+            scoring_mode=matcher.scoring_mode,
+            computed_at=timezone.now(),
+            profile_generation=profile_generation,
+        ))
+
+    RecommendationSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['entries', 'scoring_mode', 'computed_at', 'profile_generation'],
+    )
+    return len(snapshots), failed
+
+
+def get_snapshot(user):
+    """Return the user's snapshot if it is fresh (see the module docstring), else None."""
+    max_age = timedelta(hours=getattr(settings, 'RECOMMENDATION_SNAPSHOT_MAX_AGE_HOURS', 24))
+    snapshot = RecommendationSnapshot.objects.filter(
+        user_id=user.id,
+        computed_at__gte=timezone.now() - max_age,
+    ).first()
+    if snapshot is None or snapshot.profile_generation != get_generations(f'profile:{user.id}')[0]:
+        return None
+    return snapshot
+
+
+def get_snapshot_recommendations(user):
+    """Hydrated snapshot recommendations of the user, or None when there is no fresh snapshot."""
+    snapshot = get_snapshot(user)
+    if snapshot is None:
+        return None
+    return hydrate_entries(snapshot.entries)
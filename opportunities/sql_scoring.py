@@ -0,0 +1,166 @@
+"""
+Database-side scoring for OpportunityMatcher.
+
+The scoring formula is expressed as annotations over OpportunityFeature so
+Postgres computes every score and only the top rows (ORDER BY score DESC
+LIMIT n) cross the wire. All arithmetic runs in double precision in the
+same order as OpportunityMatcher._score_opportunities, so scores are
+identical to the Python scorers.
+"""
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Floor, Least
+from django.utils import timezone
+
+from opportunities.features import NO_REQUIREMENT, UNKNOWN_LEVEL, education_rank
+from opportunities.keyword_matching import summary_tokens
+
+COMPONENTS = ['skills_match', 'location_match', 'education_match', 'preference_match', 'experience_match']
+
+SKILLS_SQL = """
+    CASE WHEN cardinality(skills) = 0 THEN 1.0::float8
+    ELSE cardinality(ARRAY(
+        SELECT unnest(skills) INTERSECT SELECT unnest(%s::varchar[])
+    ))::float8 / cardinality(skills) END
+"""
+
+LOCATION_SQL = """
+    CASE WHEN is_remote OR (location <> '' AND strpos(%s, location) > 0) THEN 1.0::float8
+    ELSE 0.2::float8 END
+"""
+
+EXPERIENCE_SQL = """
+    CASE WHEN cardinality(keywords) = 0 THEN %s::float8
+    ELSE (
+        SELECT count(*) FROM unnest(keywords) AS keyword WHERE strpos(%s, keyword) > 0
+    )::float8 / cardinality(keywords) END
+"""
+
+# Whole-token variant used when RECOMMENDATION_KEYWORD_MATCH_MODE is 'token'
+EXPERIENCE_TOKEN_SQL = """
+    CASE WHEN cardinality(keywords) = 0 THEN %s::float8
+    ELSE cardinality(ARRAY(
+        SELECT unnest(keywords) INTERSECT SELECT unnest(%s::text[])
+    ))::float8 / cardinality(keywords) END
+"""
+
+RECENCY_SQL = "GREATEST(0, 1 - (%s::date - created_date)::float8 / 30)"
+
+
+def _float(value):
+    return Value(value, output_field=FloatField())
+
+
+def _flag(condition, value=1.0):
+    return Case(When(condition, then=_float(value)), default=_float(0.0), output_field=FloatField())
+
+
+class SQLScorer:
+    """Builds the scoring query for one user profile over OpportunityFeature rows."""
+
+    def __init__(self, weights, default_keyword_score, keyword_match_mode='automaton'):
+        self.weights = weights
+        self.default_keyword_score = default_keyword_score
+        self.keyword_match_mode = keyword_match_mode
+
+    def eligibility_condition(self, user_education):
+        """Q mirroring OpportunityMatcher._check_eligibility on the feature columns."""
+        condition = Q()
+
+        user_level = user_education.get('highest_level')
+        if user_level:
+            user_rank = education_rank(user_level)
+            if user_rank == UNKNOWN_LEVEL:
+                condition &= Q(education_rank=NO_REQUIREMENT)
+            else:
+                condition &= ~Q(education_rank=UNKNOWN_LEVEL) & ~Q(education_rank__gt=user_rank)
+
+        user_age = user_education.get('age')
+        if user_age is not None:
+            condition &= Q(min_age__isnull=True) | Q(min_age__lte=user_age)
+            condition &= Q(max_age__isnull=True) | Q(max_age__gte=user_age)
+
+        nationality = user_education.get('nationality')
+        if nationality:
+            condition &= Q(nationalities=[]) | Q(nationalities__contains=[nationality])
+        else:
+            condition &= Q(nationalities=[])
+
+        return condition
+
+    def annotations(self, user_profile):
+        """Component and final score expressions, keyed by annotation name."""
+        preferences = user_profile.preferences
+        summary = (user_profile.summary or '').lower()
+
+        preference_match = _float(0.0)
+        if preferences.get('preferred_type') is not None:
+            preference_match = _flag(Q(type=preferences['preferred_type']), 0.5)
+        if preferences.get('preferred_category') is not None:
+            preference_match = preference_match + _flag(Q(category_slug=preferences['preferred_category']), 0.5)
+
+        if not summary:
+            experience_match = _float(0.0)
+        elif self.keyword_match_mode == 'token':
+            experience_match = RawSQL(
+                EXPERIENCE_TOKEN_SQL, (self.default_keyword_score, sorted(summary_tokens(summary))),
+                output_field=FloatField()
+            )
+        else:
+            # Postgres substring search gives the same results as the automaton
+            experience_match = RawSQL(
+                EXPERIENCE_SQL, (self.default_keyword_score, summary), output_field=FloatField()
+            )
+
+        components = {
+            'skills_match': RawSQL(SKILLS_SQL, (sorted(set(user_profile.skills)),), output_field=FloatField()),
+            'location_match': RawSQL(LOCATION_SQL, (user_profile.location.lower(),), output_field=FloatField()),
+            'education_match': _flag(self.eligibility_condition(user_profile.education)),
+            'preference_match': preference_match,
+            'experience_match': experience_match,
+        }
+
+        total = (
+            _float(self.weights['skills_match']) * F('skills_match') +
+            _float(self.weights['location_match']) * F('location_match') +
+            _float(self.weights['education_match']) * F('education_match') +
+            _float(self.weights['preferences_match']) * F('preference_match') +
+            _float(self.weights['experience_match']) * F('experience_match')
+        )
+
+        # Apply boosts (multiplying by 1.0 leaves non-featured totals unchanged)
+        featured_boost = Case(When(is_featured=True, then=_float(1.1)), default=_float(1.0), output_field=FloatField())
+        total = total * featured_boost
+        recency_boost = RawSQL(RECENCY_SQL, (timezone.now().date(),), output_field=FloatField())
+        total = total * (_float(1) + recency_boost * _float(0.1))
+
+        components['score'] = Least(_float(100), Floor(total * _float(100)))
+        return components
+
+    def score(self, queryset, user_profile, top_k=None):
+        """
+        Score the opportunities of the queryset and return value dicts with
+        `opportunity_id`, `score` and the component scores, best first
+        (ties by id). With top_k only the first top_k rows are fetched.
+        """
+        from opportunities.models import OpportunityFeature
+
+        rows = OpportunityFeature.objects.filter(opportunity__in=queryset.values('pk')) \
+            .annotate(**self.annotations(user_profile)) \
+            .order_by('-score', 'opportunity_id') \
+            .values('opportunity_id', 'score', *COMPONENTS)
+
+        if top_k is not None:
+            rows = rows[:top_k]
+        return list(rows)
+
+    @staticmethod
+    def reasons(row):
+        """Build the `reasons` dict for a scored row, matching the per-row scorer."""
+        return {
+            'skills_match': round(row['skills_match'] * 100),
+            'location_match': round(row['location_match'] * 100),
+            'eligibility': "Eligible" if row['education_match'] else "Not eligible",
+            'preference_match': round(row['preference_match'] * 100),
+            'experience_match': round(row['experience_match'] * 100),
+        }
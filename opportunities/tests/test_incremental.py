@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from opportunities.models import Opportunity, Category
+from opportunities.matching import OpportunityMatcher, recommendation_cache, recommendation_cache_key
+from opportunities.incremental import merge_ranking, refresh_recommendations_for_batch, schedule_batch_refresh
+from opportunities.user_profiles import get_matching_profile
+from users.models import ParsedProfile, UserProfile
+from utils.caching import bump_generation, get_generations
+
+
+class IncrementalMergeTests(TestCase):
+    @staticmethod
+    def _entries(*pairs):
+        return [{'opportunity_id': opportunity_id, 'score': score} for opportunity_id, score in pairs]
+
+    def _merge(self, entries, new_entries, active_ids, cache_size):
+        return merge_ranking(entries, new_entries, active_ids, cache_size, lambda entry: entry['opportunity_id'])
+
+    def test_new_entries_merged_and_expired_dropped(self):
+        cached = self._entries((1, 90), (2, 70), (3, 50))
+        merged = self._merge(cached, self._entries((10, 80), (11, 40)), {1, 3}, 10)
+        self.assertEqual([e['opportunity_id'] for e in merged], [1, 10, 3, 11])
+
+    def test_truncated_ranking_keeps_only_exact_prefix(self):
+        cached = self._entries((1, 90), (2, 70), (3, 50))
+        merged = self._merge(cached, self._entries((10, 80), (11, 40)), {1, 2, 3}, 3)
+        self.assertEqual([e['opportunity_id'] for e in merged], [1, 10, 2])
+
+        # Dropping an entry leaves fewer exact rows than the cache size
+        self.assertIsNone(self._merge(cached, self._entries((11, 40)), {1, 3}, 3))
+
+    def test_import_carries_cached_rankings_to_the_new_generation(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(email='incremental@example.com', password='pass1234')
+        UserProfile.objects.create(user=user, country='Nigeria')
+        ParsedProfile.objects.create(user=user, summary='Backend developer', skills=['Python'])
+        category = Category.objects.create(name='Technology', slug='technology')
+        defaults = dict(
+            type='job', organization='Org', category=category, location='Lagos', description='Role',
+            deadline=timezone.now().date() + timedelta(days=30)
+        )
+        existing = Opportunity.objects.create(title='Existing', skills_required=['Python'], **defaults)
+        profile = get_matching_profile(user)
+        OpportunityMatcher(profile, candidate_limit=0).get_recommended_opportunities()
+        since_generation, = get_generations('opportunities')
+
+        imported = Opportunity.objects.create(
+            title='Imported', skills_required=['Python'], import_batch_id='batch-1', **defaults
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('opportunities')
+        self.assertEqual(refresh_recommendations_for_batch('batch-1', since_generation=since_generation)['updated'], 1)
+
+        packed, _ = recommendation_cache.get(recommendation_cache_key(user.id, 'match'))
+        self.assertEqual(set(packed['ids'].tolist()), {existing.id, imported.id})
+
+    def test_batch_refresh_runs_after_commit_and_swallows_errors(self):
+        calls = []
+
+        def failing_refresh(batch_id, since_generation=None):
+            calls.append(batch_id)
+            raise RuntimeError('scoring failed')
+
+        with patch('opportunities.incremental.refresh_recommendations_for_batch', failing_refresh), \
+                patch('opportunities.incremental.threading.Thread') as thread:
+            thread.side_effect = lambda target, args, daemon: SimpleNamespace(start=lambda: target(*args))
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                schedule_batch_refresh('batch-1')
+            self.assertEqual(calls, [])
+
+            with self.assertLogs('opportunities.incremental', level='ERROR'):
+                for callback in callbacks:
+                    callback()
+        self.assertEqual(calls, ['batch-1'])
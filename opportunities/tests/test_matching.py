@@ -1,9 +1,20 @@
 from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
-from opportunities.models import Opportunity, Category, Tag
-from opportunities.matching import OpportunityMatcher
-from users.models import UserProfile
+import random
+from unittest.mock import patch
+from opportunities.models import Opportunity, OpportunityFeature, Category, Tag
+from opportunities.matching import OpportunityMatcher, recommendation_cache, recommendation_cache_key
+from opportunities.features import load_opportunity_features, refresh_opportunity_features
+from opportunities.batch_scoring import OpportunityFeatureMatrix
+from opportunities.scorers import get_plan
+from opportunities.candidates import candidate_ids
+from opportunities.keyword_matching import AhoCorasick, KeywordMatcher
+from opportunities.explain import RecommendationTrace
+from opportunities.user_profiles import get_matching_profile, matching_profile_cache
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from users.models import EducationProfile, OpportunitiesInterest, ParsedProfile, UserProfile
 
 class MockUserProfile:
     """Mock user profile for testing"""
@@ -20,6 +31,7 @@ class MockUserProfile:
             'preferred_category': 'technology'
         }
         self.location = 'Lagos, Nigeria'
+        self.summary = 'Python developer building Django and JavaScript applications'
 
 class MatchingAlgorithmTests(TestCase):
     def setUp(self):
@@ -105,3 +117,424 @@ class MatchingAlgorithmTests(TestCase):
         self.assertGreaterEqual(recommendations[1]['score'], 40)
         # Non-match should be low score
         self.assertLessEqual(recommendations[2]['score'], 30)
+
+    def test_explain_trace_records_stages(self):
+        cache.clear()
+        trace = RecommendationTrace()
+        matcher = OpportunityMatcher(self.user_profile, scoring_mode='batch', candidate_limit=0, trace=trace)
+        matcher.get_recommended_opportunities()
+
+        report = trace.as_dict()
+        self.assertEqual(report['cache'], {'matcher': 'miss'})
+        self.assertEqual(report['row_counts']['rows_scored'], 3)
+        for stage in ['cache_lookup', 'feature_fetch', 'feature_build', 'scoring.skills', 'hydration', 'sort']:
+            self.assertIn(stage, report['timings_ms'])
+
+        matcher.get_recommended_opportunities()
+        self.assertEqual(trace.as_dict()['cache'], {'matcher': 'hit'})
+
+    def test_cached_ranking_is_packed_and_hydrated_per_page(self):
+        cache.clear()
+        matcher = OpportunityMatcher(self.user_profile, scoring_mode='batch', candidate_limit=0)
+        computed = matcher.get_recommended_opportunities(limit=3)
+        page = matcher.get_recommended_opportunities(limit=2, offset=1)
+
+        packed, state = recommendation_cache.get(recommendation_cache_key(self.user_profile.user.id, 'match'))
+        self.assertEqual(state, 'hit')
+        self.assertEqual(packed['ids'].tolist(), [r['opportunity'].id for r in computed])
+
+        self.assertEqual(
+            [(r['opportunity'].id, r['score'], r['reasons']) for r in page],
+            [(r['opportunity'].id, r['score'], r['reasons']) for r in computed[1:3]]
+        )
+
+    def test_streamed_rows_are_projected(self):
+        matcher = OpportunityMatcher(self.user_profile)
+        rows = list(matcher._stream_scoring_rows(Opportunity.objects.filter(tags__slug='python')))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].id, self.perfect_match.id)
+        # Tag filters must not narrow the tags used for keyword scoring
+        self.assertEqual(sorted(rows[0].tag_names), ['Django', 'Python'])
+        self.assertFalse(hasattr(rows[0], 'description'))
+
+    def test_python_mode_resolves_keywords_with_one_automaton(self):
+        matchers = []
+
+        class RecordingMatcher(KeywordMatcher):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fallbacks = []
+                matchers.append(self)
+
+            def contains(self, keyword):
+                if keyword not in self.hits:
+                    self.fallbacks.append(keyword)
+                return super().contains(keyword)
+
+        matcher = OpportunityMatcher(self.user_profile, scoring_mode='python', candidate_limit=0)
+        with patch('opportunities.matching.KeywordMatcher', RecordingMatcher), \
+                patch('opportunities.keyword_matching.AhoCorasick', wraps=AhoCorasick) as automaton:
+            matcher._score_opportunities(Opportunity.objects.all())
+
+        self.assertEqual(automaton.call_count, 1)
+        self.assertEqual(len(matchers), 1)
+        self.assertEqual(matchers[0].mode, 'automaton')
+        self.assertTrue(matchers[0].hits['python'])
+        self.assertEqual(matchers[0].fallbacks, [])
+
+    def test_deactivated_opportunities_are_not_recommended(self):
+        cache.clear()
+        Opportunity.objects.filter(pk=self.perfect_match.pk).update(is_active=False)
+        recommendations = OpportunityMatcher(self.user_profile, candidate_limit=0).get_recommended_opportunities()
+        self.assertNotIn(self.perfect_match.id, [r['opportunity'].id for r in recommendations])
+
+    def test_opportunity_edit_invalidates_cached_ranking(self):
+        cache.clear()
+        trace = RecommendationTrace()
+        matcher = OpportunityMatcher(self.user_profile, candidate_limit=0, trace=trace)
+        matcher.get_recommended_opportunities()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.non_match.skills_required = ['Python', 'Django']
+            self.non_match.save()
+        matcher.get_recommended_opportunities()
+        self.assertEqual(trace.as_dict()['cache'], {'matcher': 'miss'})
+
+    def test_service_scorer_cannot_rank_recommendations(self):
+        with self.assertRaises(ValueError):
+            OpportunityMatcher(self.user_profile, scorer='service')
+
+    def test_filters_accept_modes(self):
+        matcher = OpportunityMatcher(self.user_profile)
+        queryset = matcher._apply_filters(Opportunity.objects.all(), {
+            'skills': ['Python'], 'tags': ['python', 'django'],
+        })
+        self.assertEqual(set(queryset.values_list('id', flat=True)), {self.perfect_match.id})
+
+        queryset = matcher._apply_filters(Opportunity.objects.all(), {
+            'skills': ['Medicine', 'React'], 'skills_mode': 'any',
+        })
+        self.assertEqual(set(queryset.values_list('id', flat=True)), {self.partial_match.id, self.non_match.id})
+
+
+class BatchScoringParityTests(TestCase):
+    """The vectorized scorer must reproduce the per-row scores exactly."""
+
+    def setUp(self):
+        rng = random.Random(42)
+        categories = [
+            Category.objects.create(name=name, slug=name.lower())
+            for name in ['Technology', 'Healthcare', 'Education']
+        ]
+        tags = [
+            Tag.objects.create(name=name, slug=name.lower().replace(' ', '-'))
+            for name in ['Python', 'Machine Learning', 'Public Health', 'Django']
+        ]
+        skills = ['Python', 'Django', 'JavaScript', 'React', 'Medicine', 'Research', 'Writing']
+        levels = [None, 'high_school', 'bachelors', 'masters', 'phd', 'diploma']
+        locations = ['Lagos, Nigeria', 'Lagos', 'Accra, Ghana', 'London, UK', '']
+        titles = ['Python Developer', 'Research Fellow', 'Data Scientist', 'Nurse', 'Developer Advocate']
+
+        for i in range(60):
+            criteria = {}
+            level = rng.choice(levels)
+            if level:
+                criteria['education_level'] = level
+            if rng.random() < 0.5:
+                criteria['min_age'] = rng.randint(18, 30)
+            if rng.random() < 0.5:
+                criteria['max_age'] = rng.randint(24, 60)
+            if rng.random() < 0.3:
+                criteria['nationalities'] = rng.sample(['Nigerian', 'Ghanaian', 'Kenyan'], rng.randint(1, 2))
+
+            opportunity = Opportunity.objects.create(
+                title=rng.choice(titles),
+                type=rng.choice(['job', 'internship', 'scholarship']),
+                organization='Org %d' % i,
+                category=rng.choice(categories),
+                location=rng.choice(locations),
+                is_remote=rng.random() < 0.3,
+                description='Description %d' % i,
+                eligibility_criteria=criteria,
+                skills_required=rng.sample(skills, rng.randint(0, 4)),
+                is_featured=rng.random() < 0.2,
+                deadline=timezone.now().date() + timedelta(days=30)
+            )
+            opportunity.tags.add(*rng.sample(tags, rng.randint(0, 2)))
+            Opportunity.objects.filter(pk=opportunity.pk).update(
+                created_at=timezone.now() - timedelta(days=rng.randint(0, 45))
+            )
+
+        # queryset.update() bypasses Opportunity.save, so refresh the features explicitly
+        refresh_opportunity_features(Opportunity.objects.values_list('id', flat=True))
+
+    def _profiles(self):
+        default = MockUserProfile()
+
+        no_summary = MockUserProfile()
+        no_summary.summary = ''
+
+        unknown_level = MockUserProfile()
+        unknown_level.education = {'highest_level': 'diploma', 'age': 35, 'nationality': 'Kenyan'}
+        unknown_level.preferences = {'preferred_type': 'internship'}
+
+        sparse = MockUserProfile()
+        sparse.skills = []
+        sparse.education = {}
+        sparse.preferences = {}
+        sparse.location = ''
+
+        return [default, no_summary, unknown_level, sparse]
+
+    def test_batch_scores_match_per_row_scores(self):
+        queryset = Opportunity.objects.select_related('category').prefetch_related('tags').order_by('id')
+
+        for profile in self._profiles():
+            matcher = OpportunityMatcher(profile)
+            expected = matcher._score_opportunities(queryset)
+            actual = matcher._score_opportunities_batch(queryset)
+
+            self.assertEqual(len(actual), len(expected))
+            for row, reference in zip(actual, expected):
+                self.assertEqual(row['opportunity'].id, reference['opportunity'].id)
+                self.assertEqual(row['score'], reference['score'])
+                self.assertEqual(row['reasons'], reference['reasons'])
+
+    def test_batch_mode_ranks_like_python_mode(self):
+        profile = MockUserProfile()
+        batch = OpportunityMatcher(profile, scoring_mode='batch')._score_opportunities_batch(
+            Opportunity.objects.select_related('category').prefetch_related('tags')
+        )
+        python = OpportunityMatcher(profile, scoring_mode='python')._score_opportunities(
+            Opportunity.objects.select_related('category').prefetch_related('tags')
+        )
+
+        def ranking(results):
+            return [r['opportunity'].id for r in sorted(results, key=lambda r: (-r['score'], r['opportunity'].id))]
+
+        self.assertEqual(ranking(batch), ranking(python))
+
+    def test_modes_break_score_ties_by_id(self):
+        category = Category.objects.first()
+        clones = [
+            Opportunity.objects.create(
+                title='Python Developer', type='job', organization='Clone %d' % i, category=category,
+                location='Lagos, Nigeria', description='Clone', skills_required=['Python'],
+                deadline=timezone.now().date() + timedelta(days=30)
+            ).id
+            for i in range(5)
+        ]
+        # Meta ordering (-created_at), not id order
+        queryset = Opportunity.objects.all()
+
+        rankings = {}
+        for mode in ('python', 'batch', 'sql'):
+            matcher = OpportunityMatcher(MockUserProfile(), scoring_mode=mode, candidate_limit=0)
+            rankings[mode] = [(r['opportunity'].id, r['score']) for r in matcher._rank(queryset, top_k=100)]
+
+        self.assertEqual(len({score for id, score in rankings['python'] if id in clones}), 1)
+        self.assertEqual([id for id, score in rankings['python'] if id in clones], clones)
+        self.assertEqual(rankings['batch'], rankings['python'])
+        self.assertEqual(rankings['sql'], rankings['python'])
+
+    def test_top_k_matches_full_ranking(self):
+        queryset = Opportunity.objects.select_related('category').prefetch_related('tags').order_by('id')
+
+        for profile in self._profiles():
+            matcher = OpportunityMatcher(profile)
+            full = sorted(matcher._score_opportunities(queryset), key=lambda r: r['score'], reverse=True)
+            expected = [(r['opportunity'].id, r['score']) for r in full]
+
+            for k in (1, 10, 25, 100):
+                python = matcher._score_opportunities(queryset, top_k=k)
+                batch = matcher._score_opportunities_batch(queryset, top_k=k)
+                self.assertEqual([(r['opportunity'].id, r['score']) for r in python], expected[:k])
+                self.assertEqual([(r['opportunity'].id, r['score']) for r in batch], expected[:k])
+
+    def test_sql_scores_match_per_row_scores(self):
+        queryset = Opportunity.objects.select_related('category').prefetch_related('tags').order_by('id')
+
+        for profile in self._profiles():
+            matcher = OpportunityMatcher(profile)
+            expected = {r['opportunity'].id: r for r in matcher._score_opportunities(queryset)}
+            actual = matcher._score_opportunities_sql(queryset)
+
+            self.assertEqual(len(actual), len(expected))
+            for row in actual:
+                reference = expected[row['opportunity'].id]
+                self.assertEqual(row['score'], reference['score'])
+                self.assertEqual(row['reasons'], reference['reasons'])
+
+            top = matcher._score_opportunities_sql(queryset, top_k=10)
+            self.assertEqual(top, actual[:10])
+
+    def test_service_scorer_matrix_matches_score_row(self):
+        plan = get_plan('service')
+        self.assertIs(plan, get_plan('service'))
+
+        opportunities = list(Opportunity.objects.order_by('id'))
+        matrix = OpportunityFeatureMatrix(load_opportunity_features(Opportunity.objects.all()))
+        for profile in self._profiles():
+            profile.education_level = 'bachelors'
+            components = plan.score_matrix(matrix, profile)
+            expected = [
+                plan.scorer.score_row(plan, o, profile.skills, profile.location, profile.education_level)
+                for o in opportunities
+            ]
+            self.assertEqual(components['score'].tolist(), expected)
+
+
+class OpportunityFeatureTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.opportunity = Opportunity.objects.create(
+            title='Python Developer',
+            type='job',
+            organization='Tech Company',
+            category=self.category,
+            location='Lagos, Nigeria',
+            description='Looking for a Python developer',
+            eligibility_criteria={'education_level': 'masters', 'nationalities': ['Nigerian']},
+            skills_required=['Python', 'Django', 'Python'],
+            deadline=timezone.now().date() + timedelta(days=30)
+        )
+
+    def test_features_written_on_save(self):
+        features = OpportunityFeature.objects.get(opportunity=self.opportunity)
+        self.assertEqual(features.skills, ['Django', 'Python'])
+        self.assertEqual(features.keywords, ['developer', 'python'])
+        self.assertEqual(features.location, 'lagos, nigeria')
+        self.assertEqual(features.education_rank, 2)
+        self.assertEqual(features.nationalities, ['Nigerian'])
+
+        self.opportunity.skills_required = ['Go']
+        self.opportunity.save()
+        features.refresh_from_db()
+        self.assertEqual(features.skills, ['Go'])
+
+    def test_features_refreshed_on_tag_change(self):
+        self.opportunity.tags.add(Tag.objects.create(name='Machine Learning', slug='machine-learning'))
+        features = OpportunityFeature.objects.get(opportunity=self.opportunity)
+        self.assertEqual(features.keywords, ['developer', 'learning', 'machine', 'python'])
+
+    def test_features_refreshed_on_reverse_tag_clear(self):
+        tag = Tag.objects.create(name='Machine Learning', slug='machine-learning')
+        self.opportunity.tags.add(tag)
+
+        tag.opportunities.clear()
+        features = OpportunityFeature.objects.get(opportunity=self.opportunity)
+        self.assertEqual(features.keywords, ['developer', 'python'])
+
+    def test_missing_features_are_derived_without_writes(self):
+        expected = list(load_opportunity_features(Opportunity.objects.all()))
+        OpportunityFeature.objects.all().delete()
+
+        self.assertEqual(list(load_opportunity_features(Opportunity.objects.all())), expected)
+        matrix = OpportunityFeatureMatrix(load_opportunity_features(Opportunity.objects.all()))
+        self.assertEqual(matrix.ids.tolist(), [self.opportunity.id])
+        matcher = OpportunityMatcher(MockUserProfile(), scoring_mode='sql', candidate_limit=0)
+        results = matcher._score_opportunities_sql(Opportunity.objects.all())
+        self.assertEqual([r['opportunity'].id for r in results], [self.opportunity.id])
+        self.assertFalse(OpportunityFeature.objects.exists())
+
+
+class CandidateRetrievalTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Technology', slug='technology')
+        self.python_ids = set()
+        for i in range(12):
+            opportunity = Opportunity.objects.create(
+                title='Role %d' % i,
+                type='job',
+                organization='Org %d' % i,
+                category=category,
+                location='London, UK',
+                description='Role description',
+                skills_required=['Python'] if i % 3 == 0 else ['Medicine'],
+                deadline=timezone.now().date() + timedelta(days=30)
+            )
+            if i % 3 == 0:
+                self.python_ids.add(opportunity.id)
+
+    def test_candidate_set_is_bounded_and_prefers_skill_matches(self):
+        ids = candidate_ids(Opportunity.objects.all(), MockUserProfile().skills, 4)
+        self.assertEqual(set(ids), self.python_ids)
+
+        topped_up = candidate_ids(Opportunity.objects.all(), MockUserProfile().skills, 6)
+        self.assertEqual(len(topped_up), 6)
+        self.assertTrue(self.python_ids.issubset(topped_up))
+
+    def test_recall_against_full_scan(self):
+        report = OpportunityMatcher(MockUserProfile(), candidate_limit=4).measure_candidate_recall(k=4)
+        self.assertEqual(report['catalog_size'], 12)
+        self.assertEqual(report['candidate_count'], 4)
+        self.assertEqual(report['recall'], 1.0)
+
+    def test_truncation_keeps_the_largest_skill_overlap(self):
+        best = Opportunity.objects.create(
+            title='Full stack', type='job', organization='Org', category=Category.objects.get(slug='technology'),
+            location='London, UK', description='Role description', skills_required=['Python', 'Django', 'JavaScript'],
+            deadline=timezone.now().date() + timedelta(days=30)
+        )
+        # Oldest row: recency alone would truncate it away
+        Opportunity.objects.filter(pk=best.pk).update(created_at=timezone.now() - timedelta(days=365))
+        self.assertEqual(candidate_ids(Opportunity.objects.all(), MockUserProfile().skills, 1), [best.id])
+
+
+class KeywordMatchingTests(TestCase):
+    def test_automaton_matches_substring_semantics(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            text = ''.join(rng.choice('abc \n') for _ in range(rng.randint(0, 60)))
+            patterns = list({''.join(rng.choice('abc') for _ in range(rng.randint(1, 5))) for _ in range(10)})
+            found = AhoCorasick(patterns).find(text)
+            self.assertEqual(found, {i for i, pattern in enumerate(patterns) if pattern in text})
+            self.assertEqual(KeywordMatcher(text).match_all(patterns), [pattern in text for pattern in patterns])
+
+    def test_token_mode_matches_whole_words(self):
+        matcher = KeywordMatcher('Built Django apps (Python, JavaScript).', mode='token')
+        self.assertEqual(matcher.match_all(['django', 'python', 'java', 'app']), [True, True, False, False])
+
+        legacy = KeywordMatcher('Built Django apps (Python, JavaScript).', mode='substring')
+        self.assertEqual(legacy.match_all(['django', 'python', 'java', 'app']), [True, True, True, True])
+
+
+class UserMatchingProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        matching_profile_cache.clear_local()
+        self.user = get_user_model().objects.create_user(email='matching@example.com', password='pass1234')
+        UserProfile.objects.create(user=self.user, country='Nigeria')
+        ParsedProfile.objects.create(
+            user=self.user,
+            summary='Backend developer',
+            skills=['Python', {'name': 'Django'}],
+            education=[{'degree': 'BSc Computer Science'}],
+        )
+        OpportunitiesInterest.objects.create(user=self.user, internships=True)
+
+    def test_profile_built_from_user_models(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = get_matching_profile(self.user)
+
+        self.assertEqual(profile.user.id, self.user.id)
+        self.assertEqual(profile.skills, ['Python', 'Django'])
+        self.assertEqual(profile.education, {'highest_level': 'bachelors', 'nationality': 'Nigeria'})
+        self.assertEqual(profile.preferences, {'preferred_type': 'internship'})
+        self.assertEqual(profile.location, 'Nigeria')
+        self.assertIn('Backend developer', profile.summary)
+
+    def test_profile_edits_invalidate_cached_profile(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            get_matching_profile(self.user)
+        with patch('opportunities.user_profiles.build_matching_profile') as build:
+            get_matching_profile(self.user)
+        build.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EducationProfile.objects.create(
+                user=self.user, degree='MSc Data Science', school='University of Lagos',
+                start_date=timezone.now().date() - timedelta(days=700)
+            )
+        self.assertEqual(get_matching_profile(self.user).education['highest_level'], 'masters')
@@ -0,0 +1,189 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from opportunities.models import Opportunity, Category, Tag
+from opportunities.autocomplete import build_suggestion_index, suggestion_index
+from opportunities.facets import FACET_FIELDS, facet_counts, normalize_filters
+from opportunities.filtering import skills_filter, tags_filter
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        suggestion_index.index = None
+        category = Category.objects.create(name='Technology', slug='technology')
+        deadline = timezone.now().date() + timedelta(days=30)
+        postings = [('Data Engineer', 'Acme'), ('Data Engineer', 'Databricks'), ('Data Analyst', 'Acme')]
+        for title, organization in postings:
+            Opportunity.objects.create(
+                title=title, type='job', organization=organization, category=category, location='Lagos',
+                description='Role', skills_required=['Data Modeling'], deadline=deadline
+            )
+        Tag.objects.create(name='Data Science', slug='data-science')
+
+    def test_prefix_suggestions_ranked_by_count(self):
+        index = build_suggestion_index()
+        self.assertEqual(
+            [(s['text'], s['type'], s['count']) for s in index.suggest('  DATA', limit=4)],
+            [('Data Modeling', 'skill', 3), ('Data Engineer', 'title', 2), ('Data Analyst', 'title', 1),
+             ('Databricks', 'organization', 1)]
+        )
+        self.assertEqual([s['text'] for s in index.suggest('data', kinds=['tag'])], ['Data Science'])
+        self.assertEqual(index.suggest('zzz'), [])
+
+    def test_deactivated_opportunities_are_not_suggested(self):
+        Opportunity.objects.filter(organization='Databricks').update(is_active=False)
+        index = build_suggestion_index()
+        self.assertEqual(index.suggest('databricks'), [])
+        self.assertEqual(
+            [(s['text'], s['count']) for s in index.suggest('data', kinds=['title', 'skill'])],
+            [('Data Modeling', 2), ('Data Analyst', 1), ('Data Engineer', 1)]
+        )
+
+    def test_endpoint_sends_cache_headers_and_follows_generations(self):
+        url = reverse('opportunity-autocomplete')
+        response = self.client.get(url, {'q': 'data e'})
+        self.assertEqual([s['text'] for s in response.json()['suggestions']], ['Data Engineer'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Opportunity.objects.filter(title='Data Engineer').first().delete()
+        with override_settings(AUTOCOMPLETE_MIN_REBUILD_INTERVAL=0):
+            response = self.client.get(url, {'q': 'data e'})
+        self.assertEqual(response.json()['suggestions'][0]['count'], 1)
+
+
+class FacetCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tech = Category.objects.create(name='Technology', slug='technology')
+        self.finance = Category.objects.create(name='Finance', slug='finance')
+        self.python = Tag.objects.create(name='Python', slug='python')
+        self.django = Tag.objects.create(name='Django', slug='django')
+        deadline = timezone.now().date() + timedelta(days=30)
+        for i, (type, category, level, is_remote, source) in enumerate([
+            ('job', self.tech, 'entry', True, 'linkedin'),
+            ('job', self.tech, 'senior', False, 'indeed'),
+            ('internship', self.finance, 'entry', True, 'linkedin'),
+            ('grant', self.finance, 'mid', False, 'manual'),
+        ]):
+            opportunity = Opportunity.objects.create(
+                title=f'Opportunity {i}', type=type, organization='Org', category=category, location='Lagos',
+                is_remote=is_remote, experience_level=level, source=source, description='Role',
+                skills_required=['Python'], deadline=deadline
+            )
+            opportunity.tags.add(self.python, self.django)
+        Opportunity.objects.create(
+            title='Expired', type='job', organization='Org', category=self.tech, location='Lagos',
+            description='Role', deadline=timezone.now().date() - timedelta(days=1)
+        )
+
+    def grouped_counts(self, queryset, path):
+        return {
+            row[path]: row['count']
+            for row in queryset.order_by().values(path).annotate(count=Count('id', distinct=True))
+        }
+
+    def test_one_query_matches_per_facet_counts(self):
+        queryset = Opportunity.objects.filter(deadline__gte=timezone.now().date(), tags__slug='python')
+        with self.assertNumQueries(1):
+            data = facet_counts(queryset)
+
+        self.assertEqual(data['total'], 4)
+        for name, path in FACET_FIELDS.items():
+            self.assertEqual(
+                {bucket['value']: bucket['count'] for bucket in data['facets'][name]},
+                self.grouped_counts(queryset, path)
+            )
+        self.assertEqual(data['facets']['type'][0], {'value': 'job', 'count': 2})
+
+    def test_endpoint_applies_listing_filters(self):
+        response = self.client.get(reverse('opportunity-facets'), {'is_remote': 'true', 'page': '2'})
+        data = response.json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['facets']['is_remote'], [{'value': True, 'count': 2}])
+        self.assertEqual(
+            {bucket['value'] for bucket in data['facets']['category']}, {'technology', 'finance'}
+        )
+
+    def test_normalized_filters_ignore_paging_and_value_order(self):
+        first = QueryDict('skills=Python&skills=SQL&page=2&ordering=title')
+        second = QueryDict('skills=SQL&skills= Python&search=')
+        self.assertEqual(normalize_filters(first), normalize_filters(second))
+
+
+class SkillTagFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Technology', slug='technology')
+        python = Tag.objects.create(name='Python', slug='python')
+        remote = Tag.objects.create(name='Remote', slug='remote')
+        defaults = dict(
+            type='job', organization='Acme', category=category, location='Lagos', description='Role',
+            deadline=timezone.now().date() + timedelta(days=30)
+        )
+        self.both = Opportunity.objects.create(title='Backend', skills_required=['Python', 'SQL'], **defaults)
+        self.both.tags.add(python, remote)
+        self.python = Opportunity.objects.create(title='Scripting', skills_required=['Python'], **defaults)
+        self.python.tags.add(python)
+        self.other = Opportunity.objects.create(title='Design', skills_required=['Figma'], **defaults)
+
+    def ids(self, q):
+        return set(Opportunity.objects.filter(q).values_list('id', flat=True))
+
+    def test_all_and_any_modes(self):
+        self.assertEqual(self.ids(skills_filter(['Python', 'SQL'])), {self.both.id})
+        self.assertEqual(self.ids(skills_filter(['SQL', 'Figma'], 'any')), {self.both.id, self.other.id})
+        self.assertEqual(self.ids(tags_filter(['python', 'remote'])), {self.both.id})
+        self.assertEqual(self.ids(tags_filter(['python', 'remote'], 'any')), {self.both.id, self.python.id})
+        self.assertEqual(self.ids(tags_filter(['python'])), {self.both.id, self.python.id})
+
+    def test_filters_are_single_predicates(self):
+        sql = str(Opportunity.objects.filter(skills_filter(['Python', 'SQL', 'Go'])).query)
+        self.assertEqual(sql.count('@>'), 1)
+        sql = str(Opportunity.objects.filter(tags_filter(['python', 'remote', 'senior'])).query)
+        self.assertEqual(sql.count('EXISTS'), 1)
+        self.assertNotIn('JOIN "opportunities_opportunity_tags" ON ("opportunities_opportunity"', sql)
+
+    def test_skill_filters_use_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        for mode in ('all', 'any'):
+            plan = Opportunity.objects.filter(skills_filter(['Python', 'SQL'], mode)).explain()
+            self.assertIn('opportunity_skills_gin', plan)
+
+    def test_listing_accepts_modes(self):
+        response = self.client.get(reverse('opportunity-list'), {
+            'skills': ['SQL', 'Figma'], 'skills_mode': 'any', 'tags': ['python'], 'page_size': 50,
+        })
+        self.assertEqual({row['id'] for row in response.json()['results']}, {self.both.id})
+
+
+class DeactivatedOpportunityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Technology', slug='technology')
+        defaults = dict(
+            type='job', organization='Acme', category=category, location='Lagos', description='Python role',
+            deadline=timezone.now().date() + timedelta(days=30)
+        )
+        self.active = Opportunity.objects.create(title='Python Developer', **defaults)
+        self.inactive = Opportunity.objects.create(title='Python Engineer', is_active=False, **defaults)
+
+    def ids(self, response):
+        return {row['id'] for row in response.json()['results']}
+
+    def test_listing_search_and_facets_exclude_deactivated(self):
+        self.assertEqual(self.ids(self.client.get(reverse('opportunity-list'))), {self.active.id})
+        self.assertEqual(
+            self.ids(self.client.get(reverse('opportunity-list'), {'search': 'python'})), {self.active.id}
+        )
+
+        data = self.client.get(reverse('opportunity-facets')).json()
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['facets']['type'], [{'value': 'job', 'count': 1}])
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.test import TestCase
+from opportunities.api.serializers import BulkJobCreateSerializer
+from opportunities.models import Category, Tag
+from opportunities.reference_data import get_category_id_by_name, get_tag_id_by_slug, reference_cache
+
+
+class ReferenceDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reference_cache.clear_local()
+        self.category = Category.objects.create(name='Technology', slug='technology')
+        self.tag = Tag.objects.create(name='Python', slug='python')
+
+    def test_lookups_cache_primary_keys(self):
+        self.assertEqual(get_category_id_by_name('technology'), self.category.id)
+        self.assertEqual(get_tag_id_by_slug('python'), self.tag.id)
+        self.assertIsNone(get_tag_id_by_slug('missing'))
+
+    def test_import_attaches_cached_ids(self):
+        serializer = BulkJobCreateSerializer(data={'jobs': [{
+            'title': 'Backend Developer', 'organization': 'Acme', 'location': 'Lagos',
+            'description': 'Python and Django services', 'category_name': 'Technology',
+        }]})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        result = serializer.save()
+
+        opportunity = result['opportunities'][0]
+        self.assertEqual(opportunity.category_id, self.category.id)
+        self.assertEqual(
+            set(opportunity.tags.values_list('slug', flat=True)), {'python', 'django'}
+        )
+        self.assertEqual(Tag.objects.filter(slug='python').count(), 1)
@@ -0,0 +1,82 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from opportunities.models import Opportunity, Category
+from opportunities.search import opportunity_search_filter
+
+
+class SearchVectorTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Technology', slug='technology')
+
+    def _opportunity(self, title, organization, description):
+        return Opportunity(
+            title=title, type='job', organization=organization, category=self.category, location='Lagos',
+            description=description, deadline=timezone.now().date() + timedelta(days=30)
+        )
+
+    def test_trigger_fills_weighted_vector_for_bulk_and_single_writes(self):
+        Opportunity.objects.bulk_create([
+            self._opportunity('Kubernetes Engineer', 'Acme', 'Run clusters'),
+            self._opportunity('Platform Engineer', 'Kubernetes Foundation', 'Run clusters'),
+            self._opportunity('Support Engineer', 'Acme', 'Answer Kubernetes questions'),
+        ])
+        query = SearchQuery('kubernetes')
+        ranked = Opportunity.objects.annotate(rank=SearchRank(F('search_vector'), query)) \
+            .filter(search_vector=query).order_by('-rank')
+        # Title (A) outranks organization (B), which outranks description (C)
+        self.assertEqual(
+            [o.title for o in ranked], ['Kubernetes Engineer', 'Platform Engineer', 'Support Engineer']
+        )
+
+        opportunity = Opportunity.objects.get(title='Support Engineer')
+        opportunity.title = 'Support Lead'
+        opportunity.save()
+        self.assertTrue(Opportunity.objects.filter(pk=opportunity.pk, search_vector=SearchQuery('lead')).exists())
+
+        # Counter-only saves leave the vector alone
+        opportunity.view_count = 3
+        opportunity.save(update_fields=['view_count'])
+        self.assertTrue(Opportunity.objects.filter(pk=opportunity.pk, search_vector=SearchQuery('lead')).exists())
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Technology', slug='technology')
+        defaults = dict(
+            type='job', category=category, location='Lagos', deadline=timezone.now().date() + timedelta(days=30)
+        )
+        self.by_title = Opportunity.objects.create(
+            title='Pythonista Engineer', organization='Acme', description='Backend work', **defaults
+        )
+        self.by_description = Opportunity.objects.create(
+            title='Engineer', organization='Acme', description='Write python services', **defaults
+        )
+        self.by_skills = Opportunity.objects.create(
+            title='Analyst', organization='Acme', description='Reports', skills_required=['Python', 'SQL'], **defaults
+        )
+        Opportunity.objects.create(title='Designer', organization='Studio', description='Figma', **defaults)
+
+    def _plan(self, queryset):
+        # The test tables are tiny: make the planner show which indexes it can use
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_search_filter_matches_and_uses_indexes(self):
+        queryset = Opportunity.objects.filter(opportunity_search_filter('python'))
+        self.assertEqual(
+            set(queryset.values_list('id', flat=True)), {self.by_title.id, self.by_description.id, self.by_skills.id}
+        )
+
+        plan = self._plan(queryset)
+        indexes = ['opportunity_search_gin', 'opportunity_title_trgm', 'opportunity_org_trgm', 'opportunity_skills_trgm']
+        for index in indexes:
+            self.assertIn(index, plan)
+        self.assertNotIn('Seq Scan', plan)
+
+    def test_icontains_filters_use_trigram_indexes(self):
+        self.assertIn('opportunity_location_trgm', self._plan(Opportunity.objects.filter(location__icontains='lagos')))
@@ -0,0 +1,81 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from opportunities.models import Opportunity, RecommendationSnapshot, Category
+from opportunities.matching import OpportunityMatcher
+from opportunities.snapshots import build_snapshots, get_snapshot_recommendations
+from opportunities.user_profiles import UserMatchingProfile
+from users.models import ParsedProfile, UserProfile
+
+
+class RecommendationSnapshotTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Technology', slug='technology')
+        self.opportunities = [
+            Opportunity.objects.create(
+                title='Python Developer %d' % i,
+                type='job',
+                organization='Org %d' % i,
+                category=category,
+                location='Lagos, Nigeria',
+                description='Role description',
+                skills_required=['Python', 'Django'][:i % 2 + 1],
+                deadline=timezone.now().date() + timedelta(days=30)
+            )
+            for i in range(5)
+        ]
+        self.user = get_user_model().objects.create_user(email='snapshot@example.com', password='pass1234')
+        self.user_profile = UserMatchingProfile(
+            user_id=self.user.id,
+            skills=['Python', 'Django', 'JavaScript'],
+            education={'highest_level': 'bachelors', 'age': 25, 'nationality': 'Nigerian'},
+            preferences={'preferred_type': 'job', 'preferred_category': 'technology'},
+            location='Lagos, Nigeria',
+            summary='Python developer building Django and JavaScript applications',
+        )
+
+    def test_snapshot_stores_compact_top_n(self):
+        self.assertEqual(build_snapshots([self.user_profile], 3), (1, 0))
+
+        snapshot = RecommendationSnapshot.objects.get(user=self.user)
+        expected = OpportunityMatcher(self.user_profile).compute_recommendations(3)
+        self.assertEqual(
+            [(entry['opportunity_id'], entry['score']) for entry in snapshot.entries],
+            [(r['opportunity'].id, r['score']) for r in expected]
+        )
+
+        recommendations = get_snapshot_recommendations(self.user)
+        self.assertEqual([r['opportunity'].id for r in recommendations], [r['opportunity'].id for r in expected])
+
+    def test_expired_and_stale_snapshots(self):
+        build_snapshots([self.user_profile], 5)
+        expired = get_snapshot_recommendations(self.user)[0]['opportunity']
+        Opportunity.objects.filter(pk=expired.pk).update(deadline=timezone.now().date() - timedelta(days=1))
+        self.assertNotIn(expired.id, [r['opportunity'].id for r in get_snapshot_recommendations(self.user)])
+
+        RecommendationSnapshot.objects.filter(user=self.user).update(computed_at=timezone.now() - timedelta(days=7))
+        self.assertIsNone(get_snapshot_recommendations(self.user))
+
+    def test_build_command_scores_user_profiles(self):
+        UserProfile.objects.create(user=self.user, country='Nigeria')
+        ParsedProfile.objects.create(user=self.user, summary='Backend developer', skills=['Django'])
+        out = StringIO()
+        call_command('build_recommendation_snapshots', workers=1, stdout=out)
+
+        self.assertIn('Successfully built 1 snapshots (0 failed)', out.getvalue())
+        snapshot = RecommendationSnapshot.objects.get(user=self.user)
+        self.assertEqual(len(snapshot.entries), len(self.opportunities))
+        self.assertEqual(get_snapshot_recommendations(self.user)[0]['opportunity'].skills_required, ['Python', 'Django'])
+
+    def test_profile_edit_makes_snapshot_stale(self):
+        cache.clear()
+        build_snapshots([self.user_profile], 5)
+        self.assertIsNotNone(get_snapshot_recommendations(self.user))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserProfile.objects.create(user=self.user, country='Ghana')
+        self.assertIsNone(get_snapshot_recommendations(self.user))
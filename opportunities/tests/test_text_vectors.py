@@ -0,0 +1,70 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from datetime import timedelta
+import shutil
+import tempfile
+import numpy as np
+from opportunities.models import Opportunity, Category
+from opportunities.text_vectors import TextVectorIndex, TextVectorIndexWriter, TextVectorizer, semantic_scores
+
+
+class TextVectorTests(TestCase):
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir, ignore_errors=True)
+        self.settings_override = override_settings(RECOMMENDATION_TEXT_VECTOR_PATH=self.index_dir)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_index_similarities(self):
+        vectorizer = TextVectorizer()
+        texts = ['Python Django backend developer', 'Registered nurse in public health', 'Python data scientist']
+        writer = TextVectorIndexWriter(len(texts), vectorizer.dim)
+        for row, text in enumerate(texts):
+            writer.vectors[row] = vectorizer.transform(text)
+        writer.publish([2, 5, 9], vectorizer.idf)
+
+        index = TextVectorIndex.current()
+        query = vectorizer.transform('I build web applications with Python and Django')
+        scores, missing = index.similarities(np.array([2, 5, 7, 9]), query)
+        self.assertEqual(missing.tolist(), [False, False, True, False])
+        self.assertGreater(scores[0], scores[3])
+        self.assertGreater(scores[3], scores[1])
+        self.assertFalse(index.vectors.flags.writeable)
+
+    def test_semantic_scores_fall_back_to_stored_vectors(self):
+        category = Category.objects.create(name='Technology', slug='technology')
+        deadline = timezone.now().date() + timedelta(days=30)
+        developer = Opportunity.objects.create(
+            title='Backend Developer', type='job', organization='Org', category=category,
+            description='Build Django REST APIs in Python', deadline=deadline
+        )
+        nurse = Opportunity.objects.create(
+            title='Nurse', type='job', organization='Org', category=category,
+            description='Patient care in a public hospital', deadline=deadline
+        )
+
+        # No published index: vectors come from OpportunityFeature.text_vector
+        scores = semantic_scores([developer.id, nurse.id], 'Python developer with Django experience')
+        self.assertGreater(scores[0], 0)
+        self.assertEqual(scores[1], 0)
+
+    def test_edits_after_the_build_are_read_from_stored_vectors(self):
+        category = Category.objects.create(name='Technology', slug='technology')
+        opportunity = Opportunity.objects.create(
+            title='Nurse', type='job', organization='Org', category=category,
+            description='Patient care in a public hospital', deadline=timezone.now().date() + timedelta(days=30)
+        )
+        vectorizer = TextVectorizer()
+        writer = TextVectorIndexWriter(1, vectorizer.dim)
+        writer.vectors[0] = vectorizer.transform('Nurse Org Patient care in a public hospital')
+        writer.publish([opportunity.id], vectorizer.idf)
+        published = np.array(TextVectorIndex.current().vectors)
+
+        opportunity.title = 'Backend Developer'
+        opportunity.description = 'Build Django REST APIs in Python'
+        opportunity.save()
+
+        self.assertGreater(semantic_scores([opportunity.id], 'Python developer with Django experience')[0], 0)
+        # The published matrix is left untouched
+        np.testing.assert_array_equal(np.array(TextVectorIndex.current().vectors), published)
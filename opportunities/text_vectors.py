@@ -0,0 +1,297 @@
+"""
+Lexical similarity between CV text and opportunity text.
+
+Texts are turned into hashing-trick TF-IDF vectors: every token is hashed
+(crc32, stable across processes) into one of RECOMMENDATION_TEXT_VECTOR_DIM
+signed buckets, weighted by sublinear term frequency and bucket IDF, and L2
+normalised. No vocabulary is stored, so vectors can be built for new text at
+any time.
+
+Opportunity vectors are stored on OpportunityFeature.text_vector (refreshed
+with the other features on every write) and published by
+`build_text_vectors` as a float32 matrix file under
+RECOMMENDATION_TEXT_VECTOR_PATH, which every worker memory-maps read-only.
+Published files are never written again. Scoring a user is one
+matrix-vector product over that file; opportunities created or edited since
+the build started are read from OpportunityFeature instead.
+
+Layout of the index directory:
+
+- index.json: manifest naming the current files and the build start time
+  (replaced atomically)
+- vectors-<token>.npy: (n, dim) float32 matrix, rows ordered by opportunity id
+- ids-<token>.npy: the n opportunity ids, ascending
+- idf-<token>.npy: the dim bucket IDF weights used to build the vectors
+"""
+import json
+import logging
+import math
+import os
+import re
+import uuid
+import zlib
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to', 'was', 'we',
+    'were', 'will', 'with', 'you', 'your',
+})
+
+MANIFEST = 'index.json'
+
+
+def vector_dim():
+    return getattr(settings, 'RECOMMENDATION_TEXT_VECTOR_DIM', 512)
+
+
+def index_path():
+    return Path(getattr(settings, 'RECOMMENDATION_TEXT_VECTOR_PATH', Path(settings.BASE_DIR) / 'var' / 'text_vectors'))
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+@lru_cache(maxsize=100000)
+def _bucket(token, dim):
+    """Bucket and sign of a token (the sign halves the bias of colliding tokens)."""
+    digest = zlib.crc32(token.encode())
+    return digest % dim, 1.0 if digest & 0x80000000 else -1.0
+
+
+def hashed_term_frequencies(text, dim):
+    """Buckets and signed sublinear term frequencies (1 + log tf) of the tokens of text."""
+    counts = Counter(tokenize(text))
+    buckets = np.empty(len(counts), dtype=np.int64)
+    values = np.empty(len(counts), dtype=np.float64)
+    for i, (token, count) in enumerate(counts.items()):
+        buckets[i], sign = _bucket(token, dim)
+        values[i] = sign * (1.0 + math.log(count))
+    return buckets, values
+
+
+def compute_idf(document_frequencies, document_count):
+    """Smoothed IDF per bucket from bucket document frequencies."""
+    return (np.log((1.0 + document_count) / (1.0 + document_frequencies)) + 1.0).astype(np.float32)
+
+
+class TextVectorizer:
+    """Builds unit float32 vectors with a fixed set of bucket IDF weights."""
+
+    def __init__(self, idf=None, dim=None):
+        self.idf = np.ones(dim or vector_dim(), dtype=np.float32) if idf is None else idf
+        self.dim = len(self.idf)
+
+    def transform(self, text):
+        buckets, values = hashed_term_frequencies(text, self.dim)
+        vector = np.zeros(self.dim, dtype=np.float64)
+        np.add.at(vector, buckets, values * self.idf[buckets])
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.astype(np.float32)
+
+
+def opportunity_text(opportunity):
+    """Text an opportunity is vectorized from. Tags should be prefetched."""
+    parts = [opportunity.title, opportunity.description or '']
+    parts.extend(opportunity.skills_required or [])
+    parts.extend(tag.name for tag in opportunity.tags.all())
+    return ' '.join(parts)
+
+
+def stream_opportunity_texts(queryset, chunk_size=2000):
+    """Yield (id, text) for the queryset, ordered by id, without instantiating models."""
+    from django.contrib.postgres.expressions import ArraySubquery
+    from django.db.models import OuterRef
+
+    from opportunities.models import Tag
+
+    tag_names = ArraySubquery(Tag.objects.filter(opportunities=OuterRef('pk')).values('name'))
+    rows = queryset.select_related(None).prefetch_related(None).order_by('id') \
+        .values('id', 'title', 'description', 'skills_required') \
+        .annotate(tag_names=tag_names)
+    for row in rows.iterator(chunk_size=chunk_size):
+        parts = [row['title'], row['description'] or '']
+        parts.extend(row['skills_required'] or [])
+        parts.extend(row['tag_names'] or [])
+        yield row['id'], ' '.join(parts)
+
+
+def _flatten_text(value):
+    if isinstance(value, dict):
+        return ' '.join(_flatten_text(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_flatten_text(item) for item in value)
+    return value if isinstance(value, str) else ''
+
+
+def user_text(user_profile):
+    """Text a user is vectorized from: the profile summary plus the parsed CV summary and experience."""
+    from opportunities.user_profiles import UserMatchingProfile
+    from users.models import ParsedProfile
+
+    if isinstance(user_profile, UserMatchingProfile):
+        # Its summary already holds the parsed CV summary and experience
+        return user_profile.summary
+
+    parts = [getattr(user_profile, 'summary', '') or '']
+    parsed = ParsedProfile.objects.filter(user_id=user_profile.user.id).values('summary', 'experience').first()
+    if parsed:
+        parts.append(parsed['summary'])
+        parts.append(_flatten_text(parsed['experience']))
+    return ' '.join(part for part in parts if part)
+
+
+class TextVectorIndex:
+    """Read-only view of the published vector files, memory-mapped."""
+
+    _current = None
+
+    def __init__(self, path, manifest, mtime):
+        self.path = path
+        self.mtime = mtime
+        self.token = manifest['token']
+        # Rows of opportunities edited after this are stale (manifests without it: publication time)
+        self.built_at = (
+            datetime.fromisoformat(manifest['built_at']) if manifest.get('built_at')
+            else datetime.fromtimestamp(mtime / 1e9, tz=dt_timezone.utc)
+        )
+        self.ids = np.load(path / f"ids-{self.token}.npy")
+        self.idf = np.load(path / f"idf-{self.token}.npy")
+        self.vectors = np.load(path / f"vectors-{self.token}.npy", mmap_mode='r')
+        self.dim = len(self.idf)
+
+    @classmethod
+    def current(cls):
+        """The published index (reloaded when the manifest changes), or None."""
+        path = index_path()
+        try:
+            mtime = os.stat(path / MANIFEST).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        index = cls._current
+        if index is None or index.path != path or index.mtime != mtime:
+            try:
+                with open(path / MANIFEST) as manifest:
+                    index = cls(path, json.load(manifest), mtime)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading text vector index from {path}: {str(e)}")
+                return None
+            cls._current = index
+        return index
+
+    def similarities(self, opportunity_ids, query):
+        """
+        Dot products of query with the rows of the given ids. Returns the scores
+        and a mask of ids absent from the index (their score is 0).
+        """
+        all_scores = self.vectors @ query
+        rows = np.minimum(np.searchsorted(self.ids, opportunity_ids), max(len(self.ids) - 1, 0))
+        found = self.ids[rows] == opportunity_ids if len(self.ids) else np.zeros(len(opportunity_ids), dtype=bool)
+        scores = np.zeros(len(opportunity_ids), dtype=np.float32)
+        scores[found] = all_scores[rows[found]]
+        return scores, ~found
+
+
+def current_vectorizer():
+    """Vectorizer using the IDF of the published index (plain TF when there is none)."""
+    index = TextVectorIndex.current()
+    if index is not None and index.dim == vector_dim():
+        return TextVectorizer(index.idf)
+    return TextVectorizer()
+
+
+class TextVectorIndexWriter:
+    """Writes a new index next to the current one and publishes it atomically."""
+
+    def __init__(self, count, dim, path=None):
+        self.path = Path(path or index_path())
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.token = uuid.uuid4().hex
+        # Vectors are read after this: later edits are served from OpportunityFeature
+        self.built_at = datetime.now(dt_timezone.utc)
+        self.vectors = np.lib.format.open_memmap(
+            self.path / f"vectors-{self.token}.npy", mode='w+', dtype=np.float32, shape=(count, dim)
+        )
+
+    def publish(self, opportunity_ids, idf):
+        self.vectors.flush()
+        np.save(self.path / f"ids-{self.token}.npy", np.asarray(opportunity_ids, dtype=np.int64))
+        np.save(self.path / f"idf-{self.token}.npy", np.asarray(idf, dtype=np.float32))
+
+        previous = None
+        try:
+            with open(self.path / MANIFEST) as manifest:
+                previous = json.load(manifest).get('token')
+        except (OSError, ValueError):
+            pass
+
+        staging = self.path / f"{MANIFEST}.{self.token}"
+        with open(staging, 'w') as manifest:
+            json.dump({
+                'token': self.token, 'count': len(opportunity_ids), 'dim': len(idf),
+                'built_at': self.built_at.isoformat(),
+            }, manifest)
+        os.replace(staging, self.path / MANIFEST)
+
+        # Keep the previous files for workers still mapping them; drop anything older
+        keep = {self.token, previous}
+        for file in self.path.glob('*-*.npy'):
+            if file.stem.split('-', 1)[1] not in keep:
+                file.unlink(missing_ok=True)
+
+
+def semantic_scores(opportunity_ids, text):
+    """
+    Cosine similarity (clipped to 0-1) between text and each opportunity,
+    aligned with opportunity_ids (ascending).
+    """
+    from opportunities.models import OpportunityFeature
+
+    opportunity_ids = np.asarray(opportunity_ids, dtype=np.int64)
+    scores = np.zeros(len(opportunity_ids), dtype=np.float32)
+    if not text or not len(opportunity_ids):
+        return scores.astype(np.float64)
+
+    index = TextVectorIndex.current()
+    if index is not None and index.dim != vector_dim():
+        index = None
+    query = (TextVectorizer(index.idf) if index is not None else TextVectorizer()).transform(text)
+    if not query.any():
+        return scores.astype(np.float64)
+
+    if index is not None:
+        scores, missing = index.similarities(opportunity_ids, query)
+        # Rows of opportunities edited since the build are stale (updated_at is indexed)
+        edited = OpportunityFeature.objects.filter(updated_at__gt=index.built_at).values_list(
+            'opportunity_id', flat=True
+        )
+        missing |= np.isin(opportunity_ids, np.fromiter(edited, dtype=np.int64))
+    else:
+        missing = np.ones(len(opportunity_ids), dtype=bool)
+
+    if missing.any():
+        # Opportunities written since the last build: one query for their stored vectors
+        positions = {opportunity_id: i for i, opportunity_id in enumerate(opportunity_ids.tolist())}
+        stored = OpportunityFeature.objects.filter(
+            opportunity_id__in=opportunity_ids[missing].tolist()
+        ).exclude(text_vector=None).values_list('opportunity_id', 'text_vector').iterator(chunk_size=2000)
+        for opportunity_id, vector in stored:
+            vector = np.frombuffer(vector, dtype=np.float32)
+            if len(vector) == len(query):
+                scores[positions[opportunity_id]] = vector @ query
+
+    return np.clip(scores, 0.0, 1.0).astype(np.float64)
@@ -0,0 +1,135 @@
+"""
+Per-user matching features.
+
+The user side of matching (skills, education level, location, preferences and
+the experience text) is spread over UserProfile, ParsedProfile,
+EducationProfile, ExperienceProfile, OpportunitiesInterest and
+RecommendationPriority. build_matching_profile() walks that graph once into a
+UserMatchingProfile; get_matching_profile() serves its serialized form from a
+two-tier cache versioned by the user's profile generation, which signals bump
+on every edit of those models (see opportunities.signals).
+"""
+from types import SimpleNamespace
+
+from config.constants import EDUCATION_LEVEL_ORDER
+from utils.caching import TwoTierCache
+
+matching_profile_cache = TwoTierCache('matching_profiles', maxsize=5000, local_ttl=60, shared_ttl=60 * 60 * 24)
+
+# Degree keywords, most advanced first
+DEGREE_KEYWORDS = [
+    ('phd', ('phd', 'ph.d', 'doctor')),
+    ('masters', ('master', 'msc', 'm.sc', 'mba', 'mphil', 'm.a.')),
+    ('bachelors', ('bachelor', 'bsc', 'b.sc', 'b.a.', 'b.eng', 'undergraduate', 'hnd')),
+    ('high_school', ('high school', 'secondary', 'waec', 'ssce', 'o level', 'a level')),
+]
+
+# OpportunitiesInterest flag -> opportunity type, in preference order
+INTEREST_TYPES = [('jobs', 'job'), ('internships', 'internship'), ('scholarships', 'scholarship'), ('grants', 'grant')]
+
+
+def education_level(degree):
+    """Education level of a free-text degree, or None when it is not recognised."""
+    degree = (degree or '').lower()
+    for level, keywords in DEGREE_KEYWORDS:
+        if any(keyword in degree for keyword in keywords):
+            return level
+    return None
+
+
+def _skill_names(skills):
+    names = []
+    for skill in skills or []:
+        name = skill.get('name') if isinstance(skill, dict) else skill
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+
+def _entry_text(entry, fields):
+    if isinstance(entry, dict):
+        return ' '.join(str(entry[field]) for field in fields if entry.get(field))
+    return entry if isinstance(entry, str) else ''
+
+
+class UserMatchingProfile:
+    """The user-side inputs of OpportunityMatcher and the scorers."""
+
+    __slots__ = ('user', 'user_id', 'skills', 'education', 'education_level', 'preferences', 'location', 'summary')
+
+    def __init__(self, user_id, skills=(), education=None, preferences=None, location='', summary=''):
+        self.user = SimpleNamespace(id=user_id)
+        self.user_id = user_id
+        self.skills = list(skills)
+        self.education = education or {}
+        self.education_level = self.education.get('highest_level')
+        self.preferences = preferences or {}
+        self.location = location or ''
+        self.summary = summary or ''
+
+    def as_dict(self):
+        return {
+            'user_id': self.user_id,
+            'skills': self.skills,
+            'education': self.education,
+            'preferences': self.preferences,
+            'location': self.location,
+            'summary': self.summary,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def build_matching_profile(user):
+    """Derive the UserMatchingProfile of a user from the profile models."""
+    from users.models import (
+        EducationProfile, ExperienceProfile, OpportunitiesInterest, ParsedProfile, RecommendationPriority,
+        UserProfile,
+    )
+
+    profile = UserProfile.objects.filter(user=user).values('country').first() or {}
+    parsed = ParsedProfile.objects.filter(user=user).values('skills', 'summary', 'education', 'experience').first() or {}
+    degrees = list(EducationProfile.objects.filter(user=user).values_list('degree', flat=True))
+    experiences = list(ExperienceProfile.objects.filter(user=user).values('job_title', 'location', 'description'))
+    interest = OpportunitiesInterest.objects.filter(user=user).first()
+    priority = RecommendationPriority.objects.filter(user=user).values('additional_preferences').first() or {}
+
+    degrees.extend(_entry_text(entry, ('degree', 'qualification')) for entry in parsed.get('education') or [])
+    levels = {education_level(degree) for degree in degrees} - {None}
+    highest_level = max(levels, key=EDUCATION_LEVEL_ORDER.index) if levels else None
+
+    preferred_type = None
+    if interest is not None:
+        preferred_type = next((kind for flag, kind in INTEREST_TYPES if getattr(interest, flag)), None)
+
+    # Experiences are ordered by start date, most recent first
+    location = profile.get('country') or next((e['location'] for e in experiences if e['location']), '')
+
+    summary = [parsed.get('summary') or '']
+    summary.extend(f"{e['job_title']} {e['description']}" for e in experiences)
+    summary.extend(
+        _entry_text(entry, ('title', 'position', 'company', 'description'))
+        for entry in parsed.get('experience') or []
+    )
+    summary.append(priority.get('additional_preferences') or '')
+
+    return UserMatchingProfile(
+        user_id=user.id,
+        skills=_skill_names(parsed.get('skills')),
+        education={'highest_level': highest_level, 'nationality': profile.get('country') or None},
+        preferences={'preferred_type': preferred_type} if preferred_type else {},
+        location=location,
+        summary=' '.join(part for part in summary if part),
+    )
+
+
+def get_matching_profile(user):
+    """Cached UserMatchingProfile of a user, rebuilt after any edit of their profile models."""
+    data = matching_profile_cache.get_or_set(
+        f'user_matching_profile_{user.id}',
+        lambda: build_matching_profile(user).as_dict(),
+        namespaces=(f'profile:{user.id}',),
+    )
+    return UserMatchingProfile.from_dict(data)
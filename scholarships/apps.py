@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class ScholarshipsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scholarships'
+
+    def ready(self):
+        from scholarships import signals  # noqa: F401
@@ -0,0 +1,107 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from scholarships.matching.scholarship_matching import ScholarshipScorer, score_scholarship
+from scholarships.matching.utils import tokenize
+
+COURSES = ['Computer Science', 'Engineering', 'Medicine', 'Law', 'Business Administration', 'History']
+LOCATIONS = ['Lagos, Nigeria', 'Accra, Ghana', 'Nairobi, Kenya', 'London, United Kingdom', 'Toronto, Canada']
+DEGREES = ['Bachelors', 'Masters', 'PhD', None]
+NATIONALITIES = ['Nigerian', 'Ghanaian', 'Kenyan', None]
+OVERVIEW_WORDS = (
+    'scholarship open to women in stem from africa covering tuition fees living stipend travel '
+    'for outstanding students with leadership potential and financial need in developing countries'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures throughput of score_scholarship (string parsing per row) and of the typed '
+        'ScholarshipScorer on synthetic scholarships'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=200000,
+            help='Number of synthetic scholarships scored per run'
+        )
+        parser.add_argument(
+            '--overview-words',
+            type=int,
+            default=200,
+            help='Number of words in each synthetic overview'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of timed runs per scorer'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed of the synthetic catalog'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        today = timezone.now().date()
+        profile = SimpleNamespace(
+            gpa=Decimal('3.50'), location='Nigeria', course='Computer Science', degree_level='Masters',
+            nationality='Nigerian', financial_need=Decimal('5000'), eligibility_tags=['women', 'stem', 'africa'],
+        )
+
+        # Rows as score_scholarship reads them (parse_date only accepts strings) and as the matcher
+        # streams them (match columns)
+        start = time.perf_counter()
+        legacy_rows, typed_rows = [], []
+        for _ in range(options['count']):
+            location, course = rng.choice(LOCATIONS), rng.choice(COURSES)
+            degree_level, nationality = rng.choice(DEGREES), rng.choice(NATIONALITIES)
+            overview = ' '.join(rng.choice(OVERVIEW_WORDS) for _ in range(options['overview_words']))
+            gpa = Decimal(rng.randint(250, 400)) / 100
+            amount = Decimal(rng.randint(1, 50) * 1000)
+            deadline = today + timedelta(days=rng.randint(1, 120))
+            legacy_rows.append(SimpleNamespace(
+                gpa=gpa, amount=amount, deadline=deadline.isoformat(), location=location, course=course,
+                degree_level=degree_level, nationality=nationality, overview=overview,
+            ))
+            typed_rows.append(SimpleNamespace(
+                gpa=gpa, amount=amount, deadline=deadline, location_lower=location.lower(),
+                course_lower=course.lower(), degree_level_lower=(degree_level or '').lower(),
+                nationality_lower=(nationality or '').lower(), overview_tokens=sorted(tokenize(overview)),
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(typed_rows)} scholarships in {(time.perf_counter() - start) * 1000:.1f} ms'
+        ))
+        if not typed_rows:
+            return
+
+        def score_typed():
+            scorer = ScholarshipScorer(profile, today)
+            return [scorer.score(row) for row in typed_rows]
+
+        runs = {
+            'legacy': lambda: [score_scholarship(profile, row) for row in legacy_rows],
+            'typed': score_typed,
+        }
+
+        for name, run in runs.items():
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+
+            best = min(timings)
+            self.stdout.write(
+                f'{name:>6}: best {best * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms, '
+                f'{len(typed_rows) / best:,.0f} scholarships/s'
+            )
@@ -0,0 +1,145 @@
+"""
+Scholarship recommendations for a ScholarshipProfile.
+
+Only active scholarships with a deadline today or later are read, and only
+the typed and pre-lowercased match columns ScholarshipScorer looks at,
+streamed through a server-side cursor; eligibility tag matches are counted by
+one GIN-indexed query beforehand. Every candidate is scored in that one
+pass and the best SCHOLARSHIP_RECOMMENDATION_CACHE_SIZE are kept with a
+bounded heap. That ranking (ids and scores only) is cached per profile, versioned by the
+'scholarships' and 'scholarship_profile:<user id>' generations, which signals
+bump on every scholarship or profile edit (see scholarships.signals).
+
+Pages are served from the cached ranking with a keyset cursor (the score and
+id of the last entry returned). The cursor stays valid while the ranking is
+recomputed, and each page costs one query for its rows.
+"""
+import base64
+import heapq
+from bisect import bisect_right
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from scholarships.matching.scholarship_matching import ScholarshipScorer
+from scholarships.models import Scholarship
+from utils.caching import SingleFlightCache, versioned_key
+
+# Columns ScholarshipScorer reads; title, overview and the other display columns are never fetched,
+# and tag matches are counted in SQL
+SCORING_COLUMNS = [
+    'id', 'gpa', 'amount', 'deadline', 'location_lower', 'course_lower', 'degree_level_lower', 'nationality_lower',
+]
+
+scholarship_recommendation_cache = SingleFlightCache(
+    soft_ttl=getattr(settings, 'RECOMMENDATION_CACHE_SOFT_TTL', 60 * 30),
+    hard_ttl=getattr(settings, 'RECOMMENDATION_CACHE_HARD_TTL', 60 * 60 * 2),
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ScholarshipRow:
+    """Column-projected scholarship row exposing the attributes ScholarshipScorer reads."""
+
+    __slots__ = tuple(SCORING_COLUMNS)
+
+    def __init__(self, row):
+        for column in SCORING_COLUMNS:
+            setattr(self, column, row[column])
+
+
+def candidate_scholarships(today=None):
+    """Active scholarships that can still be applied to."""
+    return Scholarship.objects.filter(is_active=True, deadline__gte=today or timezone.now().date())
+
+
+def scholarship_cache_key(user_id, today):
+    """
+    Cache key of a profile's ranking. Deadline proximity is part of the score,
+    so the date is part of the key.
+    """
+    return versioned_key(
+        f'scholarship_recommendations_{user_id}_{today.isoformat()}',
+        'scholarships', f'scholarship_profile:{user_id}'
+    )
+
+
+def encode_cursor(score, scholarship_id):
+    return base64.urlsafe_b64encode(f'{score}:{scholarship_id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        score, scholarship_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(score), int(scholarship_id)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+class ScholarshipMatcher:
+    """Ranks the candidate scholarships of one ScholarshipProfile."""
+
+    def __init__(self, profile, cache_size=None, chunk_size=2000):
+        self.profile = profile
+        self.cache_size = cache_size or getattr(settings, 'SCHOLARSHIP_RECOMMENDATION_CACHE_SIZE', 500)
+        self.chunk_size = chunk_size
+
+    def compute_ranking(self, today=None):
+        """
+        Score every candidate and return the top cache_size as {'ids', 'scores'}
+        arrays, best first (id ascending on ties).
+        """
+        today = today or timezone.now().date()
+        scorer = ScholarshipScorer(self.profile, today)
+        candidates = candidate_scholarships(today)
+        tag_matches = scorer.tag_match_counts(candidates)
+        rows = candidates.order_by().values(*SCORING_COLUMNS).iterator(chunk_size=self.chunk_size)
+        scored = ((scorer.score(ScholarshipRow(row), tag_matches.get(row['id'], 0)), row['id']) for row in rows)
+        top = heapq.nsmallest(self.cache_size, ((-score, scholarship_id) for score, scholarship_id in scored))
+        return {
+            'ids': np.array([scholarship_id for _, scholarship_id in top], dtype=np.int64),
+            'scores': np.array([-score for score, _ in top], dtype=np.int32),
+        }
+
+    def get_ranking(self):
+        today = timezone.now().date()
+        ranking, _ = scholarship_recommendation_cache.get_or_compute(
+            scholarship_cache_key(self.profile.user_id, today),
+            lambda: self.compute_ranking(today)
+        )
+        return ranking
+
+    def get_page(self, page_size, cursor=None):
+        """
+        Return (results, next_cursor, count): up to page_size {'scholarship',
+        'score'} results following the cursor, the cursor of the next page (None
+        on the last one) and the number of ranked scholarships.
+        """
+        ranking = self.get_ranking()
+        ids, scores = ranking['ids'], ranking['scores']
+
+        start = 0
+        if cursor:
+            # Entries are ordered by (-score, id): skip everything up to the cursor entry
+            score, scholarship_id = decode_cursor(cursor)
+            keys = list(zip((-scores).tolist(), ids.tolist()))
+            start = bisect_right(keys, (-score, scholarship_id))
+
+        page_ids = ids[start:start + page_size].tolist()
+        page_scores = scores[start:start + page_size].tolist()
+        # Rows that expired or were deactivated since the ranking was cached are dropped
+        scholarships = candidate_scholarships().in_bulk(page_ids)
+        results = [
+            {'scholarship': scholarships[scholarship_id], 'score': score}
+            for scholarship_id, score in zip(page_ids, page_scores)
+            if scholarship_id in scholarships
+        ]
+
+        next_cursor = None
+        if page_ids and start + page_size < len(ids):
+            next_cursor = encode_cursor(page_scores[-1], page_ids[-1])
+        return results, next_cursor, len(ids)
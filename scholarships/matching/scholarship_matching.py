@@ -1,5 +1,10 @@
 from datetime import date
-from .utils import parse_float, parse_date
+from functools import reduce
+from operator import add
+
+from django.db.models import Case, IntegerField, Value, When
+
+from .utils import parse_float, parse_date, tokenize
 from scholarships.models import ScholarshipProfile, Scholarship
 
 def score_scholarship(profile: ScholarshipProfile, scholarship: Scholarship) -> int:
@@ -38,3 +43,87 @@ def score_scholarship(profile: ScholarshipProfile, scholarship: Scholarship) ->
         score += matches
 
     return score
+
+
+class ScholarshipScorer:
+    """
+    score_scholarship for typed rows: gpa and amount are Decimals (or None),
+    deadline a date, and the compared text fields come pre-lowercased with the
+    overview as a token set (the Scholarship match columns). The profile side
+    is prepared once per scorer instead of once per row.
+
+    Unlike score_scholarship, the GPA, amount and deadline terms are applied
+    (parse_float and parse_date reject non-string values), and an eligibility
+    tag matches when all of its tokens are overview tokens rather than when it
+    is a substring of the overview.
+
+    Tag matches are counted from row.overview_tokens, or taken from
+    `tag_matches` when the caller counted them in SQL with tag_match_counts().
+    """
+
+    def __init__(self, profile: ScholarshipProfile, today: date = None):
+        self.today = today or date.today()
+        self.gpa = float(profile.gpa) if profile.gpa is not None else None
+        self.financial_need = float(profile.financial_need)
+        self.location = profile.location.lower()
+        self.course = profile.course.lower()
+        self.degree_level = profile.degree_level.lower()
+        self.nationality = profile.nationality.lower()
+        self.tags = [tokens for tokens in (tokenize(tag) for tag in profile.eligibility_tags or []) if tokens]
+
+    def tag_match_counts(self, queryset) -> dict:
+        """
+        Number of matching eligibility tags per scholarship of the queryset,
+        for scholarships matching at least one. The overlap filter is served by
+        the GIN index on overview_tokens, so long overviews are never read.
+        """
+        if not self.tags:
+            return {}
+        matches = reduce(add, (
+            Case(When(overview_tokens__contains=sorted(tokens), then=Value(1)), default=Value(0), output_field=IntegerField())
+            for tokens in self.tags
+        ))
+        return dict(
+            queryset.order_by()
+            .filter(overview_tokens__overlap=sorted(set().union(*self.tags)))
+            .annotate(tag_matches=matches)
+            .filter(tag_matches__gt=0)
+            .values_list('id', 'tag_matches')
+            .iterator(chunk_size=2000)
+        )
+
+    def score(self, row, tag_matches: int = None) -> int:
+        score = 0
+
+        if row.gpa is not None and self.gpa is not None and abs(self.gpa - float(row.gpa)) <= 0.3:
+            score += 2
+
+        if self.location in row.location_lower:
+            score += 1
+
+        if self.course in row.course_lower:
+            score += 2
+
+        if row.degree_level_lower and self.degree_level == row.degree_level_lower:
+            score += 1
+
+        if row.nationality_lower and self.nationality == row.nationality_lower:
+            score += 1
+
+        if row.amount is not None and self.financial_need <= float(row.amount):
+            score += 2
+
+        if row.deadline:
+            days = (row.deadline - self.today).days
+            if 0 < days <= 30:
+                score += 2
+            elif 30 < days <= 60:
+                score += 1
+
+        if tag_matches is not None:
+            score += tag_matches
+        elif row.overview_tokens and self.tags:
+            overview = set(row.overview_tokens)
+            score += sum(1 for tokens in self.tags if tokens <= overview)
+
+        return score
@@ -2,6 +2,8 @@ import re
 from datetime import datetime
 from typing import Optional
 
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
 def parse_float(text: str) -> Optional[float]:
     try:
         match = re.findall(r'\d+(?:\.\d+)?', text)
@@ -9,6 +11,10 @@ def parse_float(text: str) -> Optional[float]:
     except (ValueError, TypeError):
         return None
 
+def tokenize(text: Optional[str]) -> set:
+    """Distinct lowercase alphanumeric tokens of text."""
+    return set(TOKEN_PATTERN.findall((text or '').lower()))
+
 def parse_date(text: str) -> Optional[datetime.date]:
     for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"):
         try:
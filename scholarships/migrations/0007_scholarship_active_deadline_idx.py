@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0006_alter_scholarship_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['deadline'], name='scholarship_active_dl_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:57
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+MATCH_FIELDS = ['location_lower', 'course_lower', 'degree_level_lower', 'nationality_lower', 'overview_tokens']
+
+
+def backfill_match_fields(apps, schema_editor):
+    from scholarships.matching.utils import tokenize
+
+    Scholarship = apps.get_model('scholarships', 'Scholarship')
+    batch = []
+    for scholarship in Scholarship.objects.only(
+        'location', 'course', 'degree_level', 'nationality', 'overview'
+    ).iterator(chunk_size=2000):
+        scholarship.location_lower = (scholarship.location or '').lower()
+        scholarship.course_lower = (scholarship.course or '').lower()
+        scholarship.degree_level_lower = (scholarship.degree_level or '').lower()
+        scholarship.nationality_lower = (scholarship.nationality or '').lower()
+        scholarship.overview_tokens = sorted(tokenize(scholarship.overview))
+        batch.append(scholarship)
+        if len(batch) == 2000:
+            Scholarship.objects.bulk_update(batch, MATCH_FIELDS)
+            batch = []
+    Scholarship.objects.bulk_update(batch, MATCH_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0007_scholarship_active_deadline_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarship',
+            name='course_lower',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='degree_level_lower',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='location_lower',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='nationality_lower',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='overview_tokens',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None),
+        ),
+        migrations.RunPython(backfill_match_fields, migrations.RunPython.noop),
+    ]
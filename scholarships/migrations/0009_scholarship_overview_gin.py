@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:58
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0008_scholarship_match_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['overview_tokens'], name='scholarship_overview_gin'),
+        ),
+    ]
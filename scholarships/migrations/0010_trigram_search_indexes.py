@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-17 08:01
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0009_scholarship_overview_gin'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='scholarship_title_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'), name='scholarship_location_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('course'), name='gin_trgm_ops'), name='scholarship_course_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('source'), name='gin_trgm_ops'), name='scholarship_source_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('amount', models.TextField())), name='gin_trgm_ops'), name='scholarship_amount_trgm'),
+        ),
+    ]
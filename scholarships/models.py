@@ -1,4 +1,7 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Cast, Upper
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -30,9 +33,38 @@ class Scholarship(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Matching columns derived from the fields above on save (see refresh_match_fields)
+    location_lower = models.CharField(max_length=200, blank=True, default='')
+    course_lower = models.CharField(max_length=200, blank=True, default='')
+    degree_level_lower = models.CharField(max_length=100, blank=True, default='')
+    nationality_lower = models.CharField(max_length=100, blank=True, default='')
+    overview_tokens = ArrayField(models.TextField(), blank=True, default=list)
+
+    MATCH_SOURCE_FIELDS = {'location', 'course', 'degree_level', 'nationality', 'overview'}
+    MATCH_FIELDS = ['location_lower', 'course_lower', 'degree_level_lower', 'nationality_lower', 'overview_tokens']
+
     def __str__(self):
         return self.title
 
+    def refresh_match_fields(self):
+        """Lowercase the compared text fields and tokenize the overview once, at write time."""
+        from scholarships.matching.utils import tokenize
+
+        self.location_lower = (self.location or '').lower()
+        self.course_lower = (self.course or '').lower()
+        self.degree_level_lower = (self.degree_level or '').lower()
+        self.nationality_lower = (self.nationality or '').lower()
+        self.overview_tokens = sorted(tokenize(self.overview))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_match_fields()
+        elif self.MATCH_SOURCE_FIELDS.intersection(update_fields):
+            self.refresh_match_fields()
+            kwargs['update_fields'] = set(update_fields) | set(self.MATCH_FIELDS)
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-scraped_at']
         indexes = [
@@ -41,6 +73,18 @@ class Scholarship(models.Model):
             models.Index(fields=['gpa']),
             models.Index(fields=['degree_level']),
             models.Index(fields=['location']),
+            # Recommendation candidates: active scholarships by deadline
+            models.Index(fields=['deadline'], condition=models.Q(is_active=True), name='scholarship_active_dl_idx'),
+            # Eligibility tag matching (see ScholarshipScorer.tag_match_counts)
+            GinIndex(fields=['overview_tokens'], name='scholarship_overview_gin'),
+            # Substring search (SearchFilter and admin icontains compare UPPER(column::text))
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='scholarship_title_trgm'),
+            GinIndex(OpClass(Upper('location'), name='gin_trgm_ops'), name='scholarship_location_trgm'),
+            GinIndex(OpClass(Upper('course'), name='gin_trgm_ops'), name='scholarship_course_trgm'),
+            GinIndex(OpClass(Upper('source'), name='gin_trgm_ops'), name='scholarship_source_trgm'),
+            GinIndex(
+                OpClass(Upper(Cast('amount', models.TextField())), name='gin_trgm_ops'), name='scholarship_amount_trgm'
+            ),
         ]
 
 class UserScholarship(models.Model):
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from scholarships.models import Scholarship, ScholarshipProfile
+from utils.caching import bump_generation
+
+
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+def invalidate_on_scholarship_change(sender, instance, **kwargs):
+    bump_generation('scholarships')
+
+
+@receiver(post_save, sender=ScholarshipProfile)
+@receiver(post_delete, sender=ScholarshipProfile)
+def invalidate_on_scholarship_profile_change(sender, instance, **kwargs):
+    """Cached scholarship rankings of a user are versioned by their scholarship profile generation."""
+    bump_generation(f'scholarship_profile:{instance.user_id}')
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from scholarships.matching.recommendations import InvalidCursor, ScholarshipMatcher
+from scholarships.matching.scholarship_matching import ScholarshipScorer, score_scholarship
+from scholarships.models import Scholarship, ScholarshipProfile
+
+
+class ScholarshipMatcherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email='scholar@example.com', password='pass1234')
+        self.profile = ScholarshipProfile.objects.create(
+            user=self.user, gpa=Decimal('3.50'), location='Nigeria', course='Computer Science',
+            degree_level='Masters', nationality='Nigerian', financial_need=Decimal('5000'),
+            eligibility_tags=['women', 'stem'],
+        )
+        today = timezone.now().date()
+        self.scholarships = [
+            Scholarship.objects.create(
+                title='Scholarship %d' % i, application_link='https://example.com/%d' % i, source='Test',
+                course='Computer Science' if i % 2 else 'History', location='Nigeria' if i % 3 else 'Ghana',
+                degree_level='Masters', nationality='Nigerian' if i % 4 else None,
+                overview='Open to women in STEM' if i % 5 else 'Open to everyone',
+                deadline=today + timedelta(days=10 + i), scraped_at=timezone.now(),
+            )
+            for i in range(12)
+        ]
+        self.expired = Scholarship.objects.create(
+            title='Expired', application_link='https://example.com/expired', source='Test',
+            course='Computer Science', location='Nigeria', deadline=today - timedelta(days=1),
+            scraped_at=timezone.now(),
+        )
+        self.inactive = Scholarship.objects.create(
+            title='Inactive', application_link='https://example.com/inactive', source='Test',
+            course='Computer Science', location='Nigeria', deadline=today + timedelta(days=5),
+            scraped_at=timezone.now(), is_active=False,
+        )
+
+    def _all_pages(self, matcher, page_size):
+        ids, cursor = [], None
+        while True:
+            results, cursor, _ = matcher.get_page(page_size, cursor)
+            ids.extend((result['score'], result['scholarship'].id) for result in results)
+            if cursor is None:
+                return ids
+
+    def test_ranking_matches_per_row_scores(self):
+        scorer = ScholarshipScorer(self.profile)
+        expected = sorted(
+            ((scorer.score(s), s.id) for s in self.scholarships),
+            key=lambda pair: (-pair[0], pair[1])
+        )
+        self.assertEqual(self._all_pages(ScholarshipMatcher(self.profile), 5), expected)
+
+        results, _, count = ScholarshipMatcher(self.profile).get_page(100)
+        self.assertEqual(count, len(self.scholarships))
+        self.assertNotIn(self.expired.id, [result['scholarship'].id for result in results])
+        self.assertNotIn(self.inactive.id, [result['scholarship'].id for result in results])
+
+    def test_cache_invalidated_by_scholarship_edit(self):
+        ScholarshipMatcher(self.profile).get_page(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inactive.is_active = True
+            self.inactive.save()
+        _, _, count = ScholarshipMatcher(self.profile).get_page(5)
+        self.assertEqual(count, len(self.scholarships) + 1)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            ScholarshipMatcher(self.profile).get_page(5, 'not-a-cursor')
+
+
+class ScholarshipScorerTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='typed@example.com', password='pass1234')
+        self.profile = ScholarshipProfile.objects.create(
+            user=self.user, gpa=Decimal('3.50'), location='Nigeria', course='Computer Science',
+            degree_level='Masters', nationality='Nigerian', financial_need=Decimal('5000'),
+            eligibility_tags=['Women', 'STEM', 'Africa'],
+        )
+
+    def test_parity_with_legacy_scorer_on_string_inputs(self):
+        # score_scholarship only parses strings, so it is fed the scraped string forms
+        # (and a float profile) it was written for
+        legacy_profile = SimpleNamespace(
+            gpa=3.5, location='Nigeria', course='Computer Science', degree_level='Masters',
+            nationality='Nigerian', financial_need=5000.0, eligibility_tags=['Women', 'STEM', 'Africa'],
+        )
+        scorer = ScholarshipScorer(self.profile)
+        today = timezone.now().date()
+        for i in range(40):
+            scholarship = Scholarship.objects.create(
+                title='Scholarship %d' % i, application_link='https://example.com/%d' % i, source='Test',
+                course=['Computer Science', 'Applied Computer Science', 'History'][i % 3],
+                location=['Lagos, Nigeria', 'Accra, Ghana'][i % 2],
+                degree_level=['Masters', 'PhD', None][i % 3], nationality=['nigerian', None][i % 2],
+                gpa=[Decimal('3.30'), Decimal('3.90'), None][i % 3],
+                amount=[Decimal('10000'), Decimal('1000'), None][i % 3],
+                overview=['Women in STEM across Africa', 'Open to all', None][i % 3],
+                deadline=today + timedelta(days=[10, 45, 90][i % 3] + i % 2), scraped_at=timezone.now(),
+            )
+            legacy_row = SimpleNamespace(
+                gpa=str(scholarship.gpa) if scholarship.gpa is not None else None,
+                amount=str(scholarship.amount) if scholarship.amount is not None else None,
+                deadline=scholarship.deadline.isoformat(),
+                location=scholarship.location, course=scholarship.course,
+                degree_level=scholarship.degree_level, nationality=scholarship.nationality,
+                overview=scholarship.overview,
+            )
+            self.assertEqual(scorer.score(scholarship), score_scholarship(legacy_profile, legacy_row), scholarship.title)
+
+    def test_typed_columns_are_scored(self):
+        scholarship = Scholarship.objects.create(
+            title='Typed', application_link='https://example.com/typed', source='Test', course='History',
+            location='Ghana', gpa=Decimal('3.40'), amount=Decimal('6000'), scraped_at=timezone.now(),
+        )
+        # GPA and amount are Decimals, which score_scholarship's parse_float rejects
+        self.assertEqual(ScholarshipScorer(self.profile).score(scholarship), 4)
+
+        scholarship.deadline = timezone.now().date() + timedelta(days=20)
+        self.assertEqual(ScholarshipScorer(self.profile).score(scholarship), 6)
+
+    def test_sql_tag_counts_match_token_counts(self):
+        self.profile.eligibility_tags = ['Women in STEM', 'africa', 'Refugees']
+        overviews = ['Women in STEM across Africa', 'STEM students in Africa', 'For refugees and women', None]
+        scholarships = [
+            Scholarship.objects.create(
+                title='Tags %d' % i, application_link='https://example.com/tags/%d' % i, source='Test',
+                course='History', location='Ghana', overview=overview, scraped_at=timezone.now(),
+            )
+            for i, overview in enumerate(overviews)
+        ]
+        scorer = ScholarshipScorer(self.profile)
+        counts = scorer.tag_match_counts(Scholarship.objects.all())
+        self.assertEqual(counts, {scholarships[0].id: 2, scholarships[1].id: 1, scholarships[2].id: 1})
+        for scholarship in scholarships:
+            self.assertEqual(
+                scorer.score(scholarship, counts.get(scholarship.id, 0)), scorer.score(scholarship), scholarship.title
+            )
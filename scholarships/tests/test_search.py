@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from scholarships.models import Scholarship
+
+
+class ScholarshipSearchIndexTests(TestCase):
+    def test_search_fields_use_trigram_indexes(self):
+        Scholarship.objects.create(
+            title='Engineering Excellence Award', application_link='https://example.com/award', source='Test',
+            course='Engineering', location='Ghana', amount=Decimal('5000'), scraped_at=timezone.now(),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        # The same OR of icontains lookups SearchFilter builds for ScholarshipViewSet.search_fields
+        term = 'engineering'
+        queryset = Scholarship.objects.filter(
+            Q(title__icontains=term) | Q(amount__icontains=term) | Q(location__icontains=term)
+            | Q(course__icontains=term) | Q(source__icontains=term)
+        )
+        self.assertEqual(queryset.count(), 1)
+
+        plan = queryset.explain()
+        for index in ('scholarship_title_trgm', 'scholarship_amount_trgm', 'scholarship_course_trgm'):
+            self.assertIn(index, plan)
+        self.assertNotIn('Seq Scan', plan)
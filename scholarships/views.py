@@ -7,7 +7,8 @@ from .serializers import ScholarshipSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from scholarships.matching.scholarship_matching import score_scholarship
+from urllib.parse import urlencode
+from scholarships.matching.recommendations import InvalidCursor, ScholarshipMatcher
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import ScholarshipPermissionMixin
@@ -103,17 +104,32 @@ def recommended_scholarships(request):
             "requires_profile": True
         }, status=200)
 
-    results = []
-    for scholarship in Scholarship.objects.all():
-        score = score_scholarship(profile, scholarship)
-        results.append((score, scholarship))
+    try:
+        page_size = min(int(request.query_params.get('page_size', ScholarshipPagination.page_size)), 100)
+    except ValueError:
+        page_size = ScholarshipPagination.page_size
+    page_size = max(page_size, 1)
 
-    results.sort(key=lambda x: x[0], reverse=True)
+    matcher = ScholarshipMatcher(profile)
+    try:
+        results, next_cursor, count = matcher.get_page(page_size, request.query_params.get('cursor'))
+    except InvalidCursor:
+        return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
 
     serialized_data = []
-    for score, scholarship in results:
-        serialized = ScholarshipSerializer(scholarship).data
-        serialized['match_score'] = score
+    for result in results:
+        serialized = ScholarshipSerializer(result['scholarship']).data
+        serialized['match_score'] = result['score']
         serialized_data.append(serialized)
 
-    return Response(serialized_data)
+    next_url = None
+    if next_cursor:
+        next_url = request.build_absolute_uri(
+            f"{request.path}?{urlencode({'cursor': next_cursor, 'page_size': page_size})}"
+        )
+
+    return Response({
+        'count': count,
+        'next': next_url,
+        'results': serialized_data,
+    })
@@ -7,17 +7,23 @@ from typing import List, Dict, Optional, Tuple
 from django.db import transaction
 from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q, F
+from django.db.models import F
 from django.core.paginator import Paginator
 from django.core.exceptions import ValidationError
 
+from opportunities.matching import OpportunityMatcher
 from opportunities.models import Opportunity, OpportunityApplication, Category, Tag
+from opportunities.search import opportunity_search_filter
+from opportunities.snapshots import get_snapshot_recommendations
+from opportunities.user_profiles import get_matching_profile
 from users.models import UserProfile
-from config.constants import MATCHING_WEIGHTS, CACHE_TIMEOUT, RECOMMENDATION_CACHE_TIMEOUT
 from utils.response_utils import sanitize_input
 
 logger = logging.getLogger(__name__)
 
+# Only relevant opportunities are recommended: the former 0.1 cutoff, on the matcher's 0-100 scale
+MIN_RECOMMENDATION_SCORE = 10
+
 class OpportunityService:
     """Service class for opportunity-related operations."""
 
@@ -141,12 +147,8 @@ class OpportunityService:
 
             # Apply filters
             if query:
-                queryset = queryset.filter(
-                    Q(title__icontains=query) |
-                    Q(description__icontains=query) |
-                    Q(organization__icontains=query) |
-                    Q(skills_required__icontains=query)
-                )
+                # Full-text match (descriptions included) or indexed title/organization/skills substring
+                queryset = queryset.filter(opportunity_search_filter(query))
 
             if opportunity_type:
                 queryset = queryset.filter(type=opportunity_type)
@@ -189,74 +191,22 @@ class OpportunityService:
     @staticmethod
     def get_recommendations_for_user(user_profile: UserProfile, limit: int = 10) -> List[Opportunity]:
         """Get personalized opportunity recommendations for a user."""
-        cache_key = f'user_recommendations_{user_profile.user.id}'
-        cached_result = cache.get(cache_key)
-
-        if cached_result:
-            return cached_result[:limit]
+        snapshot = get_snapshot_recommendations(user_profile.user)
+        if snapshot is not None:
+            return [
+                result['opportunity'] for result in snapshot[:limit] if result['score'] > MIN_RECOMMENDATION_SCORE
+            ]
 
         try:
-            # Get user preferences and skills
-            user_skills = user_profile.skills or []
-            user_location = user_profile.location
-            user_education = user_profile.education_level
-
-            # Get opportunities
-            opportunities = Opportunity.objects.filter(
-                deadline__gte=timezone.now().date(),
-                is_active=True
-            ).prefetch_related('tags')
-
-            # Score opportunities
-            scored_opportunities = []
-            for opportunity in opportunities:
-                score = OpportunityService._calculate_match_score(
-                    opportunity, user_skills, user_location, user_education
-                )
-                if score > 0.1:  # Only include relevant opportunities
-                    scored_opportunities.append((opportunity, score))
-
-            # Sort by score and get top results
-            scored_opportunities.sort(key=lambda x: x[1], reverse=True)
-            recommendations = [opp for opp, score in scored_opportunities[:limit]]
-
-            # Cache results
-            cache.set(cache_key, recommendations, RECOMMENDATION_CACHE_TIMEOUT)
-
-            return recommendations
+            # Scored and cached by the same pipeline as the recommendations endpoint
+            matcher = OpportunityMatcher(get_matching_profile(user_profile.user))
+            results = matcher.get_recommended_opportunities(limit=limit)
+            return [result['opportunity'] for result in results if result['score'] > MIN_RECOMMENDATION_SCORE]
 
         except Exception as e:
             logger.error(f"Error getting recommendations: {str(e)}")
             return []
 
-    @staticmethod
-    def _calculate_match_score(
-        opportunity: Opportunity,
-        user_skills: List[str],
-        user_location: str,
-        user_education: str
-    ) -> float:
-        """Calculate match score between opportunity and user profile."""
-        total_score = 0.0
-
-        # Skills match
-        if user_skills and opportunity.skills_required:
-            skills_match = len(set(user_skills) & set(opportunity.skills_required))
-            skills_score = skills_match / len(opportunity.skills_required) if opportunity.skills_required else 0
-            total_score += skills_score * MATCHING_WEIGHTS['skills_match']
-
-        # Location match
-        if user_location and opportunity.location:
-            location_match = user_location.lower() in opportunity.location.lower()
-            total_score += (1.0 if location_match else 0.0) * MATCHING_WEIGHTS['location_match']
-
-        # Education match (simplified)
-        if user_education and opportunity.experience_level:
-            education_score = 0.5  # Placeholder for education matching logic
-            total_score += education_score * MATCHING_WEIGHTS['education_match']
-
-        return total_score
-
     @staticmethod
     def apply_to_opportunity(user, opportunity_id: int) -> bool:
         """Apply user to an opportunity."""
@@ -309,3 +259,6 @@ class OpportunityService:
                     'page_size': page_size,
                 }
             }
+        except Exception as e:
+            logger.error(f"Error getting user applications: {str(e)}")
+            raise
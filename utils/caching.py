@@ -0,0 +1,370 @@
+"""
+Cache helpers for expensive, per-key computations (recommendation rankings).
+
+SingleFlightCache stores values in the Django cache with two TTLs:
+
+- until the soft TTL a value is fresh and served as is;
+- between the soft and hard TTL it is stale: it is still served, and one
+  background refresh recomputes it (a cache lock keeps it to one refresh per
+  key across all workers);
+- after the hard TTL the cache backend drops it.
+
+On a miss only one caller per key computes (single flight); concurrent callers
+wait for its result instead of recomputing, up to `wait_timeout`.
+
+Per-process counters (hit, miss, stale, lock_wait, refresh, refresh_error) are
+returned by cache_stats().
+
+Invalidation uses generation counters instead of key scans: each namespace
+('opportunities', 'tags', 'profile:<user id>') has a counter stored in the
+cache, versioned_key() embeds the current counters in a key, and
+bump_generation() makes every key built from the old counters unreachable in
+O(1) on any backend. Bumps inside deferred_generation_bump() are collected and
+applied once when the block exits, and always after the transaction commits.
+The counters live in the Django cache, so every worker must share it (see
+CACHES in settings): with a per-process cache a bump only reaches its own
+process.
+
+TwoTierCache puts a per-process cachetools TTL/LRU tier in front of the Django
+cache for small, hot, read-mostly values. Both tiers are keyed by the
+versioned key, so a generation bump makes the local copies unreachable too.
+The generations it versions keys with are themselves kept per process for
+LOCAL_GENERATION_TTL seconds, so a local hit makes no shared-cache round trip
+at all. Staleness is bounded: a bump made by another worker is seen within
+LOCAL_GENERATION_TTL seconds (a worker sees its own bumps immediately), and
+the local TTL bounds how long a worker can serve a value the shared tier
+already replaced. Per-tier hit ratios are part of cache_stats().
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import cachetools
+from django.core.cache import cache
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+
+_local = threading.local()
+
+_tier_stats = {}
+
+LOCAL_GENERATION_TTL = 5
+
+# Per-process copies of generation counters, read by TwoTierCache
+_local_generations = cachetools.TTLCache(maxsize=10000, ttl=LOCAL_GENERATION_TTL)
+_local_generations_lock = threading.Lock()
+
+
+def record_cache_event(event, count=1):
+    with _stats_lock:
+        _stats[event] += count
+
+
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def cache_stats():
+    """
+    Counters of this process, plus the share of lookups served from cache
+    (fresh or stale), and per two-tier cache the hit ratio of each tier.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+        tiers = {name: dict(counts) for name, counts in _tier_stats.items()}
+    lookups = stats.get('hit', 0) + stats.get('stale', 0) + stats.get('miss', 0)
+    stats['hit_ratio'] = _ratio(stats.get('hit', 0) + stats.get('stale', 0), lookups)
+
+    for counts in tiers.values():
+        lookups = counts['local_hit'] + counts['shared_hit'] + counts['miss']
+        counts['local_hit_ratio'] = _ratio(counts['local_hit'], lookups)
+        counts['shared_hit_ratio'] = _ratio(counts['shared_hit'], lookups - counts['local_hit'])
+    stats['tiers'] = tiers
+    return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+        for counts in _tier_stats.values():
+            counts.update(dict.fromkeys(counts, 0))
+
+
+def generation_key(namespace):
+    return f'cache_generation:{namespace}'
+
+
+def _initial_generation():
+    # Time based, so a counter evicted from the cache never restarts at a value old keys were built with
+    return time.time_ns() // 1000
+
+
+def get_generations(*namespaces):
+    """Current generation of each namespace, in order."""
+    keys = [generation_key(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _initial_generation(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def get_local_generations(*namespaces):
+    """
+    get_generations() served from the per-process copies, which are at most
+    LOCAL_GENERATION_TTL seconds old; only expired namespaces are read from the cache.
+    """
+    with _local_generations_lock:
+        generations = {namespace: _local_generations.get(namespace) for namespace in namespaces}
+    expired = [namespace for namespace, generation in generations.items() if generation is None]
+    if expired:
+        fetched = dict(zip(expired, get_generations(*expired)))
+        generations.update(fetched)
+        with _local_generations_lock:
+            _local_generations.update(fetched)
+    return [generations[namespace] for namespace in namespaces]
+
+
+def clear_local_generations():
+    with _local_generations_lock:
+        _local_generations.clear()
+
+
+def key_for_generations(key, generations):
+    """key suffixed with the given generations (the format versioned_key uses)."""
+    return f"{key}:g{'.'.join(str(generation) for generation in generations)}"
+
+
+def versioned_key(key, *namespaces):
+    """key suffixed with the current generations of the namespaces."""
+    return key_for_generations(key, get_generations(*namespaces))
+
+
+def _bump(namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(generation_key(namespace))
+        except ValueError:
+            cache.set(generation_key(namespace), _initial_generation(), None)
+    # This worker sees its own bumps right away
+    with _local_generations_lock:
+        for namespace in namespaces:
+            _local_generations.pop(namespace, None)
+
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every key versioned with these namespaces, once the current
+    transaction commits (or at the end of the enclosing deferred_generation_bump block).
+    """
+    pending = getattr(_local, 'pending_generations', None)
+    if pending is not None:
+        pending.update(namespaces)
+    else:
+        transaction.on_commit(lambda: _bump(namespaces))
+
+
+@contextmanager
+def deferred_generation_bump():
+    """Collect generation bumps made inside the block into one bump per namespace on exit."""
+    if getattr(_local, 'pending_generations', None) is not None:
+        yield
+        return
+
+    _local.pending_generations = set()
+    try:
+        yield
+        pending = _local.pending_generations
+    finally:
+        _local.pending_generations = None
+
+    if pending:
+        transaction.on_commit(lambda: _bump(sorted(pending)))
+
+
+class SingleFlightCache:
+    """Stale-while-revalidate cache with one computation per key at a time."""
+
+    def __init__(self, soft_ttl, hard_ttl, lock_timeout=60, wait_timeout=10, poll_interval=0.05):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def lock_key(key):
+        return f'{key}:lock'
+
+    def get(self, key):
+        """Return (value, state): state is 'hit', 'stale' or 'miss' (value None)."""
+        entry = cache.get(key)
+        if entry is None:
+            return None, 'miss'
+        return entry['value'], 'hit' if time.time() < entry['fresh_until'] else 'stale'
+
+    def get_many(self, keys):
+        """Values of the cached keys, fresh or stale."""
+        return {key: entry['value'] for key, entry in cache.get_many(keys).items()}
+
+    def _entry(self, value):
+        return {'value': value, 'fresh_until': time.time() + self.soft_ttl}
+
+    def set(self, key, value):
+        cache.set(key, self._entry(value), self.hard_ttl)
+
+    def set_many(self, values):
+        cache.set_many({key: self._entry(value) for key, value in values.items()}, self.hard_ttl)
+
+    def delete_many(self, keys):
+        cache.delete_many(keys)
+
+    def _acquire(self, key):
+        token = uuid.uuid4().hex
+        return token if cache.add(self.lock_key(key), token, self.lock_timeout) else None
+
+    def _release(self, key, token):
+        if cache.get(self.lock_key(key)) == token:
+            cache.delete(self.lock_key(key))
+
+    def get_or_compute(self, key, compute, accept=None, lookup=None):
+        """
+        Return the cached value of key, computing and storing it when missing.
+
+        `accept(value)` can reject a cached value (treated as a miss). Stale
+        values are returned immediately while one background refresh runs.
+        `lookup` is the (value, state) pair of a get() the caller already made.
+        Returns (value, state) with state 'hit', 'stale', 'miss' or 'lock_wait'.
+        """
+        value, state = lookup or self.get(key)
+        if state != 'miss' and (accept is None or accept(value)):
+            record_cache_event(state)
+            if state == 'stale':
+                self._refresh_in_background(key, compute)
+            return value, state
+
+        record_cache_event('miss')
+        token = self._acquire(key)
+        if token is None:
+            # Another caller is computing this key: wait for its result
+            record_cache_event('lock_wait')
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value, state = self.get(key)
+                if state != 'miss' and (accept is None or accept(value)):
+                    return value, 'lock_wait'
+                if cache.get(self.lock_key(key)) is None:
+                    break
+            # The other computation failed or is too slow: compute without the lock
+            value = compute()
+            self.set(key, value)
+            return value, 'miss'
+
+        try:
+            value = compute()
+            self.set(key, value)
+        finally:
+            self._release(key, token)
+        return value, 'miss'
+
+    def _refresh_in_background(self, key, compute):
+        token = self._acquire(key)
+        if token is None:
+            return
+
+        def refresh():
+            try:
+                self.set(key, compute())
+                record_cache_event('refresh')
+            except Exception as e:
+                record_cache_event('refresh_error')
+                logger.error(f"Error refreshing cache key {key}: {str(e)}")
+            finally:
+                self._release(key, token)
+                # Database connections are per thread: don't leave this one open
+                connections.close_all()
+
+        _refresh_executor.submit(refresh)
+
+
+class TwoTierCache:
+    """Per-process TTL/LRU tier in front of the shared Django cache."""
+
+    def __init__(self, name, maxsize, local_ttl, shared_ttl):
+        self.name = name
+        self.shared_ttl = shared_ttl
+        self.local = cachetools.TTLCache(maxsize=maxsize, ttl=local_ttl)
+        self.lock = threading.Lock()
+        with _stats_lock:
+            self.stats = _tier_stats.setdefault(name, Counter(local_hit=0, shared_hit=0, miss=0))
+
+    def _record(self, event):
+        with _stats_lock:
+            self.stats[event] += 1
+
+    @staticmethod
+    def _full_key(key, namespaces):
+        return key_for_generations(key, get_local_generations(*namespaces)) if namespaces else key
+
+    def _get(self, full_key):
+        with self.lock:
+            value = self.local.get(full_key)
+        if value is not None:
+            self._record('local_hit')
+            return value
+
+        value = cache.get(full_key)
+        if value is None:
+            self._record('miss')
+            return None
+        self._record('shared_hit')
+        with self.lock:
+            self.local[full_key] = value
+        return value
+
+    def _set(self, full_key, value):
+        # Stored once the current transaction commits, so rows of a rolled back transaction are never cached
+        def store():
+            cache.set(full_key, value, self.shared_ttl)
+            with self.lock:
+                self.local[full_key] = value
+
+        transaction.on_commit(store)
+
+    def get(self, key, namespaces=()):
+        """Cached value of key (None on a miss), checking the local tier first."""
+        return self._get(self._full_key(key, namespaces))
+
+    def set(self, key, value, namespaces=()):
+        self._set(self._full_key(key, namespaces), value)
+
+    def get_or_set(self, key, compute, namespaces=()):
+        """
+        Cached value of key, else compute() (stored unless None). The key is
+        versioned before computing, so a bump during compute() is not masked.
+        """
+        full_key = self._full_key(key, namespaces)
+        value = self._get(full_key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self._set(full_key, value)
+        return value
+
+    def clear_local(self):
+        """Drop this process's copies, values and generations (as in a fresh worker)."""
+        with self.lock:
+            self.local.clear()
+        clear_local_generations()
@@ -0,0 +1,137 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+import threading
+from unittest.mock import patch
+from opportunities.models import Opportunity, Category
+from utils.caching import (
+    SingleFlightCache, TwoTierCache, bump_generation, cache_stats, clear_local_generations, deferred_generation_bump,
+    generation_key, get_generations, reset_cache_stats, versioned_key,
+)
+
+
+class SingleFlightCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+
+    def test_miss_computes_once_then_hits(self):
+        calls = []
+        flight = SingleFlightCache(soft_ttl=60, hard_ttl=120)
+
+        value, state = flight.get_or_compute('key', lambda: calls.append(1) or 'fresh')
+        self.assertEqual((value, state), ('fresh', 'miss'))
+        value, state = flight.get_or_compute('key', lambda: calls.append(1) or 'again')
+        self.assertEqual((value, state), ('fresh', 'hit'))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache_stats()['hit_ratio'], 0.5)
+
+    def test_stale_value_served_while_one_refresh_runs(self):
+        flight = SingleFlightCache(soft_ttl=0, hard_ttl=120)
+        flight.set('key', 'old')
+
+        # The refresh is run inline here, so it must not close the test's connection
+        with patch('utils.caching._refresh_executor') as executor, patch('utils.caching.connections'):
+            self.assertEqual(flight.get_or_compute('key', lambda: 'new'), ('old', 'stale'))
+            # The first refresh still holds the lock
+            self.assertEqual(flight.get_or_compute('key', lambda: 'new'), ('old', 'stale'))
+            self.assertEqual(executor.submit.call_count, 1)
+            executor.submit.call_args[0][0]()
+
+        self.assertEqual(flight.get('key')[0], 'new')
+        self.assertEqual(cache_stats()['stale'], 2)
+
+    def test_concurrent_miss_waits_for_the_lock_holder(self):
+        flight = SingleFlightCache(soft_ttl=60, hard_ttl=120, wait_timeout=5, poll_interval=0.01)
+        cache.add(flight.lock_key('key'), 'other-worker')
+        threading.Timer(0.05, flight.set, args=('key', 'computed elsewhere')).start()
+
+        value, state = flight.get_or_compute('key', lambda: self.fail('computed twice'))
+        self.assertEqual((value, state), ('computed elsewhere', 'lock_wait'))
+        self.assertEqual(cache_stats()['lock_wait'], 1)
+
+
+class GenerationInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Technology', slug='technology')
+
+    def test_bump_changes_versioned_keys(self):
+        key = versioned_key('recommendations_abc', 'opportunities', 'profile:1')
+        self.assertEqual(versioned_key('recommendations_abc', 'opportunities', 'profile:1'), key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('profile:1')
+        self.assertNotEqual(versioned_key('recommendations_abc', 'opportunities', 'profile:1'), key)
+
+    def test_batch_bumps_once_and_counter_saves_do_not_bump(self):
+        before, = get_generations('opportunities')
+        with self.captureOnCommitCallbacks(execute=True), deferred_generation_bump():
+            for i in range(3):
+                Opportunity.objects.create(
+                    title='Job %d' % i, type='job', organization='Org', category=self.category,
+                    description='Description', deadline=timezone.now().date() + timedelta(days=30)
+                )
+        after, = get_generations('opportunities')
+        self.assertEqual(after, before + 1)
+
+        opportunity = Opportunity.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            opportunity.view_count = 5
+            opportunity.save(update_fields=['view_count'])
+        self.assertEqual(get_generations('opportunities'), [after])
+
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local_generations()
+        reset_cache_stats()
+        self.tiers = TwoTierCache('test_tiers', maxsize=10, local_ttl=60, shared_ttl=60)
+
+    def test_local_tier_serves_repeat_lookups(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tiers.get_or_set('key', lambda: calls.append(1) or 'value')
+        self.assertEqual(self.tiers.get_or_set('key', lambda: calls.append(1) or 'other'), 'value')
+
+        # Another worker only has the shared tier
+        self.tiers.clear_local()
+        self.assertEqual(self.tiers.get('key'), 'value')
+
+        self.assertEqual(len(calls), 1)
+        counts = cache_stats()['tiers']['test_tiers']
+        self.assertEqual((counts['local_hit'], counts['shared_hit'], counts['miss']), (1, 1, 1))
+        self.assertEqual(counts['local_hit_ratio'], round(1 / 3, 4))
+
+    def test_generation_bump_skips_both_tiers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tiers.set('category', 'old', namespaces=('tags',))
+        self.assertEqual(self.tiers.get('category', namespaces=('tags',)), 'old')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('tags')
+        self.assertIsNone(self.tiers.get('category', namespaces=('tags',)))
+
+    def test_local_hits_skip_the_shared_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tiers.set('category', 'value', namespaces=('tags',))
+        with patch('utils.caching.cache') as shared:
+            self.assertEqual(self.tiers.get('category', namespaces=('tags',)), 'value')
+        self.assertEqual(shared.mock_calls, [])
+
+    def test_bumps_of_other_workers_seen_after_local_generation_ttl(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tiers.set('category', 'old', namespaces=('tags',))
+        # Bumped by another worker: this one keeps its generation for up to LOCAL_GENERATION_TTL
+        cache.incr(generation_key('tags'))
+        self.assertEqual(self.tiers.get('category', namespaces=('tags',)), 'old')
+
+        clear_local_generations()
+        self.assertIsNone(self.tiers.get('category', namespaces=('tags',)))
+
+    def test_values_of_rolled_back_transactions_are_not_cached(self):
+        self.tiers.set('key', 'uncommitted')
+        self.assertIsNone(self.tiers.get('key'))